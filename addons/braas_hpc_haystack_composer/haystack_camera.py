@@ -0,0 +1,192 @@
+#####################################################################################################################
+# Copyright(C) 2011-2025 IT4Innovations National Supercomputing Center, VSB - Technical University of Ostrava
+#
+# This program is free software : you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#####################################################################################################################
+
+# Camera paths
+#
+# Independent of bpy. The transforms and lenses of a camera over a frame range are
+# turned into haystack cameras (vp, vi, vu, fovy) in one numpy pass and stored as a
+# camera path file, one frame per line:
+#
+#   frame vp.x vp.y vp.z vi.x vi.y vi.z vu.x vu.y vu.z fovy
+
+import os
+
+import numpy as np
+
+from . import haystack_command
+
+PATH_HEADER = "# haystack camera path: frame vp(3) vi(3) vu(3) fovy"
+
+def euler_matrices(angles, order="XYZ"):
+    """(N, 3, 3) rotation matrices of (N, 3) euler angles in radians, Blender rotation order"""
+    angles = np.asarray(angles, dtype=np.float64)
+    c = np.cos(angles)
+    s = np.sin(angles)
+    n = len(angles)
+
+    def axis_matrices(axis):
+        m = np.zeros((n, 3, 3))
+        i, j = [k for k in range(3) if k != axis]
+        m[:, axis, axis] = 1.0
+        m[:, i, i] = c[:, axis]
+        m[:, j, j] = c[:, axis]
+        # Right handed rotation, the sign flips for the Y axis
+        m[:, i, j] = -s[:, axis] if axis != 1 else s[:, axis]
+        m[:, j, i] = s[:, axis] if axis != 1 else -s[:, axis]
+        return m
+
+    matrices = np.broadcast_to(np.eye(3), (n, 3, 3))
+    # "XYZ" rotates about X first: R = Rz @ Ry @ Rx
+    for axis in order:
+        matrices = axis_matrices("XYZ".index(axis)) @ matrices
+    return matrices
+
+def quaternion_matrices(quaternions):
+    """(N, 3, 3) rotation matrices of (N, 4) quaternions (w, x, y, z), normalized first"""
+    q = np.asarray(quaternions, dtype=np.float64)
+    q = q / np.linalg.norm(q, axis=1, keepdims=True)
+    w, x, y, z = q[:, 0], q[:, 1], q[:, 2], q[:, 3]
+    return np.stack([
+        np.stack([1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y)], axis=1),
+        np.stack([2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x)], axis=1),
+        np.stack([2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)], axis=1),
+    ], axis=1)
+
+def sample_keyframes(points, interpolations, extrapolation, frames):
+    """(N,) values of an F-Curve at frames from its (K, 2) keyframe points (frame, value)
+
+    Only curves of LINEAR and CONSTANT keyframes are sampled, interpolations[i] applies
+    to the segment starting at key i as in Blender. Returns None for any other
+    interpolation, those need FCurve.evaluate().
+    """
+    if len(points) == 0 or any(interpolation not in ('LINEAR', 'CONSTANT') for interpolation in interpolations):
+        return None
+
+    points = np.asarray(points, dtype=np.float64)
+    keys, values = points[:, 0], points[:, 1]
+    frames = np.asarray(frames, dtype=np.float64)
+    linear = np.array([interpolation == 'LINEAR' for interpolation in interpolations])
+
+    index = np.clip(np.searchsorted(keys, frames, side="right") - 1, 0, len(keys) - 1)
+    result = values[index]
+    if len(keys) > 1:
+        # Inside a LINEAR segment, the last key has no segment
+        segment = np.minimum(index, len(keys) - 2)
+        span = keys[segment + 1] - keys[segment]
+        t = (frames - keys[segment]) / np.where(span > 0, span, 1.0)
+        inside = (frames >= keys[0]) & (frames < keys[-1]) & linear[segment]
+        lerp = values[segment] + t * (values[segment + 1] - values[segment])
+        result = np.where(inside, lerp, result)
+
+        if extrapolation == 'LINEAR':
+            # Blender extends along the first and last segment when that end key is LINEAR
+            for end, neighbour, side in ((0, 1, frames < keys[0]), (-1, -2, frames > keys[-1])):
+                if linear[end] and keys[end] != keys[neighbour]:
+                    slope = (values[end] - values[neighbour]) / (keys[end] - keys[neighbour])
+                    result = np.where(side, values[end] + slope * (frames - keys[end]), result)
+    return result
+
+def compose_matrices(locations, rotations, scales):
+    """(N, 4, 4) world matrices of (N, 3) locations, (N, 3, 3) rotations and (N, 3) scales"""
+    n = len(locations)
+    matrices = np.zeros((n, 4, 4))
+    matrices[:, :3, :3] = rotations * np.asarray(scales, dtype=np.float64)[:, np.newaxis, :]
+    matrices[:, :3, 3] = locations
+    matrices[:, 3, 3] = 1.0
+    return matrices
+
+def fovy_degrees(lens, sensor_width, sensor_height, sensor_fit, resolution):
+    """Vertical field of view in degrees of (N,) focal lengths in mm
+
+    sensor_fit is 'AUTO', 'HORIZONTAL' or 'VERTICAL' as on Blender cameras, the
+    resolution (width, height) decides the aspect of the other axis.
+    """
+    lens = np.asarray(lens, dtype=np.float64)
+    width, height = resolution
+    aspect = height / width
+    if sensor_fit == 'VERTICAL':
+        half = np.arctan(sensor_height / (2.0 * lens))
+    elif sensor_fit == 'HORIZONTAL' or width >= height:
+        half = np.arctan(np.tan(np.arctan(sensor_width / (2.0 * lens))) * aspect)
+    else:
+        # AUTO fits the sensor width to the larger, vertical axis
+        half = np.arctan(sensor_width / (2.0 * lens))
+    return np.degrees(2.0 * half)
+
+def look_at(matrices, distance=1.0):
+    """(vp, vi, vu) arrays of (N, 4, 4) camera world matrices
+
+    Cameras look down their local -Z axis with +Y up, vi is the point distance ahead.
+    """
+    matrices = np.asarray(matrices, dtype=np.float64)
+    vp = matrices[:, :3, 3]
+    forward = -matrices[:, :3, 2]
+    forward = forward / np.linalg.norm(forward, axis=1, keepdims=True)
+    up = matrices[:, :3, 1]
+    up = up / np.linalg.norm(up, axis=1, keepdims=True)
+    return vp, vp + forward * distance, up
+
+class CameraPath:
+    """Haystack cameras of consecutive frames"""
+    __slots__ = ('frames', 'vp', 'vi', 'vu', 'fovy')
+
+    def __init__(self, frames, vp, vi, vu, fovy):
+        self.frames = np.asarray(frames, dtype=np.int64)
+        self.vp = np.asarray(vp, dtype=np.float64)
+        self.vi = np.asarray(vi, dtype=np.float64)
+        self.vu = np.asarray(vu, dtype=np.float64)
+        self.fovy = np.asarray(fovy, dtype=np.float64)
+
+    @classmethod
+    def from_matrices(cls, frames, matrices, fovy, distance=1.0):
+        vp, vi, vu = look_at(matrices, distance)
+        return cls(frames, vp, vi, vu, fovy)
+
+    def __len__(self):
+        return len(self.frames)
+
+    def camera(self, index):
+        """haystack_command.CameraCommand of one frame"""
+        return haystack_command.CameraCommand(
+            (round(float(v), 6) for v in self.vp[index]),
+            (round(float(v), 6) for v in self.vi[index]),
+            (round(float(v), 6) for v in self.vu[index]),
+            float(self.fovy[index]),
+        )
+
+    def save(self, file_path):
+        table = np.column_stack([self.frames, self.vp, self.vi, self.vu, self.fovy])
+        directory = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        np.savetxt(file_path, table, fmt=["%d"] + ["%.7g"] * 10, header=PATH_HEADER[2:])
+
+    @classmethod
+    def load(cls, file_path):
+        table = np.loadtxt(file_path, ndmin=2)
+        if table.shape[1] != 11:
+            raise ValueError(f"'{file_path}' is not a camera path, expected 11 columns")
+        return cls(table[:, 0].astype(np.int64), table[:, 1:4], table[:, 4:7], table[:, 7:10], table[:, 10])
+
+def frame_file_name(file_name, frame, digits=4):
+    """Output image name of one frame, "render.png" -> "render_0001.png\""""
+    stem, extension = os.path.splitext(file_name)
+    return f"{stem}_{frame:0{digits}d}{extension}"
+
+def frame_digits(frames):
+    return max(4, len(str(max(int(abs(frame)) for frame in frames)))) if len(frames) else 4
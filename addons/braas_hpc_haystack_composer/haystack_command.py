@@ -0,0 +1,365 @@
+#####################################################################################################################
+# Copyright(C) 2011-2025 IT4Innovations National Supercomputing Center, VSB - Technical University of Ostrava
+#
+# This program is free software : you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#####################################################################################################################
+
+# HayStack command IR
+#
+# Pure python description of the haystack command line, independent of bpy.
+# The composer nodes populate these objects and the serializer turns them into
+# the command string, so generation can be tested and measured outside Blender.
+
+##################################################LOADING###################################################################
+class LoaderCommand:
+    """A data loader argument, e.g. raw://4@/data/volume.raw:format=float:dims=512,512,512"""
+    __slots__ = ('scheme', 'path', 'num_parts', 'options')
+
+    def __init__(self, path, scheme="", num_parts=None, options=None):
+        self.scheme = scheme
+        self.path = path
+        self.num_parts = num_parts
+        # list of (key, tuple of values)
+        self.options = options if options is not None else []
+
+    def add_option(self, key, *values):
+        self.options.append((key, values))
+
+    def get_option(self, key, default=None):
+        for option_key, values in self.options:
+            if option_key == key:
+                return values
+        return default
+
+    def tokens(self):
+        command = []
+        if self.scheme:
+            command.append(self.scheme)
+        if self.num_parts is not None:
+            command.append(str(self.num_parts))
+            command.append("@")
+        command.append(self.path)
+
+        for key, values in self.options:
+            command.append(":" + key + "=")
+            for i, value in enumerate(values):
+                if i > 0:
+                    command.append(",")
+                command.append(str(value))
+
+        return command
+
+##################################################Scene###################################################################
+class CameraCommand:
+    """--camera vp vi vu -fovy angle"""
+    __slots__ = ('vp', 'vi', 'vu', 'fovy')
+
+    def __init__(self, vp, vi, vu, fovy):
+        self.vp = tuple(vp)
+        self.vi = tuple(vi)
+        self.vu = tuple(vu)
+        self.fovy = fovy
+
+    def tokens(self):
+        command = ["--camera"]
+        command.extend(str(v) for v in self.vp)
+        command.extend(str(v) for v in self.vi)
+        command.extend(str(v) for v in self.vu)
+        command.append("-fovy")
+        command.append(str(round(self.fovy, 3)))
+        return command
+
+class TransferFunctionCommand:
+    """-xf file"""
+    __slots__ = ('path',)
+
+    def __init__(self, path):
+        self.path = path
+
+    def tokens(self):
+        return ["-xf", self.path]
+
+##########################################Output#################################################
+class OutputImageCommand:
+    """-o dir / name -res width height"""
+    __slots__ = ('dir_path', 'file_name', 'resolution')
+
+    def __init__(self, dir_path, file_name, resolution):
+        self.dir_path = dir_path
+        self.file_name = file_name
+        self.resolution = tuple(resolution)
+
+    def tokens(self):
+        return [
+            "-o",
+            self.dir_path,
+            "/",
+            str(self.file_name),
+            "-res",
+            str(self.resolution[0]),
+            str(self.resolution[1]),
+        ]
+
+##################################################Property###################################################################
+class PropertiesCommand:
+    """Global rendering options"""
+    __slots__ = ('num_frames', 'paths_per_pixel', 'default_radius', 'ndg', 'dpr',
+                 'merge_umeshes', 'measure', 'create_head_node')
+
+    def __init__(self, num_frames=1024, paths_per_pixel=1, default_radius=0.1, ndg=1, dpr=0,
+                 merge_umeshes=False, measure=False, create_head_node=False):
+        self.num_frames = num_frames
+        self.paths_per_pixel = paths_per_pixel
+        self.default_radius = default_radius
+        self.ndg = ndg
+        self.dpr = dpr
+        self.merge_umeshes = merge_umeshes
+        self.measure = measure
+        self.create_head_node = create_head_node
+
+    def tokens(self):
+        command = [
+            "--num-frames",
+            str(self.num_frames),
+            "--paths-per-pixel",
+            str(self.paths_per_pixel),
+            "--default-radius",
+            str(round(self.default_radius, 7)),
+            "-ndg",
+            str(self.ndg),
+            "-dpr",
+            str(self.dpr),
+        ]
+
+        if self.merge_umeshes:
+            command.append("--merge-umeshes")
+        else:
+            command.append("--no-mum")
+
+        if self.measure:
+            command.append("--measure")
+
+        if self.create_head_node:
+            command.append("--create-head-node")
+
+        return command
+
+##################################################Launcher###################################################################
+# Binding option values per launcher, keyed by binding ('CORE', 'SOCKET', 'NUMA')
+_LAUNCHER_BINDINGS = {
+    'MPIRUN': {'CORE': "core", 'SOCKET': "socket", 'NUMA': "numa"},
+    'SRUN': {'CORE': "cores", 'SOCKET': "sockets", 'NUMA': "ldoms"},
+    'MPIEXEC': {'CORE': "core", 'SOCKET': "socket", 'NUMA': "numa"},
+}
+
+class LauncherCommand:
+    """MPI launcher the render executable is started with
+
+    launcher is 'MPIRUN' (Open MPI), 'SRUN' (Slurm) or 'MPIEXEC' (MPICH/Intel MPI),
+    binding 'NONE', 'CORE', 'SOCKET' or 'NUMA'.
+    """
+    __slots__ = ('launcher', 'ranks', 'ranks_per_node', 'binding')
+
+    def __init__(self, launcher, ranks, ranks_per_node=None, binding='NONE'):
+        self.launcher = launcher
+        self.ranks = ranks
+        self.ranks_per_node = ranks_per_node
+        self.binding = binding
+
+    def tokens(self):
+        bind = _LAUNCHER_BINDINGS[self.launcher].get(self.binding)
+
+        if self.launcher == 'SRUN':
+            command = ["srun", "-n", str(self.ranks)]
+            if self.ranks_per_node:
+                command.append("--ntasks-per-node=" + str(self.ranks_per_node))
+            if bind:
+                command.append("--cpu-bind=" + bind)
+            return command
+
+        if self.launcher == 'MPIEXEC':
+            command = ["mpiexec", "-n", str(self.ranks)]
+            if self.ranks_per_node:
+                command.extend(["-ppn", str(self.ranks_per_node)])
+            if bind:
+                command.extend(["-bind-to", bind])
+            return command
+
+        command = ["mpirun", "-np", str(self.ranks)]
+        if self.ranks_per_node:
+            command.extend(["--map-by", "ppr:" + str(self.ranks_per_node) + ":node"])
+        if bind:
+            command.extend(["--bind-to", bind])
+        return command
+
+##################################################Render###################################################################
+class RenderCommand:
+    """Render executable, its own arguments are emitted after all inputs"""
+    __slots__ = ('executable', 'hostname', 'port', 'launcher')
+
+    def __init__(self, executable, hostname=None, port=None, launcher=None):
+        self.executable = executable
+        self.hostname = hostname
+        self.port = port
+        # LauncherCommand or None to run the executable directly
+        self.launcher = launcher
+
+    def tokens(self):
+        if self.hostname is None:
+            return []
+        return ["-server", str(self.hostname), "-port", str(self.port)]
+
+def serialize_command(render, code_lines):
+    """Join the launcher, the render executable and the generated arguments into the final command string"""
+    launcher = render.launcher.tokens() if render.launcher is not None else []
+    return " ".join([""] + launcher + [render.executable] + code_lines + [""])
+
+##################################################Traversal###################################################################
+def collect_inputs(roots, get_inputs):
+    """Iterative depth-first walk from roots
+
+    Returns (order, inputs): order lists every reachable node after all of its inputs
+    (the same post-order the recursive generator used), inputs maps each node to the
+    list of its input nodes in link order.
+    """
+    order = []
+    inputs = {}
+
+    for root in roots:
+        if root in inputs:
+            continue
+
+        inputs[root] = list(get_inputs(root))
+        stack = [(root, iter(inputs[root]))]
+        while stack:
+            node, node_inputs = stack[-1]
+            for input_node in node_inputs:
+                if input_node not in inputs:
+                    inputs[input_node] = list(get_inputs(input_node))
+                    stack.append((input_node, iter(inputs[input_node])))
+                    break
+            else:
+                stack.pop()
+                order.append(node)
+
+    return order, inputs
+
+def subgraph_keys(order, inputs, fingerprint):
+    """Key of every node hashing its own fingerprint with the keys of its inputs
+
+    A change to a node changes the key of that node and of everything downstream of it.
+    """
+    keys = {}
+    for node in order:
+        keys[node] = hash((fingerprint(node), tuple(keys[input_node] for input_node in inputs[node])))
+    return keys
+
+def shared_subgraphs(order, inputs):
+    """Nodes whose upstream subgraph contains a node consumed more than once
+
+    The code of such a subgraph depends on what was emitted before it, so it cannot be
+    reused as a standalone fragment.
+    """
+    consumers = {}
+    for node in order:
+        for input_node in inputs[node]:
+            consumers[input_node] = consumers.get(input_node, 0) + 1
+
+    shared = set()
+    for node in order:
+        for input_node in inputs[node]:
+            if consumers[input_node] > 1 or input_node in shared:
+                shared.add(node)
+                break
+    return shared
+
+def generate_code(root, inputs, tokens, visited, code_lines, cache=None, keys=None, shared=None, ident=None):
+    """Append the code of root and its dependencies to code_lines
+
+    Iterative depth-first post-order into a single output buffer: the inputs of a node are
+    emitted before the node itself and every node at most once (tracked in visited).
+
+    With cache (ident(node) -> (key, code lines)), keys and shared from subgraph_keys() and
+    shared_subgraphs(), the code of unshared subgraphs is memoized and reused while its key
+    is unchanged; the output is identical to an uncached traversal.
+    """
+    if root in visited:
+        return code_lines
+
+    use_cache = cache is not None
+    if ident is None:
+        ident = lambda node: node
+
+    def from_cache(node):
+        if not use_cache or node in shared:
+            return False
+        entry = cache.get(ident(node))
+        if entry is None or entry[0] != keys[node]:
+            return False
+        # The subgraph is reachable only through node, marking node is enough
+        visited.add(node)
+        code_lines.extend(entry[1])
+        return True
+
+    if from_cache(root):
+        return code_lines
+
+    visited.add(root)
+    stack = [(root, iter(inputs[root]), len(code_lines))]
+    while stack:
+        node, node_inputs, start = stack[-1]
+        for input_node in node_inputs:
+            if input_node not in visited and not from_cache(input_node):
+                visited.add(input_node)
+                stack.append((input_node, iter(inputs[input_node]), len(code_lines)))
+                break
+        else:
+            stack.pop()
+            code_lines.extend(tokens(node))
+            if use_cache and node not in shared:
+                cache[ident(node)] = (keys[node], code_lines[start:])
+
+    return code_lines
+
+##################################################Graph###################################################################
+class CommandGraph:
+    """Commands connected the same way as the composer nodes, inputs are emitted before their consumer"""
+
+    def __init__(self):
+        self.commands = []
+        self.inputs = []
+
+    def add(self, command, inputs=()):
+        """Add a command and return its id"""
+        self.commands.append(command)
+        self.inputs.append(list(inputs))
+        return len(self.commands) - 1
+
+    def link(self, from_id, to_id):
+        self.inputs[to_id].append(from_id)
+
+    def generate_code(self, node_id, visited=None):
+        """Generate command lines of a node and its dependencies"""
+        if visited is None:
+            visited = set()
+        _, inputs = collect_inputs([node_id], self.inputs.__getitem__)
+        return generate_code(node_id, inputs, self.get_tokens, visited, [])
+
+    def get_tokens(self, node_id):
+        return self.commands[node_id].tokens()
+
+    def generate_command(self, render_id):
+        """Generate the final command string of a render node"""
+        return serialize_command(self.commands[render_id], self.generate_code(render_id))
@@ -0,0 +1,195 @@
+#####################################################################################################################
+# Copyright(C) 2011-2025 IT4Innovations National Supercomputing Center, VSB - Technical University of Ostrava
+#
+# This program is free software : you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#####################################################################################################################
+
+# --measure output and run history
+#
+# Independent of bpy. MeasureParser picks the frame times out of the output haystack
+# prints with --measure, MeasureRecord keeps them with the settings of the run and
+# MeasureHistory appends the records to a JSON lines file, so runs of a tree can be
+# compared before and after a change.
+
+import hashlib
+import json
+import os
+import re
+import statistics
+import time
+
+# Records kept in the history file, older ones are dropped when it is compacted
+HISTORY_LIMIT = 2000
+
+# Relative change of the median frame time reported as faster/slower
+CHANGE_TOLERANCE = 0.05
+
+_UNITS = {"ms": 1e-3, "msec": 1e-3, "s": 1.0, "sec": 1.0, "secs": 1.0, "seconds": 1.0}
+
+# "123 frames in 4.5 s", averaged over the frames
+_FRAMES_IN = re.compile(r"(\d+)\s*frames?\D{0,20}?(\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)\s*(ms|msec|secs|sec|seconds|s)\b", re.IGNORECASE)
+# "frame 12 ... 31.2 ms", "time per frame: 0.03s"
+_FRAME_TIME = re.compile(r"frame\D*?(?:\d+\D+?)??(\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)\s*(ms|msec|secs|sec|seconds|s)\b", re.IGNORECASE)
+# "31.5 fps"
+_FPS = re.compile(r"(\d+(?:\.\d+)?)\s*fps\b", re.IGNORECASE)
+
+def command_hash(command):
+    """Short stable hash of a generated command string"""
+    return hashlib.sha1(command.strip().encode("utf-8")).hexdigest()[:12]
+
+class MeasureParser:
+    """Collects frame times in seconds from haystack output, fed line by line"""
+
+    def __init__(self):
+        self.frame_times = []
+
+    def feed(self, line):
+        match = _FRAMES_IN.search(line)
+        if match:
+            frames = int(match.group(1))
+            if frames > 0:
+                self.frame_times.append(float(match.group(2)) * _UNITS[match.group(3).lower()] / frames)
+            return
+
+        match = _FRAME_TIME.search(line)
+        if match:
+            self.frame_times.append(float(match.group(1)) * _UNITS[match.group(2).lower()])
+            return
+
+        match = _FPS.search(line)
+        if match and float(match.group(1)) > 0:
+            self.frame_times.append(1.0 / float(match.group(1)))
+
+    def feed_text(self, text):
+        for line in text.splitlines():
+            self.feed(line)
+        return self
+
+class MeasureRecord:
+    """One measured run: settings of the tree and its frame times in seconds"""
+    __slots__ = ('time', 'tree', 'node', 'command_hash', 'dataset_sizes', 'ndg', 'dpr',
+                 'resolution', 'paths_per_pixel', 'frame_times')
+
+    def __init__(self, tree, node, command_hash, dataset_sizes, ndg, dpr, resolution, paths_per_pixel,
+                 frame_times, time=None):
+        self.time = time if time is not None else _now()
+        self.tree = tree
+        self.node = node
+        self.command_hash = command_hash
+        self.dataset_sizes = list(dataset_sizes)
+        self.ndg = ndg
+        self.dpr = dpr
+        self.resolution = tuple(resolution)
+        self.paths_per_pixel = paths_per_pixel
+        self.frame_times = list(frame_times)
+
+    @property
+    def median(self):
+        return statistics.median(self.frame_times) if self.frame_times else None
+
+    @property
+    def dataset_bytes(self):
+        return sum(self.dataset_sizes)
+
+    def same_settings(self, other):
+        """Same command, so the runs differ only by the machine or the renderer"""
+        return self.command_hash == other.command_hash
+
+    def to_dict(self):
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values["resolution"] = list(self.resolution)
+        return values
+
+    @classmethod
+    def from_dict(cls, values):
+        return cls(**{name: values[name] for name in cls.__slots__})
+
+def _now():
+    return time.time()
+
+def compare(current, previous):
+    """Relative change of the median frame time, negative is faster; None without frame times"""
+    if current.median is None or previous is None or not previous.median:
+        return None
+    return current.median / previous.median - 1.0
+
+def describe_change(change):
+    if change is None:
+        return "no reference"
+    if abs(change) < CHANGE_TOLERANCE:
+        return f"unchanged ({change * 100.0:+.1f}%)"
+    return f"{'slower' if change > 0 else 'faster'} ({change * 100.0:+.1f}%)"
+
+class MeasureHistory:
+    """Append only JSON lines store of MeasureRecords"""
+
+    def __init__(self, file_path, limit=HISTORY_LIMIT):
+        self.file_path = file_path
+        self.limit = limit
+        self._records = None
+
+    @property
+    def records(self):
+        if self._records is None:
+            self._records = self._load()
+        return self._records
+
+    def _load(self):
+        records = []
+        if not os.path.exists(self.file_path):
+            return records
+        with open(self.file_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(MeasureRecord.from_dict(json.loads(line)))
+                except (ValueError, KeyError, TypeError):
+                    # A partially written or foreign line, keep the rest of the history
+                    continue
+        return records
+
+    def append(self, record):
+        records = self.records
+        records.append(record)
+
+        directory = os.path.dirname(self.file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if len(records) > self.limit:
+            del records[:len(records) - self.limit]
+            self._rewrite()
+            return
+
+        with open(self.file_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record.to_dict(), separators=(",", ":")) + "\n")
+
+    def _rewrite(self):
+        tmp_path = self.file_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in self.records:
+                f.write(json.dumps(record.to_dict(), separators=(",", ":")) + "\n")
+        os.replace(tmp_path, self.file_path)
+
+    def runs(self, tree, node=None):
+        """Records of a tree (and render node), oldest first"""
+        return [record for record in self.records
+                if record.tree == tree and (node is None or record.node == node)]
+
+    def previous(self, record):
+        """Latest earlier run of the same tree and render node"""
+        for other in reversed(self.runs(record.tree, record.node)):
+            if other is not record and other.time <= record.time:
+                return other
+        return None
@@ -0,0 +1,213 @@
+#####################################################################################################################
+# Copyright(C) 2011-2025 IT4Innovations National Supercomputing Center, VSB - Technical University of Ostrava
+#
+# This program is free software : you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#####################################################################################################################
+
+# NanoVDB header inspection
+#
+# Independent of bpy. Only the file header, the per grid metadata and names are read,
+# the grid buffers are skipped with a seek, so inspecting a large .nvdb costs a few
+# hundred bytes of I/O per grid.
+
+import struct
+
+# "NanoVDB" followed by a digit: '0' legacy (file or grid), '1' grid buffer, '2' file
+MAGIC_PREFIX = b"NanoVDB"
+MAGIC_LEGACY = 0x304244566f6e614e
+MAGIC_GRID = 0x314244566f6e614e
+MAGIC_FILE = 0x324244566f6e614e
+
+# magic, version, grid count, codec
+FILE_HEADER = struct.Struct("<QIHH")
+
+# grid size, file size, name key, voxel count, grid type, grid class, world bbox,
+# index bbox, voxel size, name size, node counts, tile counts, codec, padding, version
+FILE_METADATA = struct.Struct("<4Q2I6d6i3dI4I3I2HI")
+
+# Byte offsets into the GridData of a grid buffer
+GRID_DATA_SIZE = 672
+_GRID_VERSION = struct.Struct("<I")
+_GRID_COUNT = struct.Struct("<2IQ")
+_GRID_NAME = struct.Struct("<256s")
+_GRID_WORLD_BBOX = struct.Struct("<6d3d2I")
+_TREE_NODE_OFFSETS = struct.Struct("<4Q")
+_TREE_VOXEL_COUNT = struct.Struct("<Q")
+_ROOT_BBOX = struct.Struct("<6i")
+
+GRID_TYPES = (
+    "Unknown", "Float", "Double", "Int16", "Int32", "Int64", "Vec3f", "Vec3d", "Mask", "Half",
+    "UInt32", "Boolean", "RGBA8", "Fp4", "Fp8", "Fp16", "FpN", "Vec4f", "Vec4d", "Index",
+    "OnIndex", "IndexMask", "OnIndexMask", "PointIndex", "Vec3u8", "Vec3u16", "UInt8",
+)
+
+GRID_CLASSES = (
+    "Unknown", "LevelSet", "FogVolume", "Staggered", "PointIndex", "PointData", "Topology",
+    "VoxelVolume", "IndexGrid", "TensorGrid",
+)
+
+CODECS = ("None", "Zip", "Blosc")
+
+def _name(table, value):
+    return table[value] if 0 <= value < len(table) else f"Unknown ({value})"
+
+def format_version(version):
+    """major.minor.patch of a packed NanoVDB version number"""
+    return f"{version >> 21}.{(version >> 10) & 0x7ff}.{version & 0x3ff}"
+
+class NanoVDBGrid:
+    """Metadata of one grid, sizes in bytes, bounding boxes as (min, max) tuples"""
+    __slots__ = ('name', 'grid_type', 'grid_class', 'index_bbox', 'world_bbox', 'voxel_size',
+                 'voxel_count', 'grid_size', 'file_size', 'codec', 'version')
+
+    def __init__(self, name, grid_type, grid_class, index_bbox, world_bbox, voxel_size,
+                 voxel_count, grid_size, file_size, codec=0, version=0):
+        self.name = name
+        self.grid_type = grid_type
+        self.grid_class = grid_class
+        self.index_bbox = index_bbox
+        self.world_bbox = world_bbox
+        self.voxel_size = voxel_size
+        self.voxel_count = voxel_count
+        # bytes of the uncompressed grid buffer, what the renderer holds in memory
+        self.grid_size = grid_size
+        # bytes the grid takes in the file, smaller than grid_size with a codec
+        self.file_size = file_size
+        self.codec = codec
+        self.version = version
+
+    @property
+    def type_name(self):
+        return _name(GRID_TYPES, self.grid_type)
+
+    @property
+    def class_name(self):
+        return _name(GRID_CLASSES, self.grid_class)
+
+    @property
+    def codec_name(self):
+        return _name(CODECS, self.codec)
+
+    @property
+    def dims(self):
+        """Voxels along each axis of the index bounding box"""
+        bbox_min, bbox_max = self.index_bbox
+        return tuple(max(0, bbox_max[i] - bbox_min[i] + 1) for i in range(3))
+
+class NanoVDBInfo:
+    """Grids of a NanoVDB file"""
+
+    def __init__(self, file_size, grids):
+        self.file_size = file_size
+        self.grids = grids
+
+    @property
+    def grid_bytes(self):
+        """Bytes of all grid buffers once loaded"""
+        return sum(grid.grid_size for grid in self.grids)
+
+    def suggested_spacing(self):
+        """Voxel size of the first grid, None without grids or with a degenerate voxel size"""
+        if not self.grids:
+            return None
+        spacing = self.grids[0].voxel_size
+        if any(not value > 0.0 for value in spacing):
+            return None
+        return spacing
+
+def _read_exact(f, size):
+    data = f.read(size)
+    if len(data) != size:
+        raise ValueError("Truncated NanoVDB file")
+    return data
+
+def _read_segment(f, header_data):
+    """Grids of a file segment, f positioned after its FileHeader"""
+    _, version, grid_count, codec = FILE_HEADER.unpack(header_data)
+    grids = []
+    for _ in range(grid_count):
+        meta = FILE_METADATA.unpack(_read_exact(f, FILE_METADATA.size))
+        grid_size, file_size, _, voxel_count, grid_type, grid_class = meta[:6]
+        name_size = meta[21]
+        name = _read_exact(f, name_size).split(b"\0", 1)[0].decode("utf-8", "replace")
+        grids.append(NanoVDBGrid(
+            name, grid_type, grid_class,
+            (meta[12:15], meta[15:18]), (meta[6:9], meta[9:12]), meta[18:21],
+            voxel_count, grid_size, file_size, meta[29] or codec, meta[31] or version,
+        ))
+
+    # The grid buffers of the segment follow the metadata of all its grids
+    f.seek(sum(grid.file_size for grid in grids), 1)
+    return grids
+
+def _read_grid_buffer(f, start):
+    """Grid of a raw grid buffer starting at start, returns (grid, grid count, buffer size)"""
+    f.seek(start)
+    data = _read_exact(f, GRID_DATA_SIZE + _TREE_NODE_OFFSETS.size + 24 + _TREE_VOXEL_COUNT.size)
+    version, = _GRID_VERSION.unpack_from(data, 16)
+    _, grid_count, grid_size = _GRID_COUNT.unpack_from(data, 24)
+    name, = _GRID_NAME.unpack_from(data, 40)
+    values = _GRID_WORLD_BBOX.unpack_from(data, 560)
+    node_offsets = _TREE_NODE_OFFSETS.unpack_from(data, GRID_DATA_SIZE)
+    voxel_count, = _TREE_VOXEL_COUNT.unpack_from(data, GRID_DATA_SIZE + _TREE_NODE_OFFSETS.size + 24)
+
+    # The root node starts with the index bounding box of the grid
+    f.seek(start + GRID_DATA_SIZE + node_offsets[3])
+    bbox = _ROOT_BBOX.unpack(_read_exact(f, _ROOT_BBOX.size))
+
+    grid = NanoVDBGrid(
+        name.split(b"\0", 1)[0].decode("utf-8", "replace"), values[10], values[9],
+        (bbox[0:3], bbox[3:6]), (values[0:3], values[3:6]), values[6:9],
+        voxel_count, grid_size, grid_size, 0, version,
+    )
+    return grid, grid_count, grid_size
+
+def _is_file_header(header_data, file_size):
+    """Tell a legacy file header from a legacy grid buffer by the plausibility of its fields"""
+    _, _, grid_count, codec = FILE_HEADER.unpack(header_data)
+    return 0 < grid_count and codec < len(CODECS) and FILE_HEADER.size + grid_count * FILE_METADATA.size <= file_size
+
+def read_nanovdb(path):
+    """NanoVDBInfo of a .nvdb file, ValueError if it is not a NanoVDB file, OSError if unreadable"""
+    with open(path, "rb") as f:
+        f.seek(0, 2)
+        file_size = f.tell()
+        f.seek(0)
+
+        header_data = f.read(FILE_HEADER.size)
+        if len(header_data) != FILE_HEADER.size or not header_data.startswith(MAGIC_PREFIX):
+            raise ValueError("Not a NanoVDB file")
+        magic = FILE_HEADER.unpack(header_data)[0]
+
+        grids = []
+        if magic == MAGIC_FILE or (magic == MAGIC_LEGACY and _is_file_header(header_data, file_size)):
+            # A file is a sequence of segments, each a header, its metadata and grids
+            while header_data:
+                if len(header_data) != FILE_HEADER.size or FILE_HEADER.unpack(header_data)[0] not in (MAGIC_FILE, MAGIC_LEGACY):
+                    raise ValueError("Invalid NanoVDB segment header")
+                grids.extend(_read_segment(f, header_data))
+                header_data = f.read(FILE_HEADER.size)
+        elif magic in (MAGIC_GRID, MAGIC_LEGACY):
+            start = 0
+            while start < file_size:
+                grid, grid_count, grid_size = _read_grid_buffer(f, start)
+                grids.append(grid)
+                if grid_size <= 0 or len(grids) >= grid_count:
+                    break
+                start += grid_size
+        else:
+            raise ValueError("Unknown NanoVDB magic")
+
+    return NanoVDBInfo(file_size, grids)
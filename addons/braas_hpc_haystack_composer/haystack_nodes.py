@@ -21,40 +21,272 @@ import bpy
 from bpy.types import NodeTree, Node, NodeSocket, Panel, Operator, PropertyGroup, UIList, Object, Material, Scene
 from bpy.utils import register_class, unregister_class
 from nodeitems_utils import NodeCategory, NodeItem, register_node_categories, unregister_node_categories
+from bpy.app.handlers import persistent
+from bpy_extras.io_utils import ExportHelper, ImportHelper
 from bpy.props import (StringProperty, FloatProperty, FloatVectorProperty, IntProperty, BoolProperty, EnumProperty, PointerProperty, CollectionProperty, IntVectorProperty)
 
 from mathutils import Matrix
+import gpu
+from gpu_extras.batch import batch_for_shader
 
 from pathlib import Path
 import os
 import platform
 import re
+import hashlib
+import json
+import math
+import time
+import numpy as np
 
 from . import haystack_pref
+from . import haystack_command
+from . import haystack_remote
+from . import haystack_preflight
+from . import haystack_raw
+from . import haystack_xf
+from . import haystack_plan
+from . import haystack_run
+from . import haystack_measure
+from . import haystack_sweep
+from . import haystack_camera
+from . import haystack_preview
+from . import haystack_nanovdb
 ##################################
-# Timer for Auto Code Generation
+# Redraw
 ##################################
 
-def auto_generate_timer():
-    """Timer function to automatically generate code for selected node"""
-    for area in bpy.context.screen.areas:
-        if area.type == 'NODE_EDITOR':
-            for space in area.spaces:
-                if space.type == 'NODE_EDITOR' and space.tree_type == 'HayStackComposerTreeType':
-                    tree = space.edit_tree
-                    if tree and hasattr(tree, 'auto_generate_code') and tree.auto_generate_code:
-                        active_node = tree.nodes.active
-                        if active_node and hasattr(active_node, 'auto_generate_node_code'):
-                            try:
-                                active_node.auto_generate_node_code(bpy.context)
-                            except Exception as e:
-                                print(f"Auto-generate error: {str(e)}")
-                        
-                        # Return interval based on FPS setting
-                        return 1.0 / tree.auto_generate_code_fps
-    
-    # Check again in 0.5 seconds if no active tree found
-    return 0.5
+def tag_node_editors(area_types=('NODE_EDITOR',)):
+    """Redraw the node editors, or areas of area_types, of every window
+
+    Safe in timers, where bpy.context.screen is None during file load or without a window.
+    """
+    window_manager = bpy.context.window_manager
+    if window_manager is None:
+        return
+    for window in window_manager.windows:
+        screen = window.screen
+        if screen is None:
+            continue
+        for area in screen.areas:
+            if area.type in area_types:
+                area.tag_redraw()
+
+##################################
+# Event driven Auto Code Generation
+##################################
+
+# Owner of all msgbus subscriptions made by the auto-generate engine
+_auto_generate_owner = object()
+
+def request_auto_generate():
+    """Schedule one regeneration on the next UI frame, bursts of edits are coalesced"""
+    if not bpy.app.timers.is_registered(auto_generate_flush):
+        bpy.app.timers.register(auto_generate_flush, first_interval=0.0)
+
+def composer_spaces():
+    """Node editor spaces showing a HayStack tree, in every window"""
+    window_manager = bpy.context.window_manager
+    if window_manager is None:
+        return
+    for window in window_manager.windows:
+        screen = window.screen
+        if screen is None:
+            continue
+        for area in screen.areas:
+            if area.type == 'NODE_EDITOR':
+                for space in area.spaces:
+                    if space.type == 'NODE_EDITOR' and space.tree_type == 'HayStackComposerTreeType':
+                        yield space
+
+def auto_generate_flush():
+    """Generate code for the active node of every auto-generating tree, runs once per scheduled frame"""
+    window_manager = bpy.context.window_manager
+    if window_manager is None or not window_manager.windows:
+        # During file load or before a window exists, try again instead of dropping the request
+        return 0.1
+
+    trees = []
+    for space in composer_spaces():
+        tree = space.edit_tree
+        if tree and getattr(tree, 'auto_generate_code', False) and tree not in trees:
+            trees.append(tree)
+
+    for tree in trees:
+        active_node = tree.nodes.active
+        if active_node and hasattr(active_node, 'auto_generate_node_code'):
+            try:
+                active_node.auto_generate_node_code(bpy.context)
+            except Exception as e:
+                print(f"Auto-generate error: {str(e)}")
+        try:
+            tree.export_transfer_functions()
+        except Exception as e:
+            print(f"Transfer function export error: {str(e)}")
+
+    # One-shot timer
+    return None
+
+def _auto_generate_notify(*args):
+    request_auto_generate()
+
+def subscribe_auto_generate():
+    """Subscribe to edits of HayStack node properties, node selection and the active node"""
+    bpy.msgbus.clear_by_owner(_auto_generate_owner)
+
+    for cls in classes:
+        if issubclass(cls, HayStackBaseNode):
+            for name in node_property_names(cls) + ('select',):
+                bpy.msgbus.subscribe_rna(
+                    key=(cls, name),
+                    owner=_auto_generate_owner,
+                    args=(),
+                    notify=_auto_generate_notify,
+                )
+
+    bpy.msgbus.subscribe_rna(
+        key=(bpy.types.Nodes, 'active'),
+        owner=_auto_generate_owner,
+        args=(),
+        notify=_auto_generate_notify,
+    )
+
+def unsubscribe_auto_generate():
+    bpy.msgbus.clear_by_owner(_auto_generate_owner)
+    if bpy.app.timers.is_registered(auto_generate_flush):
+        bpy.app.timers.unregister(auto_generate_flush)
+
+def update_auto_generate_subscriptions():
+    """Keep subscriptions alive only while at least one tree has auto-generate enabled"""
+    enabled = any(
+        getattr(tree, 'auto_generate_code', False)
+        for tree in bpy.data.node_groups
+        if tree.bl_idname == 'HayStackComposerTreeType'
+    )
+    if enabled:
+        subscribe_auto_generate()
+        request_auto_generate()
+    else:
+        unsubscribe_auto_generate()
+
+@persistent
+def auto_generate_load_post(dummy):
+    # msgbus subscriptions are cleared when a file is loaded
+    update_auto_generate_subscriptions()
+
+@persistent
+def code_cache_load_post(dummy):
+    _subgraph_code_cache.clear()
+    _auto_generate_fingerprints.clear()
+    clear_node_fingerprints()
+
+@persistent
+def node_fingerprints_undo(dummy):
+    # Undo re-reads changed node trees, cached pointers may refer to other nodes
+    clear_node_fingerprints()
+
+##################################
+# Change fingerprints
+##################################
+
+# (tree pointer) -> {node pointer: hash of the node's own property values}
+# Entries are dropped by msgbus notifications of edits to the node, the whole tree on
+# structural changes, so a regeneration only reads the properties of edited nodes.
+_node_fingerprints = {}
+
+# Node pointers with a msgbus subscription that invalidates their fingerprint
+_node_fingerprint_subscriptions = set()
+
+# Owner of the per node subscriptions
+_node_fingerprint_owner = object()
+
+# (tree pointer) -> {render node pointer: derived rank count}, dropped on any edit of the
+# tree, so drawing a launcher doesn't walk the graph on every redraw
+_derived_ranks = {}
+
+def _node_fingerprint_notify(tree_pointer, node_pointer):
+    fingerprints = _node_fingerprints.get(tree_pointer)
+    if fingerprints is not None:
+        fingerprints.pop(node_pointer, None)
+    _derived_ranks.pop(tree_pointer, None)
+
+def node_property_fingerprint(node):
+    """Cached hash of node.fingerprint_values(), recomputed only after the node was edited"""
+    tree_pointer = node.id_data.as_pointer()
+    node_pointer = node.as_pointer()
+    fingerprints = _node_fingerprints.setdefault(tree_pointer, {})
+    fingerprint = fingerprints.get(node_pointer)
+    if fingerprint is None:
+        if node_pointer not in _node_fingerprint_subscriptions:
+            # Subscribing to the node itself notifies about every property of it
+            bpy.msgbus.subscribe_rna(
+                key=node,
+                owner=_node_fingerprint_owner,
+                args=(tree_pointer, node_pointer),
+                notify=_node_fingerprint_notify,
+            )
+            _node_fingerprint_subscriptions.add(node_pointer)
+        fingerprint = hash(tuple(node.fingerprint_values()))
+        fingerprints[node_pointer] = fingerprint
+    return fingerprint
+
+def invalidate_node_fingerprints(tree):
+    """Drop the cached fingerprints of the nodes of a tree"""
+    _node_fingerprints.pop(tree.as_pointer(), None)
+    _derived_ranks.pop(tree.as_pointer(), None)
+
+def clear_node_fingerprints():
+    bpy.msgbus.clear_by_owner(_node_fingerprint_owner)
+    _node_fingerprint_subscriptions.clear()
+    _node_fingerprints.clear()
+    _derived_ranks.clear()
+
+def derived_ranks(render_node):
+    """Cached derive_ranks() of a render node, recomputed only after its tree was edited"""
+    tree = render_node.id_data
+    ranks_by_node = _derived_ranks.setdefault(tree.as_pointer(), {})
+    ranks = ranks_by_node.get(render_node.as_pointer())
+    if ranks is None:
+        ranks = tree.derive_ranks(render_node)
+        ranks_by_node[render_node.as_pointer()] = ranks
+    return ranks
+
+# (tree name) -> (node name, fingerprint) of the last auto-generated node code
+_auto_generate_fingerprints = {}
+
+# (tree name) -> {node name: (subgraph key, code lines)}, dropped on file load
+_subgraph_code_cache = {}
+
+# node class -> tuple of property identifiers declared by the addon
+_node_property_names = {}
+
+def node_property_names(node_class):
+    """Return the identifiers of the properties declared on a HayStack node class
+
+    Names listed in a preview_properties tuple of the class or its bases only drive
+    in-Blender previews and are left out.
+    """
+    names = _node_property_names.get(node_class)
+    if names is None:
+        excluded = set()
+        for cls in node_class.__mro__:
+            excluded.update(cls.__dict__.get('preview_properties', ()))
+        names = []
+        for cls in reversed(node_class.__mro__):
+            for name in getattr(cls, '__annotations__', {}):
+                if name not in names and name not in excluded:
+                    names.append(name)
+        names = tuple(names)
+        _node_property_names[node_class] = names
+    return names
+
+def fingerprint_value(value):
+    """Convert a property value into something hashable"""
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, bpy.types.ID):
+        return value.name_full
+    return tuple(value)
 
 #####################################################################################################################
 
@@ -64,25 +296,16 @@ class HayStackComposerNodeTree(NodeTree):
     bl_label = 'HayStack Composer'
     bl_icon = 'NODETREE'
 
-    auto_generate_code_fps: IntProperty(  # type: ignore
-        name="Auto Generate Code FPS",
-        min=1,
-        max=30,
-        default=10,
-        description="Set FPS for auto-generating code when enabled"
-    )
-
     def _update_auto_generate_code(self, context):
-        """Start or stop the timer when auto-generate is toggled"""
+        """Subscribe to or unsubscribe from node edits when auto-generate is toggled"""
+        update_auto_generate_subscriptions()
+
+    def update(self):
+        # Called by Blender when links or nodes of the tree change
+        invalidate_node_fingerprints(self)
         if self.auto_generate_code:
-            # Start timer if not already running
-            if not bpy.app.timers.is_registered(auto_generate_timer):
-                bpy.app.timers.register(auto_generate_timer, first_interval=0.1)
-        else:
-            # Stop timer
-            if bpy.app.timers.is_registered(auto_generate_timer):
-                bpy.app.timers.unregister(auto_generate_timer)
-    
+            request_auto_generate()
+
     auto_generate_code: BoolProperty(  # type: ignore
         name="Auto Generate Code",
         default=False,
@@ -90,61 +313,415 @@ class HayStackComposerNodeTree(NodeTree):
         update=_update_auto_generate_code
     )        
 
+    preflight_files: BoolProperty(  # type: ignore
+        name="Preflight Files",
+        default=True,
+        description="Check existence, size and header of every referenced file after generating the tree code"
+    )
+
+    def find_render_nodes(self):
+        """All render nodes of the tree"""
+        return [node for node in self.nodes if isinstance(node, HayStackRenderBaseNode)]
+
+    def get_command_text_name(self, render_node, render_nodes):
+        if len(render_nodes) == 1:
+            return f"{self.name}_command_tree.cmd"
+        return f"{self.name}_{render_node.name}_command_tree.cmd"
+
     def generate_command_code(self):
-        """Generate executable command code from the node tree"""
-        code_lines = []
-        
-        # Find render node
-        render_node = None
-        for node in self.nodes:
-            if node.bl_idname == 'HayStackRenderBRAASHPCNodeType' or node.bl_idname == 'HayStackRenderViewerNodeType' or node.bl_idname == 'HayStackRenderViewerQTNodeType' or node.bl_idname == 'HayStackRenderOfflineNodeType':
-                render_node = node
-                break
+        """Generate executable command code from the node tree, one text block per render node
 
-        if render_node is None:
+        Returns (text names, unsized): the written text blocks and, per job script that was
+        not written because input sizes are unknown, the names of those loaders.
+        """
+        render_nodes = self.find_render_nodes()
+
+        if not render_nodes:
             raise ValueError("No Render node found in the node tree.")
-        
-        code_lines.append("")
-        code_lines.append(render_node.get_file_path())
-        
-        code_lines.extend(self._generate_node_code(render_node, set()))
-        # code_lines.extend(render_node.generate_code())
-        code_lines.append("")
-        
-        final_command = " ".join(code_lines)
-        
+
+        code = self.generate_code_lines(render_nodes)
+
+        text_names = []
+        unsized = []
+        for render_node, code_lines in zip(render_nodes, code):
+            final_command = haystack_command.serialize_command(render_node.to_command(), code_lines)
+
+            text_name = self.get_command_text_name(render_node, render_nodes)
+            self._write_text(text_name, final_command)
+            text_names.append(text_name)
+
+            if isinstance(render_node, HayStackRenderOfflineNode):
+                frame_commands = self.generate_frame_commands(render_node)
+                if frame_commands is not None:
+                    text_name = self.get_frames_text_name(render_node, render_nodes)
+                    self._write_text(text_name, "\n".join(["#!/bin/bash", "set -e"] + [command.strip() for command in frame_commands]) + "\n")
+                    text_names.append(text_name)
+
+            if getattr(render_node, 'job_scheduler', 'NONE') != 'NONE':
+                script, unknown = self.generate_job_script(render_node, code_lines)
+                if script is None:
+                    unsized.extend(unknown)
+                else:
+                    text_name = self.get_job_text_name(render_node, render_nodes)
+                    self._write_text(text_name, script)
+                    text_names.append(text_name)
+
+        self.export_transfer_functions()
+
+        return text_names, unsized
+
+    @staticmethod
+    def _write_text(text_name, content):
         # Create or get text block
-        text_name = f"{self.name}_command_tree.cmd"
         if text_name in bpy.data.texts:
             text = bpy.data.texts[text_name]
             text.clear()
         else:
             text = bpy.data.texts.new(text_name)
-        
-        text.write(final_command)
+        text.write(content)
 
-        return text_name
-    
-    def _generate_node_code(self, node, visited):
-        """Recursively generate command for a node and its dependencies"""
-        if node in visited or not hasattr(node, 'generate_code'):
-            return []
-        
-        visited.add(node)
-        code_lines = []
-        
-        # Generate command for input nodes first
+    def export_transfer_functions(self):
+        """Write the .xf files of all transfer function nodes, unchanged materials are skipped"""
+        for node in self.nodes:
+            if isinstance(node, HayStackTransferFunctionNode):
+                node.export_xf()
+
+    def generate_commands(self, render_nodes):
+        """Final command strings of render nodes, generated in a single traversal"""
+        return [haystack_command.serialize_command(render_node.to_command(), code_lines)
+                for render_node, code_lines in zip(render_nodes, self.generate_code_lines(render_nodes))]
+
+    def generate_code_lines(self, render_nodes):
+        """Generated arguments of every render node
+
+        The graph upstream of all render nodes is walked once and the code of every node
+        is generated once, shared subgraphs are reused across the outputs.
+        """
+        _, inputs, keys = self._subgraph_keys(render_nodes)
+        cache = self.get_code_cache()
+
+        node_code = {}
+        def get_node_code(node):
+            code = node_code.get(node)
+            if code is None:
+                code = node.generate_code()
+                node_code[node] = code
+            return code
+
+        code = []
+        for render_node in render_nodes:
+            render_order, _ = haystack_command.collect_inputs([render_node], inputs.__getitem__)
+            shared = haystack_command.shared_subgraphs(render_order, inputs)
+            code.append(haystack_command.generate_code(
+                render_node, inputs, get_node_code, set(), [],
+                cache=cache, keys=keys, shared=shared, ident=self._node_name
+            ))
+
+        return code
+
+    def collect_file_checks(self, render_nodes):
+        """Preflight checks of the files referenced by the loaders and transfer functions upstream of render nodes"""
+        order, _ = haystack_command.collect_inputs(render_nodes, self._node_inputs)
+
+        checks = []
+        for node in order:
+            if isinstance(node, HayStackTransferFunctionNode):
+                exported_path = bpy.path.abspath(node.file_path) if node.file_path else ""
+                check = haystack_preflight.transfer_function_file_check(node.name, node.to_command(), exported_path)
+            else:
+                check = haystack_preflight.loader_file_check(node.name, node.to_command())
+            if check is not None:
+                checks.append(check)
+        return checks
+
+    def has_remote_transfer_functions(self):
+        """True in remote mode when a transfer function references an .xf file the exporter does not write"""
+        if not haystack_pref.preferences().haystack_remote:
+            return False
+        return any(isinstance(node, HayStackTransferFunctionNode) and node.file_path_remote for node in self.nodes)
+
+    def collect_plan_inputs(self, render_nodes):
+        """Inputs of the partition and memory planners from the nodes upstream of render nodes
+
+        Returns (loaders, properties, output, unknown): (node, loaded size) of every loader
+        of known size, the PropertiesCommand (defaults without a Properties node), the
+        OutputImageCommand or None and the names of loaders of unknown size.
+        """
+        order, _ = haystack_command.collect_inputs(render_nodes, self._node_inputs)
+
+        loaders = []
+        properties = haystack_command.PropertiesCommand()
+        output = None
+        unknown = []
+        for node in order:
+            command = node.to_command()
+            if isinstance(command, haystack_command.PropertiesCommand):
+                properties = command
+            elif isinstance(command, haystack_command.OutputImageCommand):
+                output = command
+            elif isinstance(command, haystack_command.LoaderCommand) and hasattr(node, 'file_path'):
+                size = loader_file_size(node)
+                if size is None:
+                    unknown.append(node.name)
+                else:
+                    loaders.append((node, node.loaded_size(size)))
+        return loaders, properties, output, unknown
+
+    def derive_ranks(self, render_node, properties=None):
+        """Total ranks of the job of a render node: the data ranks for ndg/dpr and the part counts, plus the head node
+
+        properties overrides the PropertiesCommand of the tree, e.g. for a sweep variant.
+        """
+        order, _ = haystack_command.collect_inputs([render_node], self._node_inputs)
+
+        num_parts = 0
+        tree_properties = haystack_command.PropertiesCommand()
+        for node in order:
+            if node == render_node:
+                continue
+            # Subscribes the node, an edit of it drops the cached ranks of derived_ranks()
+            node_property_fingerprint(node)
+            command = node.to_command()
+            if isinstance(command, haystack_command.PropertiesCommand):
+                tree_properties = command
+            elif isinstance(command, haystack_command.LoaderCommand):
+                num_parts += command.num_parts if command.num_parts is not None else 1
+
+        if properties is None:
+            properties = tree_properties
+        ranks = haystack_plan.data_ranks(num_parts, properties.ndg, properties.dpr)
+        return ranks + (1 if properties.create_head_node else 0)
+
+    @staticmethod
+    def launcher_data_ranks(render_nodes, properties):
+        """Data ranks set by hand on the launcher of one of render nodes, None if they are derived"""
+        for node in render_nodes:
+            if node.launcher != 'NONE' and not node.ranks_auto:
+                return max(1, node.ranks - (1 if properties.create_head_node else 0))
+        return None
+
+    def plan_memory(self, render_nodes):
+        """(haystack_plan.MemoryPlan of the tree, names of loaders of unknown size)"""
+        loaders, properties, output, unknown = self.collect_plan_inputs(render_nodes)
+        return self._plan_memory(render_nodes, loaders, properties, output), unknown
+
+    def _plan_memory(self, render_nodes, loaders, properties, output, ranks_per_node=None):
+        pref = haystack_pref.preferences()
+        return haystack_plan.plan_memory(
+            [haystack_plan.LoaderLoad(node.name, size, getattr(node, 'num_parts', 1)) for node, size in loaders],
+            ndg=properties.ndg,
+            dpr=properties.dpr,
+            create_head_node=properties.create_head_node,
+            resolution=output.resolution if output is not None else haystack_plan.DEFAULT_RESOLUTION,
+            ranks=self.launcher_data_ranks(render_nodes, properties),
+            ranks_per_node=ranks_per_node or pref.haystack_ranks_per_node,
+            node_budget=int(pref.haystack_node_memory * haystack_plan.GIB) if pref.haystack_node_memory > 0 else None,
+            overhead=pref.haystack_memory_overhead,
+        )
+
+    def estimate_job(self, render_node):
+        """(haystack_plan.JobEstimate of the job of a render node, names of loaders of unknown size)"""
+        loaders, properties, output, unknown = self.collect_plan_inputs([render_node])
+        return self._estimate_job(render_node, loaders, properties, output), unknown
+
+    def _estimate_job(self, render_node, loaders, properties, output):
+        plan = self._plan_memory([render_node], loaders, properties, output, render_node.ranks_per_node)
+
+        pref = haystack_pref.preferences()
+        return haystack_plan.estimate_job(
+            plan, properties.num_frames, properties.paths_per_pixel,
+            load_bandwidth=pref.haystack_load_bandwidth * 1024 * 1024,
+            sample_rate=pref.haystack_sample_rate * 1e6,
+            safety=pref.haystack_walltime_safety,
+        )
+
+    def measure_record(self, render_node, command, frame_times):
+        """haystack_measure.MeasureRecord of a run of the command of a render node"""
+        loaders, properties, output, _ = self.collect_plan_inputs([render_node])
+        return haystack_measure.MeasureRecord(
+            self.name, render_node.name, haystack_measure.command_hash(command),
+            [size for _, size in loaders], properties.ndg, properties.dpr,
+            output.resolution if output is not None else haystack_plan.DEFAULT_RESOLUTION,
+            properties.paths_per_pixel, frame_times,
+        )
+
+    def get_job_text_name(self, render_node, render_nodes):
+        if len(render_nodes) == 1:
+            return f"{self.name}_job.sh"
+        return f"{self.name}_{render_node.name}_job.sh"
+
+    def generate_job_script(self, render_node, code_lines):
+        """(batch submission script, []) of a render node with job settings, from its generated code lines
+
+        A job sized without all inputs would under-request memory and walltime, so with
+        loaders of unknown size (None, their names) is returned instead.
+        """
+        estimate, unknown = self.estimate_job(render_node)
+        if unknown:
+            return None, unknown
+
+        render_command = render_node.to_command()
+        if render_command.launcher is None:
+            # Inside a job the ranks are started with the scheduler's launcher
+            render_command.launcher = haystack_command.LauncherCommand(
+                'SRUN' if render_node.job_scheduler == 'SLURM' else 'MPIRUN',
+                estimate.ranks, estimate.ranks_per_node, render_node.binding)
+
+        return haystack_plan.job_script(
+            render_node.job_scheduler, estimate,
+            haystack_command.serialize_command(render_command, code_lines),
+            job_name=render_node.job_name or self.name,
+            account=render_node.job_account,
+            queue=render_node.job_queue,
+        ), []
+
+    def generate_sweep(self, render_node, variants, scheduler=None):
+        """haystack_sweep.SweepResults with the commands of the sweep variants of a render node
+
+        With scheduler ('SLURM' or 'PBS') the commands are prepared for a job array and
+        (results, merged JobEstimate, names of loaders of unknown size) is returned,
+        otherwise (results, None, []).
+        """
+        order, inputs = haystack_command.collect_inputs([render_node], self._node_inputs)
+
+        base = {node: node.to_command() for node in order}
+        properties_node = next((node for node in order if isinstance(base[node], haystack_command.PropertiesCommand)), None)
+        output_node = next((node for node in order if isinstance(base[node], haystack_command.OutputImageCommand)), None)
+        if properties_node is None:
+            raise ValueError("A sweep needs a Properties node linked to the render node.")
+
+        if scheduler is not None:
+            loaders, _, _, unknown = self.collect_plan_inputs([render_node])
+        else:
+            loaders, unknown = None, []
+
+        node_code = {}
+        results = []
+        estimates = []
+        for variant in variants:
+            properties, output = haystack_sweep.apply_variant(
+                base[properties_node], base[output_node] if output_node is not None else None, variant)
+            code_lines = self._generate_override_code(
+                render_node, inputs, {properties_node: properties, output_node: output}, node_code)
+
+            render_command = render_node.to_command()
+            if render_command.launcher is not None and render_node.ranks_auto:
+                render_command.launcher.ranks = self.derive_ranks(render_node, properties)
+
+            if scheduler is not None:
+                estimate = self._estimate_job(render_node, loaders, properties, output)
+                estimates.append(estimate)
+                if render_command.launcher is None:
+                    render_command.launcher = haystack_command.LauncherCommand(
+                        'SRUN' if scheduler == 'SLURM' else 'MPIRUN',
+                        estimate.ranks, estimate.ranks_per_node, render_node.binding)
+
+            results.append(haystack_sweep.SweepResult(
+                haystack_sweep.variant_values(properties, output),
+                haystack_command.serialize_command(render_command, code_lines)))
+
+        estimate = haystack_plan.merge_estimates(estimates) if estimates else None
+        return results, estimate, unknown
+
+    @staticmethod
+    def _generate_override_code(render_node, inputs, overrides, node_code):
+        """Code lines of a render node with the commands of some nodes replaced
+
+        overrides maps nodes to the commands emitted instead of their own, node_code
+        memoizes the code of the other nodes across calls.
+        """
+        def get_tokens(node):
+            command = overrides.get(node)
+            if command is not None:
+                return command.tokens()
+            code = node_code.get(node)
+            if code is None:
+                code = node.generate_code()
+                node_code[node] = code
+            return code
+
+        return haystack_command.generate_code(render_node, inputs, get_tokens, set(), [])
+
+    def get_frames_text_name(self, render_node, render_nodes):
+        if len(render_nodes) == 1:
+            return f"{self.name}_frames.sh"
+        return f"{self.name}_{render_node.name}_frames.sh"
+
+    def generate_frame_commands(self, render_node):
+        """One command per frame of the camera path upstream of a render node, None without a camera path
+
+        Every command renders its frame into the output name suffixed with the frame number.
+        """
+        order, inputs = haystack_command.collect_inputs([render_node], self._node_inputs)
+
+        camera_node = next((node for node in order
+                            if isinstance(node, HayStackCameraNode) and node.camera_mode == 'PATH'), None)
+        if camera_node is None:
+            return None
+        path = camera_node.get_camera_path()
+
+        output_node = next((node for node in order if isinstance(node, HayStackOutputImageNode)), None)
+        if output_node is None:
+            raise ValueError("Rendering a camera path needs an OutputImage node.")
+        output = output_node.to_command()
+
+        digits = haystack_camera.frame_digits(path.frames)
+        render_command = render_node.to_command()
+        node_code = {}
+        commands = []
+        for index, frame in enumerate(path.frames):
+            frame_output = haystack_command.OutputImageCommand(
+                output.dir_path, haystack_camera.frame_file_name(output.file_name, int(frame), digits), output.resolution)
+            code_lines = self._generate_override_code(
+                render_node, inputs, {camera_node: path.camera(index), output_node: frame_output}, node_code)
+            commands.append(haystack_command.serialize_command(render_command, code_lines))
+        return commands
+
+    @staticmethod
+    def _node_inputs(node):
+        """HayStack nodes linked into the inputs of a node, in link order"""
+        inputs = []
         for input_socket in node.inputs:
             if input_socket.is_linked:
                 for link in input_socket.links:
-                    from_node = link.from_node
-                    code_lines.extend(self._generate_node_code(from_node, visited))
-        
-        # Generate code for this node
-        code_lines.extend(node.generate_code())
-        # code_lines.append("")
-        
-        return code_lines
+                    if hasattr(link.from_node, 'generate_code'):
+                        inputs.append(link.from_node)
+        return inputs
+
+    def _subgraph_keys(self, roots):
+        """Walk the graph upstream of roots and compute the subgraph key of every node
+
+        The key hashes the node's own fingerprint together with the keys of its inputs,
+        so a change to any node changes the keys of that node and everything downstream.
+        """
+        order, inputs = haystack_command.collect_inputs(roots, self._node_inputs)
+
+        remote = haystack_pref.preferences().haystack_remote
+        filepath = bpy.data.filepath
+        keys = haystack_command.subgraph_keys(
+            order, inputs,
+            lambda node: (remote, filepath, node.name, node.fingerprint())
+        )
+        return order, inputs, keys
+
+    def subgraph_fingerprint(self, node):
+        """Fingerprint of a node combined with the fingerprints of all nodes upstream of it"""
+        return self._subgraph_keys([node])[2][node]
+
+    @staticmethod
+    def _node_name(node):
+        return node.name
+
+    def get_code_cache(self):
+        """Per-tree fragment cache, kept across operator invocations until a file is loaded"""
+        cache = _subgraph_code_cache.setdefault(self.name, {})
+
+        # Drop fragments of removed nodes
+        if len(cache) > len(self.nodes):
+            for name in [name for name in cache if name not in self.nodes]:
+                del cache[name]
+
+        return cache
 
 # Define a custom node socket type
 class HayStackCommandSocket(NodeSocket):
@@ -175,10 +752,41 @@ class HayStackBaseNode(Node):
     def initNode(self, context):
         pass
 
+    def to_command(self):
+        """Override in subclasses to populate the command IR (haystack_command)"""
+        return None
+
     def generate_code(self):
         """Override in subclasses to generate command line code"""
         return []
 
+    def fingerprint_values(self):
+        """Values of the node's own properties the generated code depends on"""
+        return [fingerprint_value(getattr(self, name)) for name in node_property_names(type(self))]
+
+    def external_fingerprint_values(self):
+        """Values outside the node the generated code depends on, override in subclasses
+
+        Edits outside the node do not invalidate its cached fingerprint, these values are
+        read on every generation.
+        """
+        return []
+
+    def fingerprint(self):
+        """Cheap hash of the node's own property values and external state"""
+        external = self.external_fingerprint_values()
+        if not external:
+            return node_property_fingerprint(self)
+        return hash((node_property_fingerprint(self), tuple(external)))
+
+    def partition_input(self, size):
+        """haystack_plan.PartitionInput of a loader whose file has size bytes, override for splittable loaders"""
+        return haystack_plan.PartitionInput(self.name, size)
+
+    def loaded_size(self, size):
+        """Bytes a loader whose file has size bytes holds in memory, override when the file tells more"""
+        return size
+
     def get_file_path(self):
         if haystack_pref.preferences().haystack_remote:
             return str(self.file_path_remote)
@@ -224,37 +832,40 @@ class HayStackBaseNode(Node):
         if not tree.auto_generate_code:
             return
         
-        # Check if this node is the active node in any node editor
-        for area in context.screen.areas:
-            if area.type == 'NODE_EDITOR':
-                for space in area.spaces:
-                    if space.type == 'NODE_EDITOR' and space.tree_type == 'HayStackComposerTreeType':
-                        if space.edit_tree == tree and space.edit_tree.nodes.active == self:
-                            node = self
-
-                            # Generate code for the selected node
-                            code_lines = []
-                            
-                            try:
-                                node_code = node.generate_code_interactive(auto_gen_enabled=True)
-                                code_lines.extend(node_code)
-                            except Exception as e:
-                                self.report({'ERROR'}, f"Error generating code: {str(e)}")
-                                return {'CANCELLED'}
-                            
-                            code = "\n".join(code_lines)
-                            
-                            # Create or get text block
-                            text_name = f"{tree.name}_command_node.cmd"
-                            if text_name in bpy.data.texts:
-                                text = bpy.data.texts[text_name]
-                                text.clear()
-                            else:
-                                text = bpy.data.texts.new(text_name)
-                            
-                            text.write(code)                            
-
-                            return
+        # Check if this node is the active node in any node editor of any window
+        if not any(space.edit_tree == tree and tree.nodes.active == self for space in composer_spaces()):
+            return
+        node = self
+
+        # Skip regeneration if neither this node nor any upstream node changed
+        text_name = f"{tree.name}_command_node.cmd"
+        fingerprint = (node.name, tree.subgraph_fingerprint(node))
+        if _auto_generate_fingerprints.get(tree.name) == fingerprint and text_name in bpy.data.texts:
+            return
+
+        # Generate code for the selected node
+        code_lines = []
+        
+        try:
+            node_code = node.generate_code_interactive(auto_gen_enabled=True)
+            code_lines.extend(node_code)
+        except Exception as e:
+            self.report({'ERROR'}, f"Error generating code: {str(e)}")
+            return {'CANCELLED'}
+        
+        code = "\n".join(code_lines)
+        _auto_generate_fingerprints[tree.name] = fingerprint
+
+        # Create or get text block, rewrite it only if the code differs
+        if text_name in bpy.data.texts:
+            text = bpy.data.texts[text_name]
+            if text.as_string() == code:
+                return
+            text.clear()
+        else:
+            text = bpy.data.texts.new(text_name)
+        
+        text.write(code)
 
 
 # def update_property(self, context):
@@ -320,6 +931,88 @@ class HAYSTACK_OT_GenerateCodeNode(Operator):
         self.report({'INFO'}, f"Generated code for node '{node.name}' in text block '{text_name}'")
         return {'FINISHED'}
 
+##################################
+# Remote connection
+##################################
+
+# SSH and local backends keep their sessions between operator calls
+_remote_backends = {}
+
+def braas_hpc_connection():
+    """Return (connection key, run) for the active BRaaS-HPC cluster preset
+
+    run(command) executes a remote shell command and returns its output.
+    Raises ImportError if the BRaaS-HPC addon is not available.
+    """
+    import braas_hpc
+
+    raas_pref = braas_hpc.raas_pref.preferences()
+    preset = raas_pref.cluster_presets[bpy.context.scene.raas_cluster_presets_index]
+    ssh_server_name = braas_hpc.raas_config.GetServerFromType(preset.cluster_name.upper())
+
+    def run(command):
+        return braas_hpc.raas_connection.ssh_command_sync(ssh_server_name, command, preset)
+
+    return (bpy.context.scene.raas_cluster_presets_index, ssh_server_name, preset.cluster_name), run
+
+def get_remote_backend():
+    """Return the remote filesystem backend selected in the preferences
+
+    Raises ImportError if the BRaaS-HPC backend is selected and the addon is not available.
+    """
+    pref = haystack_pref.preferences()
+
+    if pref.haystack_remote_backend == 'SSH':
+        options = ("-i", bpy.path.abspath(pref.haystack_remote_ssh_identity)) if pref.haystack_remote_ssh_identity else ()
+        key = ("ssh", pref.haystack_remote_ssh_destination, options, pref.haystack_remote_ssh_pool_size)
+        if key not in _remote_backends:
+            # Changed settings replace the pool, close the sessions of the old one
+            for stale_key in [stale_key for stale_key in _remote_backends if stale_key[0] == "ssh"]:
+                _remote_backends.pop(stale_key).close()
+            _remote_backends[key] = haystack_remote.SSHPoolBackend(
+                pref.haystack_remote_ssh_destination, options, size=pref.haystack_remote_ssh_pool_size)
+        backend = _remote_backends[key]
+        backend.timeout = pref.haystack_remote_ssh_timeout or None
+        return backend
+
+    if pref.haystack_remote_backend == 'LOCAL':
+        key = ("local", bpy.path.abspath(pref.haystack_remote_local_root))
+        if key not in _remote_backends:
+            _remote_backends[key] = haystack_remote.LocalBackend(key[1])
+        return _remote_backends[key]
+
+    return haystack_remote.BraasHpcBackend(*braas_hpc_connection())
+
+def close_remote_backends():
+    for backend in _remote_backends.values():
+        backend.close()
+    _remote_backends.clear()
+
+##################################
+# Asynchronous remote listing
+##################################
+
+_remote_listing = haystack_remote.ListingWorker()
+
+def remote_listing_timer():
+    """Move remote listing results into the scene list on the main thread"""
+    scene = bpy.context.scene
+    entries, done, error = _remote_listing.poll()
+
+    for name, is_directory in entries:
+        item = scene.haystack_remote_list.add()
+        item.Name = name
+        item.is_directory = is_directory
+
+    if done:
+        scene.haystack_remote_loading = False
+        scene.haystack_remote_error = error or ""
+
+    if entries or done:
+        tag_node_editors()
+
+    return None if done else 0.05
+
 class HAYSTACK_OT_update_remote_files(Operator):
     bl_idname = 'haystack_composer.update_remote_files'
     bl_label = 'Update remote files'
@@ -332,6 +1025,12 @@ class HAYSTACK_OT_update_remote_files(Operator):
         default=True
         ) # type: ignore
 
+    refresh : BoolProperty(
+        name="Refresh",
+        description="Re-list the current remote path, bypassing the listing cache",
+        default=False
+        ) # type: ignore
+
     active_node: None     
 
     def execute(self, context):
@@ -341,7 +1040,9 @@ class HAYSTACK_OT_update_remote_files(Operator):
             context.scene.haystack_remote_list.clear()
             context.scene.haystack_remote_list_index = -1
 
-            if self.name == "..":
+            if self.refresh:
+                pass
+            elif self.name == "..":
                 if context.scene.haystack_remote_path[len(context.scene.haystack_remote_path) - 1] == "/":
                     context.scene.haystack_remote_path = os.path.dirname(context.scene.haystack_remote_path)
 
@@ -360,42 +1061,22 @@ class HAYSTACK_OT_update_remote_files(Operator):
 
             # Check BRaaS HPC addon
             try:
-                import braas_hpc
-
-                pref = braas_hpc.raas_pref.preferences()
-                preset = pref.cluster_presets[bpy.context.scene.raas_cluster_presets_index]
-                ssh_server_name = braas_hpc.raas_config.GetServerFromType(preset.cluster_name.upper())    
+                backend = get_remote_backend()
 
             except ImportError:
                 self.report({'ERROR'}, "BRAAS HPC addon not found. Please install and enable it.")
                 return {'CANCELLED'}                         
 
-            #folders
-            try:
-                remote_file_list = braas_hpc.raas_connection.ssh_command_sync(ssh_server_name, " ls -p " + context.scene.haystack_remote_path + " | grep -e /", preset)
-                lines = remote_file_list.split('\n')
-
-                for line in lines:
-                    if len(line) > 0:
-                        item = context.scene.haystack_remote_list.add()
-                        item.Name = line
-                        item.is_directory = True
-            except:
-                pass
-
-            #files
-            try:
-                remote_file_list = braas_hpc.raas_connection.ssh_command_sync(ssh_server_name, " ls -p " + context.scene.haystack_remote_path + " | grep -v /", preset)
-                lines = remote_file_list.split('\n')
+            _remote_listing.cache.configure(pref.haystack_remote_cache_size, pref.haystack_remote_cache_ttl)
+            _remote_listing.prefetch = pref.haystack_remote_prefetch
 
-                for line in lines:
-                    if len(line) > 0:
-                        item = context.scene.haystack_remote_list.add()
-                        item.Name = line
-                        item.is_directory = False
+            # folders and files are listed on a background thread, a newer request supersedes this one
+            context.scene.haystack_remote_loading = True
+            context.scene.haystack_remote_error = ""
+            _remote_listing.request(backend, str(context.scene.haystack_remote_path), refresh=self.refresh)
 
-            except:
-                pass
+            if not bpy.app.timers.is_registered(remote_listing_timer):
+                bpy.app.timers.register(remote_listing_timer, first_interval=0.05)
 
             try:
                 if context.active_node is not None and isinstance(context.active_node, HayStackBaseNode) and pref.haystack_remote:
@@ -412,6 +1093,196 @@ class HAYSTACK_OT_update_remote_files(Operator):
 
         return {"FINISHED"}
     
+##################################
+# Remote dataset index
+##################################
+
+REMOTE_INDEX_EXTENSIONS = {
+    'UMESH': ".umesh",
+    'OBJ': ".obj",
+    'MINI': ".mini",
+    'RAW': ".raw",
+    'NVDB': ".nvdb",
+    'TRI': ".tri",
+}
+
+# index file -> loaded haystack_remote.DatasetIndex
+_remote_indexes = {}
+
+# (BackgroundTask, index file) of the running crawl
+_remote_index_task = None
+
+def remote_index_file(connection_key, root):
+    """Location of the on-disk index of a remote root"""
+    directory = bpy.utils.user_resource('CONFIG', path=os.path.join(haystack_pref.ADDON_NAME, "remote_index"), create=True)
+    name = hashlib.sha1(repr((connection_key, haystack_remote.normalize_dir(root))).encode("utf-8")).hexdigest()
+    return os.path.join(directory, name + ".tsv.gz")
+
+def get_remote_index(index_file):
+    index = _remote_indexes.get(index_file)
+    if index is None and os.path.exists(index_file):
+        try:
+            index = haystack_remote.DatasetIndex.load(index_file)
+        except Exception as e:
+            print(f"Remote index error: {str(e)}")
+            return None
+        _remote_indexes[index_file] = index
+    return index
+
+def haystack_index_search(self, context):
+    """Run the local search, update callback of the search properties"""
+    scene = context.scene
+    scene.haystack_index_hits.clear()
+    scene.haystack_index_hits_index = -1
+
+    try:
+        backend = get_remote_backend()
+    except ImportError:
+        return
+
+    index = get_remote_index(remote_index_file(backend.key, scene.haystack_index_root))
+    if index is None:
+        return
+
+    extensions = [REMOTE_INDEX_EXTENSIONS[key] for key in scene.haystack_index_extensions]
+    for path, size, mtime in index.search(scene.haystack_index_query, extensions, fuzzy=scene.haystack_index_fuzzy):
+        item = scene.haystack_index_hits.add()
+        item.path = index.root + path
+        item.size = f"{size / (1024 * 1024):.1f} MiB"
+
+def remote_index_timer():
+    """Swap in the index built on the background thread"""
+    global _remote_index_task
+
+    task, index_file = _remote_index_task
+    if not task.done():
+        return 0.2
+
+    scene = bpy.context.scene
+    scene.haystack_index_busy = False
+    _remote_index_task = None
+
+    if task.error is not None:
+        scene.haystack_index_status = f"Indexing failed: {task.error}"
+    else:
+        _remote_indexes[index_file] = task.result
+        scene.haystack_index_status = f"{len(task.result)} files indexed"
+        haystack_index_search(scene, bpy.context)
+
+    tag_node_editors()
+
+    return None
+
+class HAYSTACK_OT_remote_index_build(Operator):
+    """Crawl the remote root with one bulk listing and store the index locally"""
+    bl_idname = 'haystack_composer.remote_index_build'
+    bl_label = 'Build Index'
+
+    refresh : BoolProperty(
+        name="Refresh",
+        description="Only fetch files and directories modified since the last crawl",
+        default=False
+        ) # type: ignore
+
+    @classmethod
+    def poll(cls, context):
+        return _remote_index_task is None
+
+    def execute(self, context):
+        global _remote_index_task
+
+        try:
+            backend = get_remote_backend()
+        except ImportError:
+            self.report({'ERROR'}, "BRAAS HPC addon not found. Please install and enable it.")
+            return {'CANCELLED'}
+
+        root = context.scene.haystack_index_root
+        index_file = remote_index_file(backend.key, root)
+        refresh = self.refresh
+
+        def build():
+            # Work on a private copy, the main thread keeps searching the current one
+            index = None
+            if refresh and os.path.exists(index_file):
+                index = haystack_remote.DatasetIndex.load(index_file)
+            if index is None:
+                index = haystack_remote.DatasetIndex(root)
+                index.crawl(backend)
+            else:
+                index.refresh(backend)
+            index.save(index_file)
+            return index
+
+        _remote_index_task = (haystack_remote.BackgroundTask(build), index_file)
+        context.scene.haystack_index_busy = True
+        context.scene.haystack_index_status = "Indexing..."
+        bpy.app.timers.register(remote_index_timer, first_interval=0.2)
+
+        return {'FINISHED'}
+
+class HAYSTACK_OT_remote_index_select(Operator):
+    """Use the file on the active node"""
+    bl_idname = 'haystack_composer.remote_index_select'
+    bl_label = 'Select Remote File'
+
+    path : StringProperty(
+        default=""
+        ) # type: ignore
+
+    def execute(self, context):
+        node = context.active_node
+        if node is None or not isinstance(node, HayStackBaseNode) or not hasattr(node, 'file_path_remote'):
+            self.report({'ERROR'}, "Active node has no remote file path")
+            return {'CANCELLED'}
+
+        node.file_path_remote = self.path
+        context.scene.haystack_remote_path = os.path.dirname(self.path) + "/"
+        return {'FINISHED'}
+
+class HAYSTACK_PG_remote_index_hit(PropertyGroup):
+    path : StringProperty(
+        name="Path"
+        ) # type: ignore
+
+    size : StringProperty(
+        name="Size"
+        ) # type: ignore
+
+class HAYSTACK_UL_remote_index_hits(UIList):
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname):
+        row = layout.row(align=True)
+        op = row.operator("haystack_composer.remote_index_select", text=os.path.basename(item.path), icon='FILE_BLEND')
+        op.path = item.path
+        row.label(text=item.size)
+
+class HAYSTACK_PT_remote_index(Panel):
+    bl_space_type = 'NODE_EDITOR'
+    bl_region_type = 'UI'
+    bl_category = "Node"
+    bl_label = "Remote Search"
+    bl_parent_id = "HAYSTACK_PT_remote_file_path_node"
+
+    def draw(self, context):
+        layout = self.layout
+        scene = context.scene
+
+        col = layout.column()
+        col.prop(scene, "haystack_index_root")
+        row = col.row(align=True)
+        row.operator("haystack_composer.remote_index_build", icon='VIEWZOOM')
+        op = row.operator("haystack_composer.remote_index_build", text="Refresh", icon='FILE_REFRESH')
+        op.refresh = True
+        if scene.haystack_index_status:
+            col.label(text=scene.haystack_index_status, icon='SORTTIME' if scene.haystack_index_busy else 'INFO')
+
+        col.separator()
+        col.prop(scene, "haystack_index_query", icon='VIEWZOOM')
+        row = col.row(align=True)
+        row.prop(scene, "haystack_index_extensions")
+        col.prop(scene, "haystack_index_fuzzy")
+        col.template_list("HAYSTACK_UL_remote_index_hits", "", scene, "haystack_index_hits", scene, "haystack_index_hits_index")
+
 class HAYSTACK_PG_remote_files(PropertyGroup):
     Name : StringProperty(
         name="Name"
@@ -425,7 +1296,7 @@ class HAYSTACK_UL_remote_files(UIList):
     def draw_item(self, context, layout, data, item, icon, active_data, active_propname):
         #row = layout.row()
         #row.label(text=item.Name)
-        op = layout.operator("haystack.update_remote_files", text=item.Name, icon='FILE_FOLDER' if item.is_directory else 'FILE_BLEND')
+        op = layout.operator("haystack_composer.update_remote_files", text=item.Name, icon='FILE_FOLDER' if item.is_directory else 'FILE_BLEND')
         op.name = item.Name
         op.is_directory = item.is_directory
 
@@ -446,7 +1317,12 @@ class HAYSTACK_PT_remote_file_path_node(Panel):
 
         col = layout.column()
         col.prop(context.scene, "haystack_remote_path")
-        col.operator("haystack.update_remote_files")
+        op = col.operator("haystack_composer.update_remote_files", icon='FILE_REFRESH')
+        op.refresh = True
+        if context.scene.haystack_remote_loading:
+            col.label(text="Loading...", icon='SORTTIME')
+        elif context.scene.haystack_remote_error:
+            col.label(text=f"Listing failed: {context.scene.haystack_remote_error}", icon='ERROR')
         col.template_list("HAYSTACK_UL_remote_files", "", context.scene, "haystack_remote_list", context.scene, "haystack_remote_list_index")
 
 
@@ -470,6 +1346,28 @@ class HAYSTACK_PT_ComposerPanel(Panel):
         # Code generation buttons
         layout.operator(HAYSTACK_OT_GenerateCodeTree.bl_idname, icon='FILE_SCRIPT')
 
+        if tree:
+            row = layout.row(align=True)
+            row.prop(tree, "preflight_files")
+            row.operator("haystack_composer.preflight_tree", text="", icon='FILE_REFRESH')
+
+        scene = context.scene
+        if scene.haystack_preflight_status:
+            col = layout.box().column(align=True)
+            col.label(text=scene.haystack_preflight_status, icon='CHECKMARK' if len(scene.haystack_preflight_issues) == 0 else 'INFO')
+            for issue in scene.haystack_preflight_issues:
+                col.label(text=f"{issue.node_name}: {issue.message}", icon='ERROR' if issue.severity == haystack_preflight.SEVERITY_ERROR else 'QUESTION')
+
+        row = layout.row(align=True)
+        row.operator("haystack_composer.recommend_num_parts", icon='MOD_EXPLODE')
+        op = row.operator("haystack_composer.recommend_num_parts", text="Apply")
+        op.apply = True
+        if scene.haystack_parts_status:
+            col = layout.box().column(align=True)
+            col.label(text=scene.haystack_parts_status)
+            for advice in scene.haystack_parts_advice:
+                col.label(text=f"{advice.node_name}: {advice.parts} parts of {advice.part_size}")
+
         box = layout.box()
         
         active_node = tree.nodes.active if tree else None
@@ -483,7 +1381,6 @@ class HAYSTACK_PT_ComposerPanel(Panel):
         # Auto-generate checkbox
         if tree:
             #box.separator()            
-            col.prop(tree, "auto_generate_code_fps", text="Auto Generate Node Code FPS")
             col.prop(tree, "auto_generate_code", text="Auto Generate Node Code")
 
         col.separator()
@@ -512,10 +1409,11 @@ class HayStackLoadUMeshNode(HayStackBaseNode):
     def initNode(self, context):
         self.outputs.new('HayStackCommandSocketType', 'Command')        
     
+    def to_command(self):
+        return haystack_command.LoaderCommand(self.get_file_path())
+
     def generate_code(self):
-        command = []
-        command.append(self.get_file_path())
-        return command
+        return self.to_command().tokens()
 
     def draw_buttons(self, context, layout):        
          self.draw_file_path(layout)
@@ -542,10 +1440,11 @@ class HayStackLoadOBJNode(HayStackBaseNode):
     def initNode(self, context):
         self.outputs.new('HayStackCommandSocketType', 'Command')        
     
+    def to_command(self):
+        return haystack_command.LoaderCommand(self.get_file_path())
+
     def generate_code(self):
-        command = []
-        command.append(self.get_file_path())
-        return command
+        return self.to_command().tokens()
 
     def draw_buttons(self, context, layout):        
          self.draw_file_path(layout)
@@ -573,18 +1472,179 @@ class HayStackLoadMiniNode(HayStackBaseNode):
     def initNode(self, context):
         self.outputs.new('HayStackCommandSocketType', 'Command')        
     
+    def to_command(self):
+        return haystack_command.LoaderCommand(self.get_file_path())
+
     def generate_code(self):
-        command = []
-        command.append(self.get_file_path())
-        return command
+        return self.to_command().tokens()
 
     def draw_buttons(self, context, layout):        
          self.draw_file_path(layout)
 
 
+#################################################Preview###################################################################
+PREVIEW_NODE_GROUP = "HayStack Preview Points"
+PREVIEW_MODIFIER = "HayStack Preview"
+
+# (BackgroundTask, tree name, node name) of the running preview sampling
+_preview_task = None
+
+# Status of the last preview per (tree name, node name)
+_preview_status = {}
+
+def get_preview_node_group():
+    """Geometry nodes turning the preview vertices into points of their haystack_radius"""
+    group = bpy.data.node_groups.get(PREVIEW_NODE_GROUP)
+    if group is not None:
+        return group
+
+    group = bpy.data.node_groups.new(PREVIEW_NODE_GROUP, 'GeometryNodeTree')
+    group.interface.new_socket("Geometry", in_out='INPUT', socket_type='NodeSocketGeometry')
+    group.interface.new_socket("Geometry", in_out='OUTPUT', socket_type='NodeSocketGeometry')
+
+    nodes = group.nodes
+    group_input = nodes.new('NodeGroupInput')
+    group_output = nodes.new('NodeGroupOutput')
+    to_points = nodes.new('GeometryNodeMeshToPoints')
+    radius = nodes.new('GeometryNodeInputNamedAttribute')
+    radius.data_type = 'FLOAT'
+    radius.inputs["Name"].default_value = "haystack_radius"
+
+    group_input.location = (-400, 0)
+    radius.location = (-400, -150)
+    group_output.location = (200, 0)
+
+    group.links.new(group_input.outputs[0], to_points.inputs["Mesh"])
+    group.links.new(radius.outputs["Attribute"], to_points.inputs["Radius"])
+    group.links.new(to_points.outputs["Points"], group_output.inputs[0])
+    return group
+
+def build_point_preview(name, sample, collection):
+    """Create or update the preview object of a PointSample, all data is set with bulk foreach_set"""
+    mesh = bpy.data.meshes.get(name)
+    if mesh is None:
+        mesh = bpy.data.meshes.new(name)
+    else:
+        mesh.clear_geometry()
+
+    mesh.vertices.add(len(sample))
+    mesh.vertices.foreach_set("co", sample.positions.ravel())
+
+    attributes = [("haystack_radius", sample.radii)]
+    if sample.values is not None:
+        attributes.append(("haystack_value", sample.values))
+    for attribute_name, values in attributes:
+        attribute = mesh.attributes.get(attribute_name)
+        if attribute is not None:
+            mesh.attributes.remove(attribute)
+        mesh.attributes.new(attribute_name, 'FLOAT', 'POINT').data.foreach_set("value", values)
+    mesh.update()
+
+    obj = bpy.data.objects.get(name)
+    if obj is None:
+        obj = bpy.data.objects.new(name, mesh)
+        collection.objects.link(obj)
+    else:
+        obj.data = mesh
+
+    modifier = obj.modifiers.get(PREVIEW_MODIFIER)
+    if modifier is None:
+        modifier = obj.modifiers.new(PREVIEW_MODIFIER, 'NODES')
+    modifier.node_group = get_preview_node_group()
+    return obj
+
+def preview_timer():
+    """Build the preview object of the finished sampling"""
+    global _preview_task
+
+    if _preview_task is None:
+        return None
+    task, tree_name, node_name = _preview_task
+    if not task.done():
+        return 0.2
+    _preview_task = None
+
+    key = (tree_name, node_name)
+    if task.error is not None:
+        _preview_status[key] = f"Preview failed: {task.error}"
+    else:
+        sample = task.result
+        build_point_preview(f"HS_{tree_name}_{node_name}", sample, bpy.context.scene.collection)
+        _preview_status[key] = f"{len(sample):,} of {sample.total:,} records"
+
+    tag_node_editors(('NODE_EDITOR', 'VIEW_3D'))
+
+    return None
+
+class HAYSTACK_OT_preview_points(Operator):
+    """Memory-map the local file and show a subsampled level of detail as a point cloud object"""
+    bl_idname = 'haystack_composer.preview_points'
+    bl_label = 'Preview'
+
+    @classmethod
+    def poll(cls, context):
+        return _preview_task is None
+
+    def execute(self, context):
+        global _preview_task
+
+        node = context.node
+        path = bpy.path.abspath(node.file_path)
+        if not os.path.isfile(path):
+            self.report({'ERROR'}, f"Local file of '{node.name}' not found, remote files can not be previewed.")
+            return {'CANCELLED'}
+
+        task = haystack_remote.BackgroundTask(
+            haystack_preview.sample_records, path, node.preview_kind(), node.preview_budget,
+            node.preview_sampling, node.preview_radius()
+        )
+        _preview_task = (task, node.id_data.name, node.name)
+        _preview_status[(node.id_data.name, node.name)] = "Sampling..."
+        bpy.app.timers.register(preview_timer, first_interval=0.2)
+
+        return {"FINISHED"}
+
+class HayStackPointPreview:
+    """Point budget and sampling of the preview of point-like loaders"""
+    preview_properties = ('preview_budget', 'preview_sampling')
+
+    preview_budget: IntProperty(
+        name="Budget",
+        description="Most points shown in the preview",
+        default=1000000,
+        min=1
+    ) # type: ignore
+
+    preview_sampling: EnumProperty(
+        name="Sampling",
+        items=[
+            (haystack_preview.SAMPLING_STRIDED, "Strided", "Every n-th record"),
+            (haystack_preview.SAMPLING_RANDOM, "Random", "Random records, avoids patterns of the file order"),
+        ],
+        default=haystack_preview.SAMPLING_STRIDED
+    ) # type: ignore
+
+    def preview_kind(self):
+        """Key of haystack_preview.RECORD_DTYPES of the file"""
+        raise NotImplementedError
+
+    def preview_radius(self):
+        return 1.0
+
+    def draw_preview(self, context, layout):
+        if haystack_pref.preferences().haystack_remote:
+            return
+        row = layout.row(align=True)
+        row.prop(self, "preview_budget")
+        row.prop(self, "preview_sampling", text="")
+        layout.operator("haystack_composer.preview_points", icon='OUTLINER_OB_POINTCLOUD')
+        status = _preview_status.get((self.id_data.name, self.name))
+        if status:
+            layout.label(text=status)
+
 #spheres://1@/cluster/priya/105000.p4:format=xyzi:radius=1
 # Spheres
-class HayStackLoadSpheresNode(HayStackBaseNode):
+class HayStackLoadSpheresNode(HayStackBaseNode, HayStackPointPreview):
     bl_idname = 'HayStackLoadSpheresNodeType'
     bl_label = 'Spheres'
     bl_description = 'a file of raw spheres'
@@ -631,18 +1691,24 @@ class HayStackLoadSpheresNode(HayStackBaseNode):
     def initNode(self, context):
         self.outputs.new('HayStackCommandSocketType', 'Command')                
     
-    def generate_code(self):
-        command = []
-        command.append("spheres://")
-        command.append(str(self.num_parts))
-        command.append("@")
-        command.append(self.get_file_path())
-        command.append(":format=")
-        command.append(str(self.format.lower()))
-        command.append(":radius=")
-        command.append(str(self.radius))
+    def to_command(self):
+        command = haystack_command.LoaderCommand(self.get_file_path(), scheme="spheres://", num_parts=self.num_parts)
+        command.add_option("format", self.format.lower())
+        command.add_option("radius", self.radius)
         return command
-        
+
+    def partition_input(self, size):
+        return haystack_plan.PartitionInput(self.name, size, haystack_plan.spheres_max_parts(size, self.format.lower()))
+
+    def preview_kind(self):
+        return self.format.lower()
+
+    def preview_radius(self):
+        return self.radius
+
+    def generate_code(self):
+        return self.to_command().tokens()
+
     def draw_buttons(self, context, layout):
         # layout.use_property_split = True
         # layout.use_property_decorate = False  # No animation.
@@ -654,6 +1720,8 @@ class HayStackLoadSpheresNode(HayStackBaseNode):
         row.prop(self, "format")
         row.prop(self, "radius")
 
+        self.draw_preview(context, layout)
+
 
 # TSTri
 class HayStackLoadTSTriNode(HayStackBaseNode):
@@ -677,11 +1745,11 @@ class HayStackLoadTSTriNode(HayStackBaseNode):
     def initNode(self, context):
         self.outputs.new('HayStackCommandSocketType', 'Command')        
     
+    def to_command(self):
+        return haystack_command.LoaderCommand(self.get_file_path(), scheme="ts.tri://")
+
     def generate_code(self):
-        command = []
-        command.append("ts.tri://")
-        command.append(self.get_file_path())
-        return command
+        return self.to_command().tokens()
 
     def draw_buttons(self, context, layout):
         self.draw_file_path(layout)
@@ -722,21 +1790,26 @@ class HayStackLoadNanoVDBNode(HayStackBaseNode):
     def initNode(self, context):
         self.outputs.new('HayStackCommandSocketType', 'Command')        
     
-    def generate_code(self):
-        command = []
-        command.append("nvdb://")
-        command.append(self.get_file_path())
+    def to_command(self):
+        command = haystack_command.LoaderCommand(self.get_file_path(), scheme="nvdb://")
         
         if self.spacingEnable:
-            command.append(":spacing=")
-            command.append(str(self.spacing[0]))
-            command.append(",")
-            command.append(str(self.spacing[1]))
-            command.append(",")
-            command.append(str(self.spacing[2]))
+            command.add_option("spacing", *self.spacing)
         
         return command
 
+    def generate_code(self):
+        return self.to_command().tokens()
+
+    def loaded_size(self, size):
+        # The grid buffers, larger than the file when the grids are compressed
+        if haystack_pref.preferences().haystack_remote:
+            return size
+        info = inspect_nanovdb(self)
+        if not isinstance(info, haystack_nanovdb.NanoVDBInfo) or not info.grids:
+            return size
+        return info.grid_bytes
+
     def draw_buttons(self, context, layout):
         self.draw_file_path(layout)
 
@@ -745,8 +1818,210 @@ class HayStackLoadNanoVDBNode(HayStackBaseNode):
         if self.spacingEnable:
             row.prop(self, "spacing")
 
-#raw://4@/home/wald/models/magnetic-512-volume/magnetic-512-volume.raw:format=float:dims=512,512,512
+        if not haystack_pref.preferences().haystack_remote:
+            self.draw_inspection(layout)
+
+    def draw_inspection(self, layout):
+        info = inspect_nanovdb(self)
+        if info is None:
+            return
+
+        col = layout.column(align=True)
+        if isinstance(info, str):
+            col.label(text=info, icon='ERROR')
+            return
+
+        col.label(text=f"{len(info.grids)} grid(s), {info.grid_bytes / 1024 ** 2:.1f} MiB in memory")
+        for grid in info.grids:
+            box = col.box().column(align=True)
+            dims = grid.dims
+            box.label(text=f"{grid.name or '(unnamed)'}: {grid.type_name} {grid.class_name}")
+            box.label(text=f"{dims[0]}x{dims[1]}x{dims[2]} at {tuple(grid.index_bbox[0])}")
+            box.label(text="Voxel " + " ".join(f"{v:g}" for v in grid.voxel_size) + f", {grid.voxel_count} active")
+            text = f"{grid.grid_size / 1024 ** 2:.1f} MiB"
+            if grid.codec:
+                text += f" ({grid.file_size / 1024 ** 2:.1f} MiB {grid.codec_name})"
+            box.label(text=text)
+
+        spacing = info.suggested_spacing()
+        if spacing is not None and (not self.spacingEnable or any(abs(a - b) > 1e-6 * max(abs(b), 1.0) for a, b in zip(self.spacing, spacing))):
+            op = col.operator("haystack_composer.nanovdb_apply_spacing", text="Spacing " + " ".join(f"{v:g}" for v in spacing), icon='LIGHT')
+            op.spacing = spacing
+
+# Inspections of local NanoVDB files, keyed by file identity
+_nanovdb_inspections = {}
+
+def inspect_nanovdb(node):
+    """Cached haystack_nanovdb.read_nanovdb() of the local file of a NanoVDB node
+
+    None without a file, the error message when the file is not a readable NanoVDB file.
+    Cheap enough to call from draw: a stat per call, the headers are only read again when
+    the file changes.
+    """
+    path = bpy.path.abspath(node.file_path)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    info = _nanovdb_inspections.get(key)
+    if info is None:
+        try:
+            info = haystack_nanovdb.read_nanovdb(path)
+        except (OSError, ValueError) as e:
+            info = str(e)
+        if len(_nanovdb_inspections) > 256:
+            _nanovdb_inspections.clear()
+        _nanovdb_inspections[key] = info
+    return info
+
+class HAYSTACK_OT_nanovdb_apply_spacing(Operator):
+    """Use the voxel size stored in the NanoVDB file as spacing"""
+    bl_idname = 'haystack_composer.nanovdb_apply_spacing'
+    bl_label = 'Apply Spacing'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    spacing: FloatVectorProperty(
+        size=3
+    ) # type: ignore
+
+    def execute(self, context):
+        node = context.node
+        node.spacingEnable = True
+        node.spacing = self.spacing
+        return {"FINISHED"}
+
+#raw://4@/home/wald/models/magnetic-512-volume/magnetic-512-volume.raw:format=float:dims=512,512,512
 # RAWVolume
+
+# Inspections of local raw volumes, keyed by file identity and declared layout
+_raw_inspections = {}
+
+def inspect_raw_volume(node):
+    """Cached haystack_raw.inspect_raw() of the local file of a RAWVolume node, None without a file
+
+    Cheap enough to call from draw: a stat per call, the file is only mapped when it or
+    the layout changes.
+    """
+    path = bpy.path.abspath(node.file_path)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    extract = tuple(node.extract) if node.extractEnable else None
+    key = (path, stat.st_size, stat.st_mtime_ns, node.format, tuple(node.dims), node.channels, extract)
+    inspection = _raw_inspections.get(key)
+    if inspection is None:
+        try:
+            inspection = haystack_raw.inspect_raw(path, node.format.lower(), node.dims, node.channels, extract)
+        except OSError:
+            return None
+        if len(_raw_inspections) > 256:
+            _raw_inspections.clear()
+        _raw_inspections[key] = inspection
+    return inspection
+
+class HAYSTACK_OT_raw_apply_layout(Operator):
+    """Use this format and dims for the RAW volume"""
+    bl_idname = 'haystack_composer.raw_apply_layout'
+    bl_label = 'Apply Layout'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    format: StringProperty() # type: ignore
+
+    dims: IntVectorProperty(
+        size=3
+    ) # type: ignore
+
+    channels: IntProperty(
+        default=1
+    ) # type: ignore
+
+    def execute(self, context):
+        node = context.node
+        node.format = self.format.upper()
+        node.dims = self.dims
+        node.channels = self.channels
+        return {"FINISHED"}
+
+# Status of the last previewed slice per (tree name, node name)
+_slice_status = {}
+
+# Grey ramp over the slice value range, used without a transfer function
+_GRAY_COLORMAP = np.column_stack([np.repeat(np.linspace(0.0, 1.0, 256)[:, np.newaxis], 3, axis=1),
+                                  np.ones(256)]).astype(np.float32)
+
+def find_volume_tf(node):
+    """Transfer function node of a RAWVolume node: the one scanning it, else the first with a material"""
+    tf_nodes = [tf for tf in node.id_data.nodes if isinstance(tf, HayStackTransferFunctionNode) and tf.material is not None]
+    return next((tf for tf in tf_nodes if tf.volume_node == node.name), tf_nodes[0] if tf_nodes else None)
+
+def render_raw_slice(node):
+    """Map the selected slice of a RAWVolume node through the tree's transfer function into its preview image"""
+    key = (node.id_data.name, node.name)
+    path = bpy.path.abspath(node.file_path)
+    if not os.path.isfile(path):
+        _slice_status[key] = "Local file not found"
+        return None
+
+    extract = tuple(node.extract) if node.extractEnable else None
+    axis = node.slice_axis.lower()
+    size = node.dims[haystack_raw.SLICE_AXES.index(axis)] - (extract[haystack_raw.SLICE_AXES.index(axis)] if extract else 0)
+    index = max(0, min(node.slice_index, size - 1))
+    try:
+        data = haystack_raw.slice_raw(path, node.format.lower(), tuple(node.dims), node.channels, axis, index,
+                                      min(node.slice_channel, node.channels - 1), extract)
+    except (OSError, ValueError) as e:
+        _slice_status[key] = str(e)
+        return None
+
+    finite = data[np.isfinite(data)] if data.dtype.kind == 'f' else data
+    low, high = (float(finite.min()), float(finite.max())) if finite.size else (0.0, 0.0)
+
+    tf = find_volume_tf(node)
+    colormap = tf.get_colormap() if tf is not None else None
+    if colormap is None:
+        rgba = haystack_xf.map_values(data, _GRAY_COLORMAP, (low, high))
+    else:
+        table, _, domain = colormap
+        rgba = haystack_xf.map_values(data, table, domain)
+
+    height, width = data.shape
+    name = f"HS_{node.id_data.name}_{node.name}_slice"
+    image = bpy.data.images.get(name)
+    if image is None:
+        image = bpy.data.images.new(name, width, height, alpha=True, float_buffer=True)
+        for window in bpy.context.window_manager.windows:
+            for area in window.screen.areas if window.screen is not None else ():
+                if area.type == 'IMAGE_EDITOR' and area.spaces.active.image is None:
+                    area.spaces.active.image = image
+    elif tuple(image.size) != (width, height):
+        image.scale(width, height)
+
+    image.pixels.foreach_set(rgba.ravel())
+    image.update()
+
+    _slice_status[key] = f"{axis} {index}: values {low:g} .. {high:g}" + (f", TF {tf.name}" if colormap is not None else "")
+    return image
+
+def update_slice_preview(self, context):
+    if self.slice_preview:
+        render_raw_slice(self)
+
+class HAYSTACK_OT_raw_preview_slice(Operator):
+    """Show the selected slice of the local volume through the transfer function in an image"""
+    bl_idname = 'haystack_composer.raw_preview_slice'
+    bl_label = 'Preview Slice'
+
+    def execute(self, context):
+        node = context.node
+        if render_raw_slice(node) is None:
+            self.report({'ERROR'}, _slice_status.get((node.id_data.name, node.name), "No slice"))
+            return {'CANCELLED'}
+        return {"FINISHED"}
+
 class HayStackLoadRAWVolumeNode(HayStackBaseNode):
     bl_idname = 'HayStackLoadRAWVolumeNodeType'
     bl_label = 'RAWVolume'
@@ -827,43 +2102,67 @@ class HayStackLoadRAWVolumeNode(HayStackBaseNode):
         #update = update_property
     ) # type: ignore    
 
+    preview_properties = ('slice_preview', 'slice_axis', 'slice_index', 'slice_channel')
+
+    slice_preview: BoolProperty(
+        name="Live Slice",
+        description="Update the slice image while the slice settings change",
+        default=False,
+        update=update_slice_preview
+    ) # type: ignore
+
+    slice_axis: EnumProperty(
+        name="Axis",
+        items=[
+            ('X', "X", "Slice across the x axis"),
+            ('Y', "Y", "Slice across the y axis"),
+            ('Z', "Z", "Slice across the z axis"),
+        ],
+        default='Z',
+        update=update_slice_preview
+    ) # type: ignore
+
+    slice_index: IntProperty(
+        name="Slice",
+        description="Index of the slice along the axis, from the extract corner if enabled",
+        default=0,
+        min=0,
+        update=update_slice_preview
+    ) # type: ignore
+
+    slice_channel: IntProperty(
+        name="Channel",
+        default=0,
+        min=0,
+        update=update_slice_preview
+    ) # type: ignore
+
        
     
     def initNode(self, context):
         self.outputs.new('HayStackCommandSocketType', 'Command')
         self.width = 200 # Optionally adjust the default width of the node        
     
-    def generate_code(self):
-        command = []
-        command.append("raw://")
-        command.append(str(self.num_parts))
-        command.append("@")
-        command.append(self.get_file_path())
-        command.append(":format=")
-        command.append(str(self.format.lower()))
-        command.append(":dims=")
-        command.append(str(self.dims[0]))
-        command.append(",")
-        command.append(str(self.dims[1]))
-        command.append(",")
-        command.append(str(self.dims[2]))
-        command.append(":channels=")
-        command.append(str(self.channels))
+    def to_command(self):
+        command = haystack_command.LoaderCommand(self.get_file_path(), scheme="raw://", num_parts=self.num_parts)
+        command.add_option("format", self.format.lower())
+        command.add_option("dims", *self.dims)
+        command.add_option("channels", self.channels)
         
         if self.extractEnable:
-            command.append(":extract=")
-            command.append(str(self.extract[0]))
-            command.append(",")
-            command.append(str(self.extract[1]))
-            command.append(",")
-            command.append(str(self.extract[2]))
+            command.add_option("extract", *self.extract)
             
         if self.isoValueEnable:
-            command.append(":isoValue=")
-            command.append(str(self.isoValue))
+            command.add_option("isoValue", self.isoValue)
         
         return command
-        
+
+    def partition_input(self, size):
+        return haystack_plan.PartitionInput(self.name, size, haystack_plan.raw_max_parts(self.dims))
+
+    def generate_code(self):
+        return self.to_command().tokens()
+
     def draw_buttons(self, context, layout):
         # layout.use_property_split = True
         # layout.use_property_decorate = False  # No animation.
@@ -884,8 +2183,44 @@ class HayStackLoadRAWVolumeNode(HayStackBaseNode):
         if self.isoValueEnable:
             row.prop(self, "isoValue")
 
+        if not haystack_pref.preferences().haystack_remote:
+            self.draw_inspection(layout)
+            self.draw_slice(layout)
+
+    def draw_slice(self, layout):
+        col = layout.box().column(align=True)
+        row = col.row(align=True)
+        row.prop(self, "slice_preview", toggle=True)
+        row.prop(self, "slice_axis", expand=True)
+        col.prop(self, "slice_index")
+        if self.channels > 1:
+            col.prop(self, "slice_channel")
+        col.operator("haystack_composer.raw_preview_slice", icon='IMAGE_DATA')
+        status = _slice_status.get((self.id_data.name, self.name))
+        if status:
+            col.label(text=status)
+
+    def draw_inspection(self, layout):
+        inspection = inspect_raw_volume(self)
+        if inspection is None:
+            return
+
+        col = layout.column(align=True)
+        if inspection.ok:
+            col.label(text=f"Layout matches ({inspection.file_size} B)", icon='CHECKMARK')
+            return
+
+        for error in inspection.errors:
+            col.label(text=error, icon='ERROR')
+        for format, dims, channels in inspection.suggestions:
+            text = f"{format} {dims[0]}x{dims[1]}x{dims[2]}" + (f" x{channels}" if channels != 1 else "")
+            op = col.operator("haystack_composer.raw_apply_layout", text=text, icon='LIGHT')
+            op.format = format
+            op.dims = dims
+            op.channels = channels
+
 # Boxes
-class HayStackLoadBoxesNode(HayStackBaseNode):
+class HayStackLoadBoxesNode(HayStackBaseNode, HayStackPointPreview):
     bl_idname = 'HayStackLoadBoxesNodeType'
     bl_label = 'Boxes'
     bl_description = 'a file of raw boxes'
@@ -906,17 +2241,21 @@ class HayStackLoadBoxesNode(HayStackBaseNode):
     def initNode(self, context):
         self.outputs.new('HayStackCommandSocketType', 'Command')        
     
+    def to_command(self):
+        return haystack_command.LoaderCommand(self.get_file_path(), scheme="boxes://")
+
+    def preview_kind(self):
+        return "boxes"
+
     def generate_code(self):
-        command = []
-        command.append("boxes://")
-        command.append(self.get_file_path())
-        return command
+        return self.to_command().tokens()
 
     def draw_buttons(self, context, layout):
         self.draw_file_path(layout)
+        self.draw_preview(context, layout)
 
 # Cylinders
-class HayStackLoadCylindersNode(HayStackBaseNode):
+class HayStackLoadCylindersNode(HayStackBaseNode, HayStackPointPreview):
     bl_idname = 'HayStackLoadCylindersNodeType'
     bl_label = 'Cylinders'
     bl_description = 'a file of raw cylinders'
@@ -937,14 +2276,18 @@ class HayStackLoadCylindersNode(HayStackBaseNode):
     def initNode(self, context):
         self.outputs.new('HayStackCommandSocketType', 'Command')        
     
+    def to_command(self):
+        return haystack_command.LoaderCommand(self.get_file_path(), scheme="cylinders://")
+
+    def preview_kind(self):
+        return "cylinders"
+
     def generate_code(self):
-        command = []
-        command.append("cylinders://")
-        command.append(self.get_file_path())
-        return command
+        return self.to_command().tokens()
 
     def draw_buttons(self, context, layout):
         self.draw_file_path(layout)
+        self.draw_preview(context, layout)
 
 # SpatiallyPartitionedUMesh
 class HayStackLoadSpatiallyPartitionedUMeshNode(HayStackBaseNode):
@@ -968,11 +2311,11 @@ class HayStackLoadSpatiallyPartitionedUMeshNode(HayStackBaseNode):
     def initNode(self, context):
         self.outputs.new('HayStackCommandSocketType', 'Command')        
     
+    def to_command(self):
+        return haystack_command.LoaderCommand(self.get_file_path(), scheme="spumesh://")
+
     def generate_code(self):
-        command = []
-        command.append("spumesh://")
-        command.append(self.get_file_path())
-        return command
+        return self.to_command().tokens()
 
     def draw_buttons(self, context, layout):
         self.draw_file_path(layout)
@@ -993,6 +2336,123 @@ def camera_poll(self, object):
 #   fromCL.camera.vu.z = std::stof(av[++i]);
 
 #   fromCL.camera.fovy = std::stof(av[++i]);
+# Camera paths loaded from disk, absolute path -> (mtime, haystack_camera.CameraPath)
+_camera_paths = {}
+
+def load_camera_path(file_path):
+    mtime = os.path.getmtime(file_path)
+    entry = _camera_paths.get(file_path)
+    if entry is None or entry[0] != mtime:
+        entry = (mtime, haystack_camera.CameraPath.load(file_path))
+        _camera_paths[file_path] = entry
+    return entry[1]
+
+def camera_resolution(scene):
+    render = scene.render
+    return (render.resolution_x * render.pixel_aspect_x, render.resolution_y * render.pixel_aspect_y)
+
+def camera_fcurves_only(obj):
+    """True if the transform of a camera follows from its own F-Curves alone"""
+    if obj.parent is not None or len(obj.constraints) > 0 or obj.rotation_mode == 'AXIS_ANGLE':
+        return False
+    for data in (obj, obj.data):
+        if data.animation_data is not None and (len(data.animation_data.drivers) > 0 or len(data.animation_data.nla_tracks) > 0):
+            return False
+    if tuple(obj.delta_location) != (0.0, 0.0, 0.0) or tuple(obj.delta_rotation_euler) != (0.0, 0.0, 0.0):
+        return False
+    if tuple(obj.delta_rotation_quaternion) != (1.0, 0.0, 0.0, 0.0) or tuple(obj.delta_scale) != (1.0, 1.0, 1.0):
+        return False
+    return True
+
+def fcurve_values(data, data_path, frames, defaults):
+    """(N, len(defaults)) values of an animated property, unanimated channels keep their default
+
+    Keyframes are read in bulk with foreach_get and curves of LINEAR and CONSTANT keys
+    interpolated with numpy; Bezier keys and curves with modifiers are evaluated per frame.
+    """
+    values = np.tile(np.asarray(defaults, dtype=np.float64), (len(frames), 1))
+    action = data.animation_data.action if data.animation_data is not None else None
+    if action is None:
+        return values
+    for index in range(len(defaults)):
+        fcurve = action.fcurves.find(data_path, index=index)
+        if fcurve is None:
+            continue
+
+        sampled = None
+        if not fcurve.modifiers:
+            keyframes = fcurve.keyframe_points
+            points = np.empty(len(keyframes) * 2, dtype=np.float64)
+            keyframes.foreach_get("co", points)
+            sampled = haystack_camera.sample_keyframes(
+                points.reshape(-1, 2), [keyframe.interpolation for keyframe in keyframes], fcurve.extrapolation, frames)
+        if sampled is None:
+            sampled = [fcurve.evaluate(frame) for frame in frames]
+        values[:, index] = sampled
+    return values
+
+def sample_camera_path(obj, frames, scene):
+    """haystack_camera.CameraPath of a camera object over frames
+
+    Cameras animated only by their own F-Curves are evaluated without changing the scene
+    frame, otherwise every frame is set and matrix_world read back.
+    """
+    frames = list(frames)
+    camera = obj.data
+
+    if camera_fcurves_only(obj):
+        locations = fcurve_values(obj, "location", frames, obj.location)
+        scales = fcurve_values(obj, "scale", frames, obj.scale)
+        if obj.rotation_mode == 'QUATERNION':
+            rotations = haystack_camera.quaternion_matrices(fcurve_values(obj, "rotation_quaternion", frames, obj.rotation_quaternion))
+        else:
+            rotations = haystack_camera.euler_matrices(fcurve_values(obj, "rotation_euler", frames, obj.rotation_euler), obj.rotation_mode)
+        matrices = haystack_camera.compose_matrices(locations, rotations, scales)
+        lenses = fcurve_values(camera, "lens", frames, (camera.lens,))[:, 0]
+    else:
+        current = scene.frame_current
+        matrices = np.empty((len(frames), 4, 4))
+        lenses = np.empty(len(frames))
+        try:
+            for i, frame in enumerate(frames):
+                scene.frame_set(frame)
+                matrices[i] = np.array(obj.matrix_world)
+                lenses[i] = camera.lens
+        finally:
+            scene.frame_set(current)
+
+    fovy = haystack_camera.fovy_degrees(lenses, camera.sensor_width, camera.sensor_height, camera.sensor_fit, camera_resolution(scene))
+    return haystack_camera.CameraPath.from_matrices(frames, matrices, fovy, camera.dof.focus_distance or 1.0)
+
+class HAYSTACK_OT_camera_bake_path(Operator):
+    """Sample the camera object over the frame range into the camera path file"""
+    bl_idname = 'haystack_composer.camera_bake_path'
+    bl_label = 'Bake Path'
+
+    def execute(self, context):
+        node = context.node
+        obj = node.camera_object
+        if obj is None:
+            self.report({'ERROR'}, "Select a camera object first.")
+            return {'CANCELLED'}
+        if obj.data.type != 'PERSP':
+            self.report({'WARNING'}, "Only perspective cameras are supported, the lens is used as is.")
+        if node.frame_end < node.frame_start:
+            self.report({'ERROR'}, "The frame range is empty.")
+            return {'CANCELLED'}
+
+        path = sample_camera_path(obj, range(node.frame_start, node.frame_end + 1, node.frame_step), context.scene)
+        file_path = bpy.path.abspath(node.path_file)
+        try:
+            path.save(file_path)
+        except OSError as e:
+            self.report({'ERROR'}, f"Could not write camera path: {str(e)}")
+            return {'CANCELLED'}
+        _camera_paths.pop(file_path, None)
+
+        self.report({'INFO'}, f"Baked {len(path)} frame(s) into '{node.path_file}'")
+        return {'FINISHED'}
+
 # Camera
 class HayStackCameraNode(HayStackBaseNode):
     bl_idname = 'HayStackCameraNodeType'
@@ -1036,6 +2496,39 @@ class HayStackCameraNode(HayStackBaseNode):
         default=60.0,
         #update = update_property
     ) # type: ignore
+
+    camera_mode: EnumProperty(
+        name="Mode",
+        items=[
+            ('STATIC', "Values", "Use the vp/vi/vu/fovy values"),
+            ('OBJECT', "Object", "Use the camera object at the current frame"),
+            ('PATH', "Path", "Render every frame of the camera path baked from the camera object animation"),
+        ],
+        default='STATIC'
+    ) # type: ignore
+
+    frame_start: IntProperty(
+        name="Start",
+        default=1
+    ) # type: ignore
+
+    frame_end: IntProperty(
+        name="End",
+        default=250
+    ) # type: ignore
+
+    frame_step: IntProperty(
+        name="Step",
+        default=1,
+        min=1
+    ) # type: ignore
+
+    path_file: StringProperty(
+        name="Path File",
+        description="Camera path file, one camera per frame",
+        default="//camera_path.cam",
+        subtype="FILE_PATH"
+    ) # type: ignore
     
     def initNode(self, context):
         self.outputs.new('HayStackCommandSocketType', 'Command')        
@@ -1043,31 +2536,65 @@ class HayStackCameraNode(HayStackBaseNode):
             
     def draw_buttons(self, context, layout):
         col = layout.column()
+        col.prop(self, "camera_mode")
+
+        if self.camera_mode == 'STATIC':
+            box = layout.box()
+            col = box.column()
+            col.prop(self, "vp", text="vp")
+            col.prop(self, "vi", text="vi")
+            col.prop(self, "vu", text="vu")
+            col = layout.column()
+            col.prop(self, "fovy", text="fovy")
+            return
+
         col.prop(self, "camera_object")
+        if self.camera_mode == 'OBJECT':
+            return
 
-        box = layout.box()
-        col = box.column()
-        col.prop(self, "vp", text="vp")
-        col.prop(self, "vi", text="vi")
-        col.prop(self, "vu", text="vu")
+        row = layout.row(align=True)
+        row.prop(self, "frame_start")
+        row.prop(self, "frame_end")
+        row.prop(self, "frame_step")
         col = layout.column()
-        col.prop(self, "fovy", text="fovy")
+        col.prop(self, "path_file")
+        col.operator("haystack_composer.camera_bake_path", icon='CAMERA_DATA')
+
+    def external_fingerprint_values(self):
+        values = []
+        if self.camera_mode != 'STATIC' and self.camera_object is not None:
+            values.append(tuple(v for row in self.camera_object.matrix_world for v in row))
+            values.append(self.camera_object.data.lens)
+        if self.camera_mode == 'PATH':
+            file_path = bpy.path.abspath(self.path_file)
+            values.append(os.path.getmtime(file_path) if os.path.exists(file_path) else None)
+        return values
+
+    def get_camera_path(self):
+        """haystack_camera.CameraPath of the path file"""
+        file_path = bpy.path.abspath(self.path_file)
+        if not os.path.exists(file_path):
+            raise ValueError(f"Camera path '{self.path_file}' not found, bake it on the Camera node first.")
+        return load_camera_path(file_path)
+
+    def to_command(self):
+        if self.camera_mode == 'PATH' and os.path.exists(bpy.path.abspath(self.path_file)):
+            # The single command renders the first frame of the path
+            return self.get_camera_path().camera(0)
+
+        if self.camera_mode != 'STATIC' and self.camera_object is not None:
+            obj = self.camera_object
+            camera = obj.data
+            fovy = haystack_camera.fovy_degrees([camera.lens], camera.sensor_width, camera.sensor_height,
+                                                camera.sensor_fit, camera_resolution(bpy.context.scene))
+            path = haystack_camera.CameraPath.from_matrices(
+                [bpy.context.scene.frame_current], np.array(obj.matrix_world)[np.newaxis], fovy, camera.dof.focus_distance or 1.0)
+            return path.camera(0)
+
+        return haystack_command.CameraCommand(self.vp, self.vi, self.vu, self.fovy)
 
     def generate_code(self):
-        command = []
-        command.append("--camera")
-        command.append(str(self.vp[0]))
-        command.append(str(self.vp[1]))
-        command.append(str(self.vp[2]))
-        command.append(str(self.vi[0]))
-        command.append(str(self.vi[1]))
-        command.append(str(self.vi[2]))
-        command.append(str(self.vu[0]))
-        command.append(str(self.vu[1]))
-        command.append(str(self.vu[2]))
-        command.append("-fovy")
-        command.append(str(round(self.fovy, 3)))
-        return command
+        return self.to_command().tokens()
 
 
 #TransferFunction
@@ -1115,11 +2642,175 @@ class HAYSTACK_OT_tf_create_material(Operator):
         value_base_density.outputs[0].default_value = 1.0
 
         context.node.material = material
-        context.node.file_path = material.name + ".xf"
+        # Next to the .blend file, the exporter writes it on code generation
+        context.node.file_path = "//" + material.name + ".xf"
         context.node.file_path_remote = material.name + ".xf"
 
         return {"FINISHED"}
 
+# Content hash of the material nodes of the last written .xf file, per file path
+_xf_export_hashes = {}
+
+# (content hash, sampled colormap) per material name, for previews
+_tf_colormaps = {}
+
+# (BackgroundTask, tree name, transfer function node name) of the running volume scan
+_tf_scan_task = None
+
+def set_tf_domain(material, histogram):
+    """Set DomainX/DomainY of a TF material to the value range and store the histogram on it"""
+    nodes = material.node_tree.nodes if material.node_tree else None
+    if nodes is not None:
+        if "DomainX" in nodes:
+            nodes["DomainX"].outputs[0].default_value = histogram.min
+        if "DomainY" in nodes:
+            nodes["DomainY"].outputs[0].default_value = histogram.max
+
+    # Log scaled to 0..1, stored in the .blend with the material
+    peak = math.log1p(max(histogram.counts)) if histogram.counts else 0.0
+    material["haystack_histogram"] = [math.log1p(count) / peak if peak > 0 else 0.0 for count in histogram.counts]
+    material["haystack_histogram_range"] = (histogram.min, histogram.max)
+
+def tf_scan_timer():
+    """Apply the finished volume scan to the transfer function material"""
+    global _tf_scan_task
+
+    if _tf_scan_task is None:
+        return None
+    task, tree_name, node_name = _tf_scan_task
+    if not task.done():
+        return 0.2
+    _tf_scan_task = None
+
+    scene = bpy.context.scene
+    tree = bpy.data.node_groups.get(tree_name)
+    node = tree.nodes.get(node_name) if tree else None
+
+    if task.error is not None:
+        scene.haystack_tf_scan_status = f"Scan failed: {task.error}"
+    elif node is None or node.material is None:
+        scene.haystack_tf_scan_status = "Transfer function has no material"
+    else:
+        set_tf_domain(node.material, task.result)
+        scene.haystack_tf_scan_status = f"Domain {task.result.min:g} .. {task.result.max:g}"
+
+    tag_node_editors()
+
+    return None
+
+class HAYSTACK_OT_tf_scan_volume(Operator):
+    """Scan the RAW volume for its value range and histogram and set the transfer function domain"""
+    bl_idname = 'haystack_composer.tf_scan_volume'
+    bl_label = 'Scan Volume'
+
+    @classmethod
+    def poll(cls, context):
+        return _tf_scan_task is None
+
+    def execute(self, context):
+        global _tf_scan_task
+
+        tf_node = context.node
+        tree = tf_node.id_data
+        if tf_node.material is None:
+            self.report({'ERROR'}, "Create or select a transfer function material first.")
+            return {'CANCELLED'}
+
+        volume = tree.nodes.get(tf_node.volume_node)
+        if volume is None:
+            volume = next((node for node in tree.nodes if isinstance(node, HayStackLoadRAWVolumeNode)), None)
+        if not isinstance(volume, HayStackLoadRAWVolumeNode):
+            self.report({'ERROR'}, "No RAWVolume node to scan.")
+            return {'CANCELLED'}
+
+        path = bpy.path.abspath(volume.file_path)
+        if not os.path.isfile(path):
+            self.report({'ERROR'}, f"Local file of '{volume.name}' not found, remote volumes can not be scanned.")
+            return {'CANCELLED'}
+
+        task = haystack_remote.BackgroundTask(
+            haystack_raw.scan_raw, path, volume.format.lower(), tuple(volume.dims), volume.channels,
+            min(tf_node.scan_channel, volume.channels - 1), 256, haystack_raw.CHUNK_BYTES, min(os.cpu_count() or 1, 4)
+        )
+        _tf_scan_task = (task, tree.name, tf_node.name)
+        context.scene.haystack_tf_scan_status = f"Scanning {volume.name}..."
+        bpy.app.timers.register(tf_scan_timer, first_interval=0.2)
+
+        return {"FINISHED"}
+
+class HAYSTACK_OT_tf_export_xf(Operator):
+    """Write the .xf file of the transfer function material"""
+    bl_idname = 'haystack_composer.tf_export_xf'
+    bl_label = 'Export XF'
+
+    def execute(self, context):
+        node = context.node
+        if node.material is None or not node.file_path:
+            self.report({'ERROR'}, "Transfer function needs a material and an XF file path.")
+            return {'CANCELLED'}
+
+        # Explicit export always writes
+        _xf_export_hashes.pop(bpy.path.abspath(node.file_path), None)
+        try:
+            node.export_xf()
+        except OSError as e:
+            self.report({'ERROR'}, f"Could not write XF file: {str(e)}")
+            return {'CANCELLED'}
+
+        if haystack_pref.preferences().haystack_remote and node.file_path_remote:
+            # Nothing uploads the file, the command references the remote path
+            self.report({'WARNING'}, f"Exported '{node.file_path}' locally, copy it to '{node.file_path_remote}' on the cluster")
+        else:
+            self.report({'INFO'}, f"Exported '{node.file_path}'")
+        return {"FINISHED"}
+
+def draw_tf_histogram():
+    """Draw the stored histogram over the Color Ramp of a transfer function material in the shader editor"""
+    space = bpy.context.space_data
+    if space is None or space.tree_type != 'ShaderNodeTree' or not isinstance(space.id, Material):
+        return
+    histogram = space.id.get("haystack_histogram")
+    tree = space.edit_tree
+    if not histogram or tree is None:
+        return
+
+    scale = bpy.context.preferences.system.ui_scale
+    header = 20.0 * scale
+    bins = len(histogram)
+
+    vertices = []
+    indices = []
+    for node in tree.nodes:
+        if node.bl_idname != 'ShaderNodeValToRGB':
+            continue
+        location = getattr(node, "location_absolute", node.location)
+        left = location.x * scale
+        top = location.y * scale - header
+        width = node.dimensions.x
+        height = node.dimensions.y - header
+        bottom = top - height
+        for i, value in enumerate(histogram):
+            if value <= 0.0:
+                continue
+            x0 = left + width * i / bins
+            x1 = left + width * (i + 1) / bins
+            y1 = bottom + height * value
+            first = len(vertices)
+            vertices.extend(((x0, bottom), (x1, bottom), (x1, y1), (x0, y1)))
+            indices.extend(((first, first + 1, first + 2), (first, first + 2, first + 3)))
+
+    if not vertices:
+        return
+
+    shader = gpu.shader.from_builtin('UNIFORM_COLOR')
+    batch = batch_for_shader(shader, 'TRIS', {"pos": vertices}, indices=indices)
+    gpu.state.blend_set('ALPHA')
+    shader.uniform_float("color", (1.0, 1.0, 1.0, 0.25))
+    batch.draw(shader)
+    gpu.state.blend_set('NONE')
+
+_tf_histogram_handle = None
+
 class HayStackTransferFunctionNode(HayStackBaseNode):
     bl_idname = 'HayStackTransferFunctionNodeType'
     bl_label = 'TransferFunction'
@@ -1144,6 +2835,19 @@ class HayStackTransferFunctionNode(HayStackBaseNode):
         default="",
         #update = update_property
     ) # type: ignore      
+
+    volume_node: StringProperty(
+        name="Volume",
+        description="RAWVolume node scanned for the domain, the first one in the tree if empty",
+        default=""
+    ) # type: ignore
+
+    scan_channel: IntProperty(
+        name="Channel",
+        description="Channel of the volume scanned for the domain",
+        default=0,
+        min=0
+    ) # type: ignore
     
     def initNode(self, context):
         self.outputs.new('HayStackCommandSocketType', 'Command')
@@ -1155,13 +2859,119 @@ class HayStackTransferFunctionNode(HayStackBaseNode):
         col = layout.column()
         col.prop(self, "material")        
         col.operator("haystack_composer.tf_create_material")
+        col.operator("haystack_composer.tf_export_xf", icon='EXPORT')
+
+        if not haystack_pref.preferences().haystack_remote:
+            box = layout.box()
+            col = box.column(align=True)
+            col.prop_search(self, "volume_node", self.id_data, "nodes")
+            col.prop(self, "scan_channel")
+            col.operator("haystack_composer.tf_scan_volume", icon='SEQ_HISTOGRAM')
+            if context.scene.haystack_tf_scan_status:
+                col.label(text=context.scene.haystack_tf_scan_status)
+
+    def export_xf(self):
+        """Write the .xf file sampled from the material, returns False if it was up to date
+
+        Control points are read in bulk with foreach_get and hashed; sampling and writing
+        only happen when the hash changes.
+        """
+        path = bpy.path.abspath(self.file_path) if self.file_path else ""
+        source = self.material_tf() if path else None
+        if source is None:
+            return False
 
-    def generate_code(self):
-        command = []
+        key, sample = source
+        if _xf_export_hashes.get(path) == key and os.path.exists(path):
+            return False
+
+        colormap, density, domain = sample()
+        haystack_xf.write_xf(path, colormap, density, domain)
+        _xf_export_hashes[path] = key
+        return True
+
+    def get_colormap(self):
+        """(colormap, opacity scale, domain) of the material, sampled again only when it changed; None without a color ramp"""
+        source = self.material_tf()
+        if source is None:
+            return None
+
+        key, sample = source
+        entry = _tf_colormaps.get(self.material.name)
+        if entry is None or entry[0] != key:
+            entry = (key, sample())
+            _tf_colormaps[self.material.name] = entry
+        return entry[1]
+
+    def material_tf(self):
+        """(content hash, sample) of the transfer function material, None without a color ramp
+
+        sample() returns (colormap, opacity scale, domain).
+        """
+        material = self.material
+        if material is None or material.node_tree is None:
+            return None
+
+        nodes = material.node_tree.nodes
+        ramp = next((node for node in nodes if node.bl_idname == 'ShaderNodeValToRGB'), None)
+        curve = next((node for node in nodes if node.bl_idname == 'ShaderNodeFloatCurve'), None)
+        if ramp is None:
+            return None
+
+        band = ramp.color_ramp
+        positions = np.empty(len(band.elements), dtype=np.float32)
+        band.elements.foreach_get("position", positions)
+        colors = np.empty(len(band.elements) * 4, dtype=np.float32)
+        band.elements.foreach_get("color", colors)
+
+        points = np.empty(0, dtype=np.float32)
+        handles = ()
+        if curve is not None:
+            curve_points = curve.mapping.curves[0].points
+            points = np.empty(len(curve_points) * 2, dtype=np.float32)
+            curve_points.foreach_get("location", points)
+            handles = tuple(point.handle_type for point in curve_points)
+
+        domain_x = nodes["DomainX"].outputs[0].default_value if "DomainX" in nodes else 0.0
+        domain_y = nodes["DomainY"].outputs[0].default_value if "DomainY" in nodes else 1.0
+        density = nodes["Base Density"].outputs[0].default_value if "Base Density" in nodes else 1.0
+
+        digest = hashlib.sha1()
+        digest.update(positions.tobytes())
+        digest.update(colors.tobytes())
+        digest.update(points.tobytes())
+        digest.update(repr((band.interpolation, band.color_mode, handles, domain_x, domain_y, density,
+                            haystack_xf.XF_SAMPLES)).encode("utf-8"))
+
+        def sample():
+            samples = np.linspace(0.0, 1.0, haystack_xf.XF_SAMPLES)
+            table = None
+            if band.color_mode == 'RGB':
+                table = haystack_xf.sample_ramp(positions, colors, band.interpolation)
+            if table is None:
+                # Interpolations without a vectorized equivalent
+                table = np.array([band.evaluate(x) for x in samples], dtype=np.float32)
+
+            if curve is None:
+                opacity = samples.astype(np.float32)
+            elif all(handle == 'VECTOR' for handle in handles):
+                opacity = haystack_xf.sample_curve_linear(points)
+            else:
+                # Smooth handles, only the curve mapping knows the exact shape
+                mapping = curve.mapping
+                mapping.initialize()
+                opacity = np.array([mapping.evaluate(mapping.curves[0], x) for x in samples], dtype=np.float32)
+
+            return haystack_xf.make_colormap(table, opacity), density, (domain_x, domain_y)
+
+        return digest.digest(), sample
+
+    def to_command(self):
         # bpy.context.scene.haystack.server_settings.mat_volume = self.material
-        command.append("-xf")
-        command.append(self.get_file_path())
-        return command
+        return haystack_command.TransferFunctionCommand(self.get_file_path())
+
+    def generate_code(self):
+        return self.to_command().tokens()
 
 ##################################################Utility###################################################################
 # class HayStackMerge2Node(HayStackBaseNode):
@@ -1230,16 +3040,11 @@ class HayStackOutputImageNode(HayStackBaseNode):
     def initNode(self, context):
         self.outputs.new('HayStackCommandSocketType', 'Command')  
     
+    def to_command(self):
+        return haystack_command.OutputImageCommand(self.get_dir_path(), self.image_file_name, self.resolution)
+
     def generate_code(self):
-        command = []
-        command.append("-o")
-        command.append(self.get_dir_path())
-        command.append("/")
-        command.append(str(self.image_file_name))
-        command.append("-res")
-        command.append(str(self.resolution[0]))
-        command.append(str(self.resolution[1]))
-        return command
+        return self.to_command().tokens()
 
     def draw_buttons(self, context, layout):
         col = layout.column()
@@ -1285,17 +3090,91 @@ class HayStackRenderBaseNode(HayStackBaseNode):
         default="",
         #update = update_property
     ) # type: ignore        
+
+    launcher_items = [
+        ('NONE', "None", "Run the executable directly"),
+        ('MPIRUN', "mpirun", "Open MPI mpirun"),
+        ('SRUN', "srun", "Slurm srun"),
+        ('MPIEXEC', "mpiexec", "MPICH / Intel MPI mpiexec"),
+    ]
+
+    launcher: EnumProperty(
+        name="Launcher",
+        description="MPI launcher wrapping the render executable",
+        items=launcher_items,
+        default='NONE'
+    ) # type: ignore
+
+    ranks_auto: BoolProperty(
+        name="Auto Ranks",
+        description="Derive the total number of ranks from ndg/dpr, the loaders' part counts and the head node",
+        default=True
+    ) # type: ignore
+
+    ranks: IntProperty(
+        name="Ranks",
+        description="Total number of MPI ranks",
+        default=1,
+        min=1
+    ) # type: ignore
+
+    ranks_per_node: IntProperty(
+        name="Ranks per node",
+        description="MPI ranks per cluster node, 0 leaves the placement to the launcher",
+        default=0,
+        min=0
+    ) # type: ignore
+
+    binding_items = [
+        ('NONE', "None", "Launcher default binding"),
+        ('CORE', "Core", "Bind ranks to cores"),
+        ('SOCKET', "Socket", "Bind ranks to sockets"),
+        ('NUMA', "NUMA", "Bind ranks to NUMA domains"),
+    ]
+
+    binding: EnumProperty(
+        name="Binding",
+        items=binding_items,
+        default='NONE'
+    ) # type: ignore
     
     def initNode(self, context):
         self.inputs.new('HayStackCommandSocketType', 'Commands').link_limit = 100
 
+    def get_ranks(self):
+        """Total MPI ranks of the job"""
+        if self.ranks_auto:
+            return derived_ranks(self)
+        return self.ranks
+
+    def get_launcher(self):
+        """haystack_command.LauncherCommand of the render node, None without a launcher"""
+        if self.launcher == 'NONE':
+            return None
+        return haystack_command.LauncherCommand(self.launcher, self.get_ranks(), self.ranks_per_node or None, self.binding)
+
+    def to_command(self):
+        return haystack_command.RenderCommand(self.get_file_path(), launcher=self.get_launcher())
+
     def generate_code(self):
-        command = []
-        # command.append(self.get_file_path())
-        return command
+        return self.to_command().tokens()
 
     def draw_buttons(self, context, layout):
         self.draw_file_path(layout)  
+        self.draw_launcher(layout)
+
+    def draw_launcher(self, layout):
+        col = layout.column(align=True)
+        col.prop(self, "launcher")
+        if self.launcher == 'NONE':
+            return
+        col.prop(self, "ranks_auto")
+        if self.ranks_auto:
+            col.label(text=f"Ranks: {self.get_ranks()}")
+        else:
+            col.prop(self, "ranks")
+        col.prop(self, "ranks_per_node")
+        col.prop(self, "binding")
 
 class HayStackRenderBRAASHPCNode(HayStackRenderBaseNode):
     """BRAAS HPC rendering output node"""
@@ -1318,12 +3197,15 @@ class HayStackRenderBRAASHPCNode(HayStackRenderBaseNode):
         description="Server port number",
         #update = update_property
     ) # type: ignore
-    
-    def generate_code(self):
-        """Generate BRAAS HPC render loop code"""
-        command = []
-        # command.append(self.get_file_path())
 
+    def external_fingerprint_values(self):
+        values = []
+        if hasattr(bpy.context.scene, "braas_hpc_renderengine"):
+            values.append(bpy.context.scene.braas_hpc_renderengine.server_settings.braas_hpc_renderengine_port)
+        return values
+
+    def to_command(self):
+        """Generate BRAAS HPC render loop command"""
         # Port
         port = self.port
 
@@ -1331,12 +3213,7 @@ class HayStackRenderBRAASHPCNode(HayStackRenderBaseNode):
             server_settings = bpy.context.scene.braas_hpc_renderengine.server_settings
             port = server_settings.braas_hpc_renderengine_port
         
-        command.append("-server")
-        command.append(str(self.hostname))
-        command.append("-port")
-        command.append(str(port))
-        
-        return command
+        return haystack_command.RenderCommand(self.get_file_path(), hostname=self.hostname, port=port, launcher=self.get_launcher())
 
 class HayStackRenderViewerNode(HayStackRenderBaseNode):
     bl_idname = 'HayStackRenderViewerNodeType'
@@ -1353,6 +3230,384 @@ class HayStackRenderOfflineNode(HayStackRenderBaseNode):
     bl_label = 'hsOffline'
     bl_description = 'HayStack Render hsOffline'
 
+    job_scheduler: EnumProperty(
+        name="Job Script",
+        description="Also generate a batch submission script with estimated resources",
+        items=[
+            ('NONE', "None", "No job script"),
+            ('SLURM', "Slurm", "sbatch script"),
+            ('PBS', "PBS", "qsub script"),
+        ],
+        default='NONE'
+    ) # type: ignore
+
+    job_name: StringProperty(
+        name="Job name",
+        description="Name of the job, the tree name if empty",
+        default=""
+    ) # type: ignore
+
+    job_account: StringProperty(
+        name="Account",
+        description="Project/account charged for the job",
+        default=""
+    ) # type: ignore
+
+    job_queue: StringProperty(
+        name="Queue",
+        description="Partition (Slurm) or queue (PBS)",
+        default=""
+    ) # type: ignore
+
+    def draw_buttons(self, context, layout):
+        super().draw_buttons(context, layout)
+
+        col = layout.column(align=True)
+        col.prop(self, "job_scheduler")
+        if self.job_scheduler == 'NONE':
+            return
+        col.prop(self, "job_name")
+        col.prop(self, "job_account")
+        col.prop(self, "job_queue")
+
+##################################################Sweep###################################################################
+# haystack_sweep.SweepRunner of running local sweeps and the SweepResults of the last sweep per (tree name, node name)
+_sweep_runners = {}
+_sweep_results = {}
+
+# Result rows drawn in the sweep node
+SWEEP_NODE_ROWS = 10
+
+_SWEEP_AXIS_LABELS = {
+    'paths_per_pixel': "ppp",
+    'num_frames': "frames",
+    'ndg': "ndg",
+    'dpr': "dpr",
+    'resolution': "res",
+}
+
+def haystack_tree_poll(self, tree):
+    return tree.bl_idname == 'HayStackComposerTreeType'
+
+class HayStackSweepNode(HayStackBaseNode):
+    """Expand ranges of the render settings into a batch of measured runs"""
+    bl_idname = 'HayStackSweepNodeType'
+    bl_label = 'Sweep'
+    bl_description = 'HayStack parameter sweep'
+
+    base_tree: PointerProperty(
+        name="Base Tree",
+        type=HayStackComposerNodeTree,
+        poll=haystack_tree_poll,
+        description="Tree of the swept render node, this tree if empty"
+    ) # type: ignore
+
+    render_node: StringProperty(
+        name="Render",
+        description="Render node whose command is swept",
+        default=""
+    ) # type: ignore
+
+    sweep_paths_per_pixel: StringProperty(
+        name="Paths per pixel",
+        description="Values, e.g. 1,2,4 or 1:8 or 1:8:2 or 1:64:*2; empty keeps the value of the Properties node",
+        default=""
+    ) # type: ignore
+
+    sweep_num_frames: StringProperty(
+        name="Num. frames",
+        description="Values, e.g. 1,2,4 or 1:8 or 1:8:2 or 1:64:*2; empty keeps the value of the Properties node",
+        default=""
+    ) # type: ignore
+
+    sweep_ndg: StringProperty(
+        name="ndg",
+        description="Values, e.g. 1,2,4 or 1:8 or 1:8:2 or 1:64:*2; empty keeps the value of the Properties node",
+        default=""
+    ) # type: ignore
+
+    sweep_dpr: StringProperty(
+        name="dpr",
+        description="Values, e.g. 1,2,4 or 1:8 or 1:8:2 or 1:64:*2; empty keeps the value of the Properties node",
+        default=""
+    ) # type: ignore
+
+    sweep_resolution: StringProperty(
+        name="Resolution",
+        description="Resolutions, e.g. 1920x1080,3840x2160; empty keeps the value of the OutputImage node",
+        default=""
+    ) # type: ignore
+
+    mode: EnumProperty(
+        name="Run",
+        items=[
+            ('LOCAL', "Local", "Run the variants locally one after another"),
+            ('SLURM', "Slurm Array", "Write a Slurm job array script, one task per variant"),
+            ('PBS', "PBS Array", "Write a PBS job array script, one task per variant"),
+        ],
+        default='LOCAL'
+    ) # type: ignore
+
+    csv_path: StringProperty(
+        name="CSV",
+        description="Table of the measured frame times of the variants",
+        default="//sweep.csv",
+        subtype="FILE_PATH"
+    ) # type: ignore
+
+    job_name: StringProperty(
+        name="Job name",
+        description="Name of the job array and prefix of its task logs, '{tree}_sweep' if empty",
+        default=""
+    ) # type: ignore
+
+    job_account: StringProperty(
+        name="Account",
+        description="Project/account charged for the job",
+        default=""
+    ) # type: ignore
+
+    job_queue: StringProperty(
+        name="Queue",
+        description="Partition (Slurm) or queue (PBS)",
+        default=""
+    ) # type: ignore
+
+    log_dir: StringProperty(
+        name="Logs",
+        description="Local directory with the task logs of the finished job array",
+        default="//",
+        subtype="DIR_PATH"
+    ) # type: ignore
+
+    def get_base_tree(self):
+        return self.base_tree or self.id_data
+
+    def get_render_node(self):
+        node = self.get_base_tree().nodes.get(self.render_node)
+        if not isinstance(node, HayStackRenderBaseNode):
+            raise ValueError("Select the render node to sweep.")
+        return node
+
+    def get_variants(self):
+        return haystack_sweep.expand({
+            'paths_per_pixel': haystack_sweep.parse_values(self.sweep_paths_per_pixel),
+            'num_frames': haystack_sweep.parse_values(self.sweep_num_frames),
+            'ndg': haystack_sweep.parse_values(self.sweep_ndg),
+            'dpr': haystack_sweep.parse_values(self.sweep_dpr),
+            'resolution': haystack_sweep.parse_resolutions(self.sweep_resolution),
+        })
+
+    def get_job_name(self):
+        return self.job_name or f"{self.get_base_tree().name}_sweep"
+
+    def get_key(self):
+        return (self.id_data.name, self.name)
+
+    def draw_buttons(self, context, layout):
+        col = layout.column(align=True)
+        col.prop(self, "base_tree")
+        col.prop_search(self, "render_node", self.get_base_tree(), "nodes")
+
+        col = layout.column(align=True)
+        col.prop(self, "sweep_paths_per_pixel")
+        col.prop(self, "sweep_num_frames")
+        col.prop(self, "sweep_ndg")
+        col.prop(self, "sweep_dpr")
+        col.prop(self, "sweep_resolution")
+        try:
+            col.label(text=f"{len(self.get_variants())} variant(s)")
+        except ValueError as e:
+            col.label(text=str(e), icon='ERROR')
+
+        col = layout.column(align=True)
+        col.prop(self, "mode")
+        col.prop(self, "csv_path")
+        if self.mode == 'LOCAL':
+            row = layout.row(align=True)
+            row.operator("haystack_composer.sweep_run", icon='PLAY')
+            row.operator("haystack_composer.sweep_cancel", icon='CANCEL')
+        else:
+            col.prop(self, "job_name")
+            col.prop(self, "job_account")
+            col.prop(self, "job_queue")
+            col.prop(self, "log_dir")
+            row = layout.row(align=True)
+            row.operator("haystack_composer.sweep_write_job", icon='FILE_SCRIPT')
+            row.operator("haystack_composer.sweep_collect", icon='IMPORT')
+
+        results = _sweep_results.get(self.get_key())
+        if not results:
+            return
+
+        runner = _sweep_runners.get(self.get_key())
+        col = layout.box().column(align=True)
+        if runner is not None and not runner.done:
+            col.label(text=f"Running variant {runner.index + 1}/{len(results)}")
+        for index, result in enumerate(results[:SWEEP_NODE_ROWS]):
+            row = result.row()
+            values = " ".join(f"{_SWEEP_AXIS_LABELS[name]} {row[name]}" for name in haystack_sweep.SWEEP_AXES)
+            timing = f"{row['median_ms']} ms" if result.frame_times else result.status
+            col.label(text=f"{index}: {values}: {timing}")
+        if len(results) > SWEEP_NODE_ROWS:
+            col.label(text=f"... {len(results) - SWEEP_NODE_ROWS} more in the CSV")
+
+def write_sweep_csv(node, results):
+    try:
+        haystack_sweep.write_csv(bpy.path.abspath(node.csv_path), results)
+    except OSError as e:
+        print(f"Sweep CSV error: {str(e)}")
+        return False
+    return True
+
+def sweep_timer():
+    """Advance the local sweeps, the CSV is rewritten after every variant"""
+    for key, runner in list(_sweep_runners.items()):
+        finished = runner.poll()
+        tree = bpy.data.node_groups.get(key[0])
+        node = tree.nodes.get(key[1]) if tree else None
+        if (finished or runner.done) and node is not None:
+            write_sweep_csv(node, runner.results)
+        if runner.done:
+            del _sweep_runners[key]
+
+    tag_node_editors()
+
+    return 0.5 if _sweep_runners else None
+
+def cancel_sweeps():
+    for runner in _sweep_runners.values():
+        runner.cancel()
+    _sweep_runners.clear()
+
+class HAYSTACK_OT_sweep_run(Operator):
+    """Run all variants of the sweep locally, one after another"""
+    bl_idname = "haystack_composer.sweep_run"
+    bl_label = "Run Sweep"
+
+    @classmethod
+    def poll(cls, context):
+        node = getattr(context, "node", None)
+        return isinstance(node, HayStackSweepNode) and node.get_key() not in _sweep_runners
+
+    def execute(self, context):
+        node = context.node
+
+        if haystack_pref.preferences().haystack_remote:
+            self.report({'ERROR'}, "Remote paths can not be run locally, disable Remote in the preferences or use a job array.")
+            return {'CANCELLED'}
+
+        try:
+            render_node = node.get_render_node()
+            if not isinstance(render_node, (HayStackRenderViewerNode, HayStackRenderOfflineNode)):
+                raise ValueError("Only hsViewer and hsOffline nodes can be run locally.")
+            tree = render_node.id_data
+            results, _, _ = tree.generate_sweep(render_node, node.get_variants())
+            tree.export_transfer_functions()
+        except (ValueError, OSError) as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+
+        runner = haystack_sweep.SweepRunner(results, cwd=os.path.dirname(bpy.data.filepath) or None)
+        runner.poll()
+        _sweep_results[node.get_key()] = results
+        _sweep_runners[node.get_key()] = runner
+        if not bpy.app.timers.is_registered(sweep_timer):
+            bpy.app.timers.register(sweep_timer, first_interval=0.5)
+
+        return {'FINISHED'}
+
+class HAYSTACK_OT_sweep_cancel(Operator):
+    """Stop the running variant and skip the rest of the sweep"""
+    bl_idname = "haystack_composer.sweep_cancel"
+    bl_label = "Cancel"
+
+    @classmethod
+    def poll(cls, context):
+        node = getattr(context, "node", None)
+        return isinstance(node, HayStackSweepNode) and node.get_key() in _sweep_runners
+
+    def execute(self, context):
+        # The timer writes the CSV of the finished variants
+        _sweep_runners[context.node.get_key()].cancel()
+        return {'FINISHED'}
+
+class HAYSTACK_OT_sweep_write_job(Operator):
+    """Write a job array script with one task per variant, sized for the largest variant"""
+    bl_idname = "haystack_composer.sweep_write_job"
+    bl_label = "Write Job Array"
+
+    @classmethod
+    def poll(cls, context):
+        return isinstance(getattr(context, "node", None), HayStackSweepNode)
+
+    def execute(self, context):
+        node = context.node
+        try:
+            render_node = node.get_render_node()
+            tree = render_node.id_data
+            results, estimate, unknown = tree.generate_sweep(render_node, node.get_variants(), node.mode)
+            tree.export_transfer_functions()
+        except (ValueError, OSError) as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+        except ImportError:
+            self.report({'ERROR'}, "BRAAS HPC addon not found. Please install and enable it.")
+            return {'CANCELLED'}
+        if not results:
+            self.report({'ERROR'}, "The sweep has no variants.")
+            return {'CANCELLED'}
+        if unknown:
+            self.report({'ERROR'}, f"Unknown input size of {', '.join(unknown)}, run Preflight Files first")
+            return {'CANCELLED'}
+
+        job_name = node.get_job_name()
+        script = haystack_plan.job_script(
+            node.mode, estimate, haystack_sweep.array_body(results, job_name),
+            job_name=job_name,
+            account=node.job_account,
+            queue=node.job_queue,
+            array_size=len(results),
+        )
+
+        text_name = f"{node.id_data.name}_{node.name}_job.sh"
+        HayStackComposerNodeTree._write_text(text_name, script)
+        _sweep_results[node.get_key()] = results
+
+        self.report({'INFO'}, f"Generated {len(results)} task(s) in text block '{text_name}', collect the '{job_name}_<task>.log' logs after the job")
+        return {'FINISHED'}
+
+class HAYSTACK_OT_sweep_collect(Operator):
+    """Read the frame times from the task logs of the job array into the CSV"""
+    bl_idname = "haystack_composer.sweep_collect"
+    bl_label = "Collect Logs"
+
+    @classmethod
+    def poll(cls, context):
+        return isinstance(getattr(context, "node", None), HayStackSweepNode)
+
+    def execute(self, context):
+        node = context.node
+        try:
+            render_node = node.get_render_node()
+            results, _, _ = render_node.id_data.generate_sweep(render_node, node.get_variants())
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+
+        log_dir = bpy.path.abspath(node.log_dir)
+        job_name = node.get_job_name()
+        haystack_sweep.collect_logs(results, lambda index: os.path.join(log_dir, f"{job_name}_{index}.log"))
+        _sweep_results[node.get_key()] = results
+
+        if not write_sweep_csv(node, results):
+            self.report({'ERROR'}, f"Could not write '{node.csv_path}'")
+            return {'CANCELLED'}
+
+        measured = sum(1 for result in results if result.frame_times)
+        self.report({'INFO'}, f"Collected timings of {measured}/{len(results)} variant(s) into '{node.csv_path}'")
+        return {'FINISHED'}
+
 ##################################################Property###################################################################    
 class HayStackPropertiesNode(HayStackBaseNode):
     bl_idname = 'HayStackPropertiesNodeType'
@@ -1447,31 +3702,20 @@ class HayStackPropertiesNode(HayStackBaseNode):
     def initNode(self, context):
         self.outputs.new('HayStackCommandSocketType', 'Command')
     
-    def generate_code(self):
-        command = []
-        command.append("--num-frames")
-        command.append(str(self.num_frames))
-        command.append("--paths-per-pixel")
-        command.append(str(self.paths_per_pixel))
-        command.append("--default-radius")
-        command.append(str(round(self.default_radius, 7)))
-        command.append("-ndg")
-        command.append(str(self.ndg))
-        command.append("-dpr")
-        command.append(str(self.dpr))
-        
-        if self.merge_umeshes:
-            command.append("--merge-umeshes")
-        else:
-            command.append("--no-mum")
+    def to_command(self):
+        return haystack_command.PropertiesCommand(
+            num_frames=self.num_frames,
+            paths_per_pixel=self.paths_per_pixel,
+            default_radius=self.default_radius,
+            ndg=self.ndg,
+            dpr=self.dpr,
+            merge_umeshes=self.merge_umeshes,
+            measure=self.measure,
+            create_head_node=self.create_head_node,
+        )
 
-        if self.measure:
-            command.append("--measure")
-
-        if self.create_head_node:
-            command.append("--create-head-node")
-        
-        return command
+    def generate_code(self):
+        return self.to_command().tokens()
 
     def draw_buttons(self, context, layout):
         col = layout.column()
@@ -1484,6 +3728,556 @@ class HayStackPropertiesNode(HayStackBaseNode):
         col.prop(self, "dpr")
         col.prop(self, "create_head_node")
 ##################################################OPERATOR###################################################################
+##################################################PREFLIGHT###################################################################
+# Stats of checked files, keyed by (backend key, path)
+_preflight_cache = haystack_preflight.StatCache()
+
+# BackgroundTask of the running preflight
+_preflight_task = None
+
+def start_preflight(tree, refresh=False):
+    """Check the files referenced by tree on a background thread, raises ValueError/ImportError"""
+    global _preflight_task
+
+    render_nodes = tree.find_render_nodes()
+    if not render_nodes:
+        raise ValueError("No Render node found in the node tree.")
+
+    pref = haystack_pref.preferences()
+    if pref.haystack_remote:
+        backend = get_remote_backend()
+    else:
+        backend = haystack_remote.LocalBackend()
+
+    checks = tree.collect_file_checks(render_nodes)
+    _preflight_cache.configure(max(_preflight_cache.max_entries, len(checks)), pref.haystack_stat_cache_ttl or None)
+
+    _preflight_task = haystack_remote.BackgroundTask(haystack_preflight.preflight, backend, checks, _preflight_cache, refresh)
+    scene = bpy.context.scene
+    scene.haystack_preflight_issues.clear()
+    scene.haystack_preflight_status = f"Checking {len(checks)} files..."
+    if not bpy.app.timers.is_registered(preflight_timer):
+        bpy.app.timers.register(preflight_timer, first_interval=0.1)
+
+def preflight_timer():
+    """Publish the preflight results to the scene"""
+    global _preflight_task
+
+    if _preflight_task is None:
+        return None
+    if not _preflight_task.done():
+        return 0.1
+
+    task = _preflight_task
+    _preflight_task = None
+
+    scene = bpy.context.scene
+    scene.haystack_preflight_issues.clear()
+    if task.error is not None:
+        scene.haystack_preflight_status = f"Preflight failed: {task.error}"
+    else:
+        for issue in task.result:
+            item = scene.haystack_preflight_issues.add()
+            item.node_name = issue.node_name
+            item.path = issue.path
+            item.severity = issue.severity
+            item.message = issue.message
+        errors = sum(1 for issue in task.result if issue.severity == haystack_preflight.SEVERITY_ERROR)
+        scene.haystack_preflight_status = f"Preflight: {errors} error(s), {len(task.result) - errors} warning(s)"
+
+    tag_node_editors()
+
+    return None
+
+class HAYSTACK_PG_preflight_issue(PropertyGroup):
+    node_name : StringProperty(
+        name="Node"
+        ) # type: ignore
+
+    path : StringProperty(
+        name="Path"
+        ) # type: ignore
+
+    severity : StringProperty(
+        name="Severity"
+        ) # type: ignore
+
+    message : StringProperty(
+        name="Message"
+        ) # type: ignore
+
+class HAYSTACK_OT_preflight_tree(Operator):
+    """Check existence, size and header of every file referenced by the tree in one batched call"""
+    bl_idname = "haystack_composer.preflight_tree"
+    bl_label = "Preflight Files"
+
+    refresh: BoolProperty(
+        name="Refresh",
+        description="Ignore cached results",
+        default=True
+    ) # type: ignore
+
+    @classmethod
+    def poll(cls, context):
+        space = context.space_data
+        return space.type == 'NODE_EDITOR' and space.tree_type == 'HayStackComposerTreeType' and _preflight_task is None
+
+    def execute(self, context):
+        tree = context.space_data.edit_tree
+        if not tree:
+            self.report({'ERROR'}, "No active node tree")
+            return {'CANCELLED'}
+
+        try:
+            start_preflight(tree, refresh=self.refresh)
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+        except ImportError:
+            self.report({'ERROR'}, "BRAAS HPC addon not found. Please install and enable it.")
+            return {'CANCELLED'}
+
+        return {'FINISHED'}
+
+##################################################PARTITION###################################################################
+def loader_file_size(node):
+    """Size of the file of a loader node, local stat or the remote preflight cache, None if unknown"""
+    if haystack_pref.preferences().haystack_remote:
+        try:
+            backend = get_remote_backend()
+        except ImportError:
+            return None
+        stat = _preflight_cache.get((backend.key, str(node.file_path_remote)))
+        if stat is None or stat.status != haystack_remote.FILE_OK:
+            return None
+        return stat.size
+
+    try:
+        return os.path.getsize(bpy.path.abspath(node.file_path))
+    except OSError:
+        return None
+
+class HAYSTACK_PG_parts_advice(PropertyGroup):
+    node_name : StringProperty(
+        name="Node"
+        ) # type: ignore
+
+    parts : IntProperty(
+        name="Parts"
+        ) # type: ignore
+
+    part_size : StringProperty(
+        name="Part size"
+        ) # type: ignore
+
+class HAYSTACK_OT_recommend_num_parts(Operator):
+    """Recommend the number of parts of Spheres and RAWVolume loaders that balances bytes per rank"""
+    bl_idname = "haystack_composer.recommend_num_parts"
+    bl_label = "Recommend Parts"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    apply: BoolProperty(
+        name="Apply",
+        description="Set the recommended number of parts on the loaders",
+        default=False
+    ) # type: ignore
+
+    @classmethod
+    def poll(cls, context):
+        space = context.space_data
+        return space.type == 'NODE_EDITOR' and space.tree_type == 'HayStackComposerTreeType'
+
+    def execute(self, context):
+        tree = context.space_data.edit_tree
+        if not tree:
+            self.report({'ERROR'}, "No active node tree")
+            return {'CANCELLED'}
+
+        render_nodes = tree.find_render_nodes()
+        if not render_nodes:
+            self.report({'ERROR'}, "No Render node found in the node tree.")
+            return {'CANCELLED'}
+
+        try:
+            loaders, properties, _, unknown = tree.collect_plan_inputs(render_nodes)
+        except ImportError:
+            self.report({'ERROR'}, "BRAAS HPC addon not found. Please install and enable it.")
+            return {'CANCELLED'}
+
+        if unknown:
+            self.report({'WARNING'}, f"Unknown file size of {', '.join(unknown)}, run Preflight Files first for remote files")
+        if not loaders:
+            return {'CANCELLED'}
+
+        inputs = [node.partition_input(size) for node, size in loaders]
+        ndg, dpr = properties.ndg, properties.dpr
+        advice = haystack_plan.recommend_num_parts(inputs, ndg, dpr, tree.launcher_data_ranks(render_nodes, properties))
+
+        scene = context.scene
+        scene.haystack_parts_advice.clear()
+        for item in inputs:
+            node = tree.nodes[item.name]
+            if not hasattr(node, 'num_parts'):
+                continue
+            parts = advice.parts[item.name]
+            if self.apply:
+                node.num_parts = parts
+            entry = scene.haystack_parts_advice.add()
+            entry.node_name = item.name
+            entry.parts = parts
+            entry.part_size = f"{item.size / parts / (1024 * 1024):.1f} MiB"
+
+        scene.haystack_parts_status = (f"{advice.rank_bytes / (1024 * 1024):.1f} MiB per rank, "
+                                       f"imbalance {advice.imbalance:.2f} (ndg {ndg}, dpr {dpr})")
+        return {'FINISHED'}
+
+##################################################MEMORY PLAN###################################################################
+# Last computed MemoryPlan per tree name
+_memory_plans = {}
+
+def format_bytes(size):
+    return f"{size / haystack_plan.GIB:.2f} GiB" if size >= haystack_plan.GIB else f"{size / (1024 * 1024):.1f} MiB"
+
+class HAYSTACK_OT_memory_plan(Operator):
+    """Estimate bytes per data group, rank and cluster node from the loaders and ndg/dpr"""
+    bl_idname = "haystack_composer.memory_plan"
+    bl_label = "Plan Memory"
+
+    @classmethod
+    def poll(cls, context):
+        space = context.space_data
+        return space.type == 'NODE_EDITOR' and space.tree_type == 'HayStackComposerTreeType' and space.edit_tree is not None
+
+    def execute(self, context):
+        tree = context.space_data.edit_tree
+        render_nodes = tree.find_render_nodes()
+        if not render_nodes:
+            self.report({'ERROR'}, "No Render node found in the node tree.")
+            return {'CANCELLED'}
+
+        try:
+            plan, unknown = tree.plan_memory(render_nodes)
+        except ImportError:
+            self.report({'ERROR'}, "BRAAS HPC addon not found. Please install and enable it.")
+            return {'CANCELLED'}
+
+        if unknown:
+            self.report({'WARNING'}, f"Unknown file size of {', '.join(unknown)}, run Preflight Files first for remote files")
+        _memory_plans[tree.name] = plan
+        return {'FINISHED'}
+
+class HAYSTACK_OT_memory_plan_export(Operator, ExportHelper):
+    """Export the memory plan as JSON"""
+    bl_idname = "haystack_composer.memory_plan_export"
+    bl_label = "Export Plan"
+
+    filename_ext = ".json"
+
+    filter_glob: StringProperty(
+        default="*.json",
+        options={'HIDDEN'}
+    ) # type: ignore
+
+    @classmethod
+    def poll(cls, context):
+        space = context.space_data
+        return space.type == 'NODE_EDITOR' and space.edit_tree is not None and space.edit_tree.name in _memory_plans
+
+    def execute(self, context):
+        plan = _memory_plans[context.space_data.edit_tree.name]
+        with open(self.filepath, "w") as f:
+            json.dump(plan.to_dict(), f, indent=2)
+        self.report({'INFO'}, f"Exported '{self.filepath}'")
+        return {'FINISHED'}
+
+class HAYSTACK_PT_memory_plan(Panel):
+    bl_space_type = 'NODE_EDITOR'
+    bl_region_type = 'UI'
+    bl_category = "HAYSTACK"
+    bl_label = "Memory Plan"
+    bl_parent_id = "HAYSTACK_PT_composer_panel"
+
+    def draw(self, context):
+        layout = self.layout
+        tree = context.space_data.edit_tree
+
+        row = layout.row(align=True)
+        row.operator("haystack_composer.memory_plan", icon='MEMORY')
+        row.operator("haystack_composer.memory_plan_export", text="", icon='EXPORT')
+
+        plan = _memory_plans.get(tree.name) if tree else None
+        if plan is None:
+            return
+
+        col = layout.column(align=True)
+        col.label(text=f"Ranks: {plan.ranks} data" + (" + 1 head" if plan.create_head_node else "") + f" on {plan.nodes} node(s)")
+        col.label(text=f"Parts: {plan.num_parts} in {plan.ndg} data group(s)")
+        col.label(text=f"Per group: {format_bytes(max(plan.group_bytes))} max, {format_bytes(min(plan.group_bytes))} min")
+        col.label(text=f"Per rank: {format_bytes(plan.rank_bytes)}")
+        if plan.create_head_node:
+            col.label(text=f"Head node: {format_bytes(plan.head_bytes)}")
+        col.label(text=f"Per node: {format_bytes(max(plan.node_bytes))}")
+        for warning in plan.warnings():
+            col.label(text=warning, icon='ERROR')
+
+##################################################RUN###################################################################
+# haystack_run.CommandRunner per (tree name, render node name)
+_render_runs = {}
+
+# Output lines shown in the panel
+RUN_PANEL_LINES = 12
+
+def get_render_run(node):
+    return _render_runs.get((node.id_data.name, node.name))
+
+def render_run_timer():
+    """Store measurements of finished runs, redraw the run panels while commands are running"""
+    store_measurements()
+
+    tag_node_editors()
+
+    if any(run.state == haystack_run.STATE_RUNNING for run in _render_runs.values()):
+        return 0.5
+    return None
+
+def cancel_render_runs():
+    for run in _render_runs.values():
+        run.cancel()
+    _render_runs.clear()
+
+class HAYSTACK_OT_run_render(Operator):
+    """Run the command of the render node locally, Blender stays responsive while it runs"""
+    bl_idname = "haystack_composer.run_render"
+    bl_label = "Run"
+
+    @classmethod
+    def poll(cls, context):
+        node = getattr(context, "node", None)
+        if not isinstance(node, (HayStackRenderViewerNode, HayStackRenderOfflineNode)):
+            return False
+        run = get_render_run(node)
+        return run is None or run.state != haystack_run.STATE_RUNNING
+
+    def execute(self, context):
+        node = context.node
+        tree = node.id_data
+
+        if haystack_pref.preferences().haystack_remote:
+            self.report({'ERROR'}, "Remote paths can not be run locally, disable Remote in the preferences.")
+            return {'CANCELLED'}
+
+        try:
+            command = tree.generate_commands([node])[0]
+            tree.export_transfer_functions()
+        except (ValueError, OSError) as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+
+        order, _ = haystack_command.collect_inputs([node], tree._node_inputs)
+        properties = next((input_command for input_command in (input_node.to_command() for input_node in order)
+                           if isinstance(input_command, haystack_command.PropertiesCommand)), None)
+
+        parser = None
+        if properties is not None and properties.measure:
+            parser = haystack_measure.MeasureParser()
+
+        try:
+            run = haystack_run.CommandRunner(
+                command,
+                cwd=os.path.dirname(bpy.data.filepath) or None,
+                total_frames=properties.num_frames if properties is not None else None,
+                on_line=parser.feed if parser is not None else None,
+            )
+        except (ValueError, OSError) as e:
+            self.report({'ERROR'}, f"Could not start {node.get_file_path()}: {str(e)}")
+            return {'CANCELLED'}
+
+        key = (tree.name, node.name)
+        _render_runs[key] = run
+        if parser is not None:
+            _render_measures[key] = (run, parser, tree.measure_record(node, command, []))
+        if not bpy.app.timers.is_registered(render_run_timer):
+            bpy.app.timers.register(render_run_timer, first_interval=0.5)
+
+        return {'FINISHED'}
+
+class HAYSTACK_OT_cancel_render(Operator):
+    """Stop the locally running command of the render node"""
+    bl_idname = "haystack_composer.cancel_render"
+    bl_label = "Cancel"
+
+    @classmethod
+    def poll(cls, context):
+        node = getattr(context, "node", None)
+        run = get_render_run(node) if isinstance(node, HayStackRenderBaseNode) else None
+        return run is not None and run.state == haystack_run.STATE_RUNNING
+
+    def execute(self, context):
+        get_render_run(context.node).cancel()
+        return {'FINISHED'}
+
+class HAYSTACK_PT_render_run(Panel):
+    bl_space_type = 'NODE_EDITOR'
+    bl_region_type = 'UI'
+    bl_category = "HAYSTACK"
+    bl_label = "Run"
+    bl_parent_id = "HAYSTACK_PT_composer_panel"
+
+    @classmethod
+    def poll(cls, context):
+        tree = context.space_data.edit_tree
+        node = tree.nodes.active if tree else None
+        return isinstance(node, (HayStackRenderViewerNode, HayStackRenderOfflineNode))
+
+    def draw(self, context):
+        layout = self.layout
+        node = context.space_data.edit_tree.nodes.active
+        layout.context_pointer_set("node", node)
+
+        row = layout.row(align=True)
+        row.operator("haystack_composer.run_render", icon='PLAY')
+        row.operator("haystack_composer.cancel_render", icon='CANCEL')
+
+        run = get_render_run(node)
+        if run is None:
+            return
+
+        col = layout.column(align=True)
+        status = f"{run.state.capitalize()} {run.elapsed:.0f}s"
+        if run.returncode is not None:
+            status += f", exit code {run.returncode}"
+        col.label(text=status)
+        if run.progress is not None:
+            col.progress(factor=run.progress, text=f"{run.progress * 100.0:.0f}%")
+
+        lines = run.tail(RUN_PANEL_LINES)
+        if lines:
+            box = layout.box().column(align=True)
+            if run.line_count > len(lines):
+                box.label(text=f"... {run.line_count - len(lines)} earlier lines")
+            for line in lines:
+                box.label(text=line)
+
+##################################################MEASURE###################################################################
+_measure_history = None
+
+# (run, parser, record) of measured local runs per (tree name, render node name)
+_render_measures = {}
+
+# Runs listed in the history panel
+MEASURE_PANEL_RUNS = 8
+
+def get_measure_history():
+    global _measure_history
+    if _measure_history is None:
+        directory = bpy.utils.user_resource('CONFIG', path=haystack_pref.ADDON_NAME, create=True)
+        _measure_history = haystack_measure.MeasureHistory(os.path.join(directory, "measure_history.jsonl"))
+    return _measure_history
+
+def store_measurements():
+    """Append the frame times of finished measured runs to the history"""
+    for key, (run, parser, record) in list(_render_measures.items()):
+        if run.state == haystack_run.STATE_RUNNING:
+            continue
+        del _render_measures[key]
+        if run.state != haystack_run.STATE_FINISHED:
+            continue
+        if not parser.frame_times:
+            bpy.context.scene.haystack_measure_status = f"No frame times in the output of {record.node}"
+            continue
+        record.frame_times = list(parser.frame_times)
+        add_measure_record(record)
+
+def add_measure_record(record):
+    history = get_measure_history()
+    try:
+        history.append(record)
+    except OSError as e:
+        bpy.context.scene.haystack_measure_status = f"Could not store the measurement: {str(e)}"
+        return
+    change = haystack_measure.compare(record, history.previous(record))
+    bpy.context.scene.haystack_measure_status = (f"{record.node}: {record.median * 1000.0:.1f} ms/frame, "
+                                                 f"{haystack_measure.describe_change(change)}")
+
+class HAYSTACK_OT_measure_import(Operator, ImportHelper):
+    """Add the frame times of a --measure log, e.g. the output of a cluster job, to the history of the tree"""
+    bl_idname = "haystack_composer.measure_import"
+    bl_label = "Import Log"
+
+    filter_glob: StringProperty(
+        default="*.log;*.txt;*.out",
+        options={'HIDDEN'}
+    ) # type: ignore
+
+    @classmethod
+    def poll(cls, context):
+        space = context.space_data
+        return space.type == 'NODE_EDITOR' and space.tree_type == 'HayStackComposerTreeType' and space.edit_tree is not None
+
+    def execute(self, context):
+        tree = context.space_data.edit_tree
+        render_node = tree.nodes.active
+        if not isinstance(render_node, HayStackRenderBaseNode):
+            render_nodes = tree.find_render_nodes()
+            if not render_nodes:
+                self.report({'ERROR'}, "No Render node found in the node tree.")
+                return {'CANCELLED'}
+            render_node = render_nodes[0]
+
+        try:
+            with open(self.filepath, "r", encoding="utf-8", errors="replace") as f:
+                parser = haystack_measure.MeasureParser().feed_text(f.read())
+            if not parser.frame_times:
+                raise ValueError("No frame times found in the log.")
+            command = tree.generate_commands([render_node])[0]
+            record = tree.measure_record(render_node, command, parser.frame_times)
+        except (ValueError, OSError) as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+        except ImportError:
+            self.report({'ERROR'}, "BRAAS HPC addon not found. Please install and enable it.")
+            return {'CANCELLED'}
+
+        add_measure_record(record)
+        return {'FINISHED'}
+
+class HAYSTACK_PT_measure_history(Panel):
+    bl_space_type = 'NODE_EDITOR'
+    bl_region_type = 'UI'
+    bl_category = "HAYSTACK"
+    bl_label = "Measurements"
+    bl_parent_id = "HAYSTACK_PT_composer_panel"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        layout = self.layout
+        tree = context.space_data.edit_tree
+
+        layout.operator("haystack_composer.measure_import", icon='IMPORT')
+        if context.scene.haystack_measure_status:
+            layout.label(text=context.scene.haystack_measure_status)
+
+        if tree is None:
+            return
+        history = get_measure_history()
+        runs = history.runs(tree.name)
+        if not runs:
+            layout.label(text="Run with Measure enabled to record frame times")
+            return
+
+        col = layout.column(align=True)
+        for record in reversed(runs[-MEASURE_PANEL_RUNS:]):
+            previous = history.previous(record)
+            change = haystack_measure.compare(record, previous)
+            changed_settings = previous is not None and not record.same_settings(previous)
+            col.label(
+                text=(f"{time.strftime('%m-%d %H:%M', time.localtime(record.time))} {record.node}: "
+                      f"{record.median * 1000.0:.1f} ms, {haystack_measure.describe_change(change)}"),
+                icon='MODIFIER' if changed_settings else 'BLANK1'
+            )
+            col.label(text=(f"      {format_bytes(record.dataset_bytes)}, ndg {record.ndg} dpr {record.dpr}, "
+                            f"{record.resolution[0]}x{record.resolution[1]}, ppp {record.paths_per_pixel}"))
+
 class HAYSTACK_OT_GenerateCodeTree(Operator):
     """Generate Command Line from node tree"""
     bl_idname = "haystack_composer.generate_code_tree"
@@ -1501,8 +4295,22 @@ class HAYSTACK_OT_GenerateCodeTree(Operator):
             self.report({'ERROR'}, "No active node tree")
             return {'CANCELLED'}
         
-        text_name = tree.generate_command_code()
-        self.report({'INFO'}, f"Generated code in text block '{text_name}'")
+        try:
+            text_names, unsized = tree.generate_command_code()
+        except (ValueError, OSError) as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, f"Generated code in text block(s) {', '.join(repr(name) for name in text_names)}")
+        if unsized:
+            self.report({'WARNING'}, f"Job script not written, unknown input size of {', '.join(unsized)}: generate again once the preflight has finished")
+
+        # The .xf file is only exported locally, a remote copy is always checked
+        if (tree.preflight_files or unsized or tree.has_remote_transfer_functions()) and _preflight_task is None:
+            try:
+                start_preflight(tree)
+            except ImportError:
+                self.report({'WARNING'}, "BRAAS HPC addon not found, files were not checked.")
         
         return {'FINISHED'}
 
@@ -1550,6 +4358,10 @@ haystack_node_categories = [
         NodeItem("HayStackRenderOfflineNodeType"),        
     ]),    
 
+    HayStackComposerNodeCategory("HAYSTACK_BATCH_NODES", "Batch", items=[
+        NodeItem("HayStackSweepNodeType"),
+    ]),
+
     # HayStackComposerNodeCategory("HAYSTACK_RENDER_NODES", "Render", items=[
     # ]),    
 ]
@@ -1579,6 +4391,7 @@ classes = [
     HayStackRenderViewerNode,
     HayStackRenderViewerQTNode,
     HayStackRenderOfflineNode,
+    HayStackSweepNode,
 
     #Property
     HayStackPropertiesNode,
@@ -1599,10 +4412,38 @@ classes = [
     HAYSTACK_PG_remote_files,
     HAYSTACK_UL_remote_files,
     HAYSTACK_PT_remote_file_path_node,
+    HAYSTACK_OT_remote_index_build,
+    HAYSTACK_OT_remote_index_select,
+    HAYSTACK_PG_remote_index_hit,
+    HAYSTACK_UL_remote_index_hits,
+    HAYSTACK_PT_remote_index,
+    HAYSTACK_OT_camera_bake_path,
     HAYSTACK_OT_tf_create_material,
+    HAYSTACK_OT_tf_scan_volume,
+    HAYSTACK_OT_tf_export_xf,
+    HAYSTACK_OT_raw_apply_layout,
+    HAYSTACK_OT_nanovdb_apply_spacing,
+    HAYSTACK_OT_raw_preview_slice,
+    HAYSTACK_OT_preview_points,
+    HAYSTACK_PG_preflight_issue,
+    HAYSTACK_OT_preflight_tree,
+    HAYSTACK_PG_parts_advice,
+    HAYSTACK_OT_recommend_num_parts,
+    HAYSTACK_OT_memory_plan,
+    HAYSTACK_OT_memory_plan_export,
+    HAYSTACK_OT_run_render,
+    HAYSTACK_OT_cancel_render,
+    HAYSTACK_OT_measure_import,
+    HAYSTACK_OT_sweep_run,
+    HAYSTACK_OT_sweep_cancel,
+    HAYSTACK_OT_sweep_write_job,
+    HAYSTACK_OT_sweep_collect,
     HAYSTACK_OT_GenerateCodeTree,
     HAYSTACK_OT_GenerateCodeNode,
     HAYSTACK_PT_ComposerPanel,
+    HAYSTACK_PT_memory_plan,
+    HAYSTACK_PT_render_run,
+    HAYSTACK_PT_measure_history,
     ]
 
 def register():
@@ -1616,8 +4457,81 @@ def register():
     Scene.haystack_remote_list = CollectionProperty(type=HAYSTACK_PG_remote_files)
     Scene.haystack_remote_list_index = IntProperty(default=-1)
     Scene.haystack_remote_path = StringProperty(name="Remote path", default="/")
+    Scene.haystack_remote_loading = BoolProperty(default=False)
+    Scene.haystack_remote_error = StringProperty(default="")
+
+    Scene.haystack_index_root = StringProperty(name="Index root", default="/")
+    Scene.haystack_index_query = StringProperty(name="Search", default="", options={'TEXTEDIT_UPDATE'}, update=haystack_index_search)
+    Scene.haystack_index_fuzzy = BoolProperty(name="Fuzzy", default=True, update=haystack_index_search)
+    Scene.haystack_index_extensions = EnumProperty(
+        name="Extensions",
+        items=[(key, extension, f"Only {extension} files") for key, extension in REMOTE_INDEX_EXTENSIONS.items()],
+        options={'ENUM_FLAG'},
+        default=set(),
+        update=haystack_index_search,
+    )
+    Scene.haystack_index_hits = CollectionProperty(type=HAYSTACK_PG_remote_index_hit)
+    Scene.haystack_index_hits_index = IntProperty(default=-1)
+    Scene.haystack_index_status = StringProperty(default="")
+    Scene.haystack_index_busy = BoolProperty(default=False)
+
+    Scene.haystack_preflight_issues = CollectionProperty(type=HAYSTACK_PG_preflight_issue)
+    Scene.haystack_preflight_status = StringProperty(default="")
+
+    Scene.haystack_tf_scan_status = StringProperty(default="")
+
+
+    Scene.haystack_parts_advice = CollectionProperty(type=HAYSTACK_PG_parts_advice)
+    Scene.haystack_parts_status = StringProperty(default="")
+
+    Scene.haystack_measure_status = StringProperty(default="")
+
+    bpy.app.handlers.load_post.append(auto_generate_load_post)
+    bpy.app.handlers.load_post.append(code_cache_load_post)
+    bpy.app.handlers.undo_post.append(node_fingerprints_undo)
+    bpy.app.handlers.redo_post.append(node_fingerprints_undo)
+
+    global _tf_histogram_handle
+    _tf_histogram_handle = bpy.types.SpaceNodeEditor.draw_handler_add(draw_tf_histogram, (), 'WINDOW', 'POST_VIEW')
+
 
 def unregister():
+    if code_cache_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(code_cache_load_post)
+    if node_fingerprints_undo in bpy.app.handlers.undo_post:
+        bpy.app.handlers.undo_post.remove(node_fingerprints_undo)
+    if node_fingerprints_undo in bpy.app.handlers.redo_post:
+        bpy.app.handlers.redo_post.remove(node_fingerprints_undo)
+    clear_node_fingerprints()
+    if auto_generate_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(auto_generate_load_post)
+    unsubscribe_auto_generate()
+
+    _remote_listing.cancel()
+    close_remote_backends()
+    if bpy.app.timers.is_registered(remote_listing_timer):
+        bpy.app.timers.unregister(remote_listing_timer)
+    if bpy.app.timers.is_registered(remote_index_timer):
+        bpy.app.timers.unregister(remote_index_timer)
+    if bpy.app.timers.is_registered(preflight_timer):
+        bpy.app.timers.unregister(preflight_timer)
+    if bpy.app.timers.is_registered(tf_scan_timer):
+        bpy.app.timers.unregister(tf_scan_timer)
+    if bpy.app.timers.is_registered(preview_timer):
+        bpy.app.timers.unregister(preview_timer)
+    cancel_render_runs()
+    _render_measures.clear()
+    cancel_sweeps()
+    if bpy.app.timers.is_registered(sweep_timer):
+        bpy.app.timers.unregister(sweep_timer)
+    if bpy.app.timers.is_registered(render_run_timer):
+        bpy.app.timers.unregister(render_run_timer)
+
+    global _tf_histogram_handle
+    if _tf_histogram_handle is not None:
+        bpy.types.SpaceNodeEditor.draw_handler_remove(_tf_histogram_handle, 'WINDOW')
+        _tf_histogram_handle = None
+
     # Unregister the node categories first
     unregister_node_categories("HAYSTACK_CATEGORIES")
 
@@ -1628,3 +4542,25 @@ def unregister():
     del Scene.haystack_remote_list
     del Scene.haystack_remote_list_index    
     del Scene.haystack_remote_path
+    del Scene.haystack_remote_loading
+    del Scene.haystack_remote_error
+
+    del Scene.haystack_index_root
+    del Scene.haystack_index_query
+    del Scene.haystack_index_fuzzy
+    del Scene.haystack_index_extensions
+    del Scene.haystack_index_hits
+    del Scene.haystack_index_hits_index
+    del Scene.haystack_index_status
+    del Scene.haystack_index_busy
+
+    del Scene.haystack_preflight_issues
+    del Scene.haystack_preflight_status
+
+    del Scene.haystack_tf_scan_status
+
+
+    del Scene.haystack_parts_advice
+    del Scene.haystack_parts_status
+
+    del Scene.haystack_measure_status
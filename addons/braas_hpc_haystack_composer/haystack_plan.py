@@ -0,0 +1,329 @@
+#####################################################################################################################
+# Copyright(C) 2011-2025 IT4Innovations National Supercomputing Center, VSB - Technical University of Ostrava
+#
+# This program is free software : you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#####################################################################################################################
+
+# Data partition planning
+#
+# Independent of bpy. HayStack splits splittable loaders into num_parts parts and
+# distributes all loaded parts over -ndg data groups, every rank loads -dpr groups.
+# The advisor picks part counts that spread the bytes evenly over the groups.
+
+import heapq
+import math
+
+# Largest part count the advisor recommends for one loader
+MAX_PARTS = 4096
+
+# Groups may carry this much more than the mean before the advisor refines the split
+IMBALANCE_TOLERANCE = 1.1
+
+class PartitionInput:
+    """One loader: file size in bytes and the most parts it can be split into (1 if not splittable)"""
+    __slots__ = ('name', 'size', 'max_parts')
+
+    def __init__(self, name, size, max_parts=1):
+        self.name = name
+        self.size = size
+        self.max_parts = max(1, min(max_parts, MAX_PARTS))
+
+class PartitionAdvice:
+    """Recommended part count per loader with the resulting load per data group and rank"""
+    __slots__ = ('parts', 'group_bytes', 'dpr')
+
+    def __init__(self, parts, group_bytes, dpr):
+        # name -> part count
+        self.parts = parts
+        self.group_bytes = group_bytes
+        self.dpr = dpr
+
+    @property
+    def imbalance(self):
+        """Largest group load over the mean load, 1.0 is perfectly balanced"""
+        mean = sum(self.group_bytes) / len(self.group_bytes)
+        return max(self.group_bytes) / mean if mean > 0 else 1.0
+
+    @property
+    def rank_bytes(self):
+        """Bytes loaded by the busiest rank"""
+        return max(self.group_bytes) * self.dpr
+
+def spheres_max_parts(size, format):
+    """Number of spheres in a file, every part needs at least one"""
+    record = {"xyz": 12, "xyzf": 16, "xyzi": 16}.get(format, 12)
+    return max(1, size // record)
+
+def raw_max_parts(dims):
+    """RAW volumes are split into slabs of at least one slice"""
+    return max(1, dims[2])
+
+def effective_dpr(dpr):
+    """Data groups per rank, HayStack loads one group per rank when dpr is 0"""
+    return dpr if dpr > 0 else 1
+
+def data_ranks(num_parts, ndg=1, dpr=0):
+    """Number of data ranks a job needs
+
+    With several data groups every group has to be loaded by one rank, a rank loads
+    dpr groups (one when dpr is 0). With a single group the parts of the loaders are
+    spread over the ranks, one part per rank (dpr parts with dpr set).
+    """
+    if ndg > 1:
+        return math.ceil(ndg / effective_dpr(dpr))
+    return max(1, math.ceil(num_parts / effective_dpr(dpr)))
+
+def assign_parts(part_sizes, groups):
+    """Bytes per group after placing parts (largest first) on the least loaded group"""
+    loads = [(0, group) for group in range(groups)]
+    group_bytes = [0] * groups
+    for size in sorted(part_sizes, reverse=True):
+        load, group = heapq.heappop(loads)
+        group_bytes[group] = load + size
+        heapq.heappush(loads, (load + size, group))
+    return group_bytes
+
+def recommend_num_parts(inputs, ndg=1, dpr=0, ranks=None):
+    """PartitionAdvice balancing the bytes of inputs over ndg data groups
+
+    With a single data group the parts are balanced over ranks instead. Splittable
+    loaders are cut into parts of about the same size, starting at one part per group
+    for the total and refining until the groups are within IMBALANCE_TOLERANCE of each
+    other or the loaders can not be split further.
+    """
+    groups = ndg if ndg > 1 else max(1, ranks or 1)
+    total = sum(item.size for item in inputs)
+
+    best = None
+    for granularity in range(1, 9):
+        target = total / (groups * granularity) if total > 0 else 1.0
+        parts = {item.name: min(item.max_parts, max(1, math.ceil(item.size / target))) for item in inputs}
+
+        part_sizes = []
+        for item in inputs:
+            count = parts[item.name]
+            part_sizes.extend([item.size / count] * count)
+        group_bytes = assign_parts(part_sizes, groups)
+
+        advice = PartitionAdvice(parts, group_bytes, effective_dpr(dpr) if ndg > 1 else 1)
+        if best is None or advice.imbalance < best.imbalance:
+            best = advice
+        if advice.imbalance <= IMBALANCE_TOLERANCE:
+            break
+
+    return best
+
+##################################################Memory###################################################################
+# Accumulation (float4) and color (rgba8) buffer of every rank holding a frame buffer
+FRAMEBUFFER_BYTES_PER_PIXEL = 20
+
+DEFAULT_RESOLUTION = (1024, 1024)
+
+GIB = 1024 ** 3
+
+class LoaderLoad:
+    """A loader of the plan: file size in bytes and its current part count"""
+    __slots__ = ('name', 'size', 'parts')
+
+    def __init__(self, name, size, parts=1):
+        self.name = name
+        self.size = size
+        self.parts = max(1, parts)
+
+class MemoryPlan:
+    """Estimated bytes per data group, rank and cluster node of a tree"""
+
+    def __init__(self, loaders, ndg, dpr, create_head_node, resolution, ranks, ranks_per_node, node_budget, overhead):
+        self.loaders = loaders
+        self.ndg = max(1, ndg)
+        self.dpr = dpr
+        self.create_head_node = create_head_node
+        self.resolution = tuple(resolution)
+        self.ranks_per_node = max(1, ranks_per_node)
+        # bytes, None for no budget
+        self.node_budget = node_budget
+        self.overhead = overhead
+
+        part_sizes = []
+        for loader in loaders:
+            part_sizes.extend([loader.size / loader.parts] * loader.parts)
+        self.num_parts = len(part_sizes)
+
+        self.min_ranks = data_ranks(self.num_parts, self.ndg, dpr)
+        self.ranks = max(ranks or 0, self.min_ranks)
+
+        # With a single data group the parts are spread over the ranks themselves
+        if self.ndg > 1:
+            self.group_bytes = assign_parts(part_sizes, self.ndg)
+            groups_per_rank = effective_dpr(dpr)
+        else:
+            self.group_bytes = assign_parts(part_sizes, self.ranks)
+            groups_per_rank = 1
+
+        self.framebuffer_bytes = self.resolution[0] * self.resolution[1] * FRAMEBUFFER_BYTES_PER_PIXEL
+        self.rank_bytes = int(max(self.group_bytes) * groups_per_rank * overhead) + self.framebuffer_bytes
+        self.head_bytes = self.framebuffer_bytes if create_head_node else 0
+
+        # The head node takes the first slot of the first cluster node
+        slots = ([self.head_bytes] if create_head_node else []) + [self.rank_bytes] * self.ranks
+        self.node_bytes = [sum(slots[i:i + self.ranks_per_node]) for i in range(0, len(slots), self.ranks_per_node)]
+
+    @property
+    def total_ranks(self):
+        return self.ranks + (1 if self.create_head_node else 0)
+
+    @property
+    def nodes(self):
+        return len(self.node_bytes)
+
+    def warnings(self):
+        """Problems of the configuration, empty if it looks fine"""
+        warnings = []
+        if self.num_parts < len(self.group_bytes):
+            warnings.append(f"{len(self.group_bytes) - self.num_parts} of {len(self.group_bytes)} data groups are empty ({self.num_parts} parts)")
+        mean = sum(self.group_bytes) / len(self.group_bytes)
+        if mean > 0 and max(self.group_bytes) > 1.5 * mean:
+            warnings.append(f"data groups are unbalanced ({max(self.group_bytes) / mean:.2f}x the mean)")
+        if self.node_budget is not None and max(self.node_bytes) > self.node_budget:
+            warnings.append(f"{max(self.node_bytes) / GIB:.1f} GiB per node exceeds the budget of {self.node_budget / GIB:.1f} GiB")
+        return warnings
+
+    def to_dict(self):
+        return {
+            "ndg": self.ndg,
+            "dpr": self.dpr,
+            "create_head_node": self.create_head_node,
+            "resolution": list(self.resolution),
+            "overhead": self.overhead,
+            "loaders": [{"name": loader.name, "bytes": loader.size, "parts": loader.parts} for loader in self.loaders],
+            "num_parts": self.num_parts,
+            "group_bytes": [int(b) for b in self.group_bytes],
+            "ranks": self.ranks,
+            "min_ranks": self.min_ranks,
+            "total_ranks": self.total_ranks,
+            "rank_bytes": self.rank_bytes,
+            "head_bytes": self.head_bytes,
+            "framebuffer_bytes": self.framebuffer_bytes,
+            "ranks_per_node": self.ranks_per_node,
+            "nodes": self.nodes,
+            "node_bytes": [int(b) for b in self.node_bytes],
+            "node_budget": self.node_budget,
+            "warnings": self.warnings(),
+        }
+
+def plan_memory(loaders, ndg=1, dpr=0, create_head_node=False, resolution=DEFAULT_RESOLUTION, ranks=None,
+                ranks_per_node=1, node_budget=None, overhead=1.0):
+    """MemoryPlan of LoaderLoads distributed over ndg groups
+
+    ranks is the number of data ranks the job starts, None for the minimum that loads
+    every group once. overhead scales file bytes to in-memory bytes.
+    """
+    return MemoryPlan(loaders, ndg, dpr, create_head_node, resolution, ranks, ranks_per_node, node_budget, overhead)
+
+##################################################Job###################################################################
+# Scheduler start-up, MPI wire-up and output writing on top of the estimate
+JOB_STARTUP_SECONDS = 300
+
+# Walltimes are requested in steps of this many seconds
+WALLTIME_STEP = 300
+
+class JobEstimate:
+    """Resources of a batch job derived from a MemoryPlan and the render settings"""
+    __slots__ = ('nodes', 'ranks', 'ranks_per_node', 'memory_per_node', 'walltime',
+                 'input_bytes', 'load_seconds', 'render_seconds')
+
+    def __init__(self, nodes, ranks, ranks_per_node, memory_per_node, walltime, input_bytes, load_seconds, render_seconds):
+        self.nodes = nodes
+        self.ranks = ranks
+        self.ranks_per_node = ranks_per_node
+        # bytes, whole GiB
+        self.memory_per_node = memory_per_node
+        # seconds
+        self.walltime = walltime
+        self.input_bytes = input_bytes
+        self.load_seconds = load_seconds
+        self.render_seconds = render_seconds
+
+def estimate_job(plan, num_frames, paths_per_pixel, load_bandwidth, sample_rate, safety=1.5):
+    """JobEstimate of a MemoryPlan
+
+    load_bandwidth is the read rate of one rank in bytes/s, every rank reads its own
+    share in parallel. sample_rate is the rendering rate in paths per second, a frame
+    traces paths_per_pixel paths per pixel.
+    """
+    input_bytes = sum(loader.size for loader in plan.loaders)
+    load_seconds = (plan.rank_bytes - plan.framebuffer_bytes) / plan.overhead / load_bandwidth if load_bandwidth > 0 else 0.0
+    samples = num_frames * paths_per_pixel * plan.resolution[0] * plan.resolution[1]
+    render_seconds = samples / sample_rate if sample_rate > 0 else 0.0
+
+    seconds = safety * (load_seconds + render_seconds) + JOB_STARTUP_SECONDS
+    walltime = math.ceil(seconds / WALLTIME_STEP) * WALLTIME_STEP
+    memory = max(1, math.ceil(max(plan.node_bytes) / GIB)) * GIB
+
+    return JobEstimate(plan.nodes, plan.total_ranks, plan.ranks_per_node, memory, walltime,
+                       input_bytes, load_seconds, render_seconds)
+
+def merge_estimates(estimates):
+    """JobEstimate covering all estimates, e.g. the tasks of a job array sharing one resource request"""
+    return JobEstimate(*(max(getattr(estimate, name) for estimate in estimates) for name in JobEstimate.__slots__))
+
+def format_walltime(seconds):
+    """HH:MM:SS"""
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+def job_script(scheduler, estimate, command, job_name="haystack", account="", queue="", notes=(), array_size=None):
+    """Submission script running command, scheduler is 'SLURM' or 'PBS', notes are added as comments
+
+    With array_size the script is submitted as a job array of tasks 0..array_size-1.
+    """
+    memory = f"{estimate.memory_per_node // GIB}"
+    walltime = format_walltime(estimate.walltime)
+
+    lines = ["#!/bin/bash"]
+    if scheduler == 'PBS':
+        lines.append(f"#PBS -N {job_name}")
+        lines.append(f"#PBS -l select={estimate.nodes}:mpiprocs={estimate.ranks_per_node}:mem={memory}gb")
+        lines.append(f"#PBS -l walltime={walltime}")
+        if account:
+            lines.append(f"#PBS -A {account}")
+        if queue:
+            lines.append(f"#PBS -q {queue}")
+        if array_size:
+            lines.append(f"#PBS -J 0-{array_size - 1}")
+    else:
+        lines.append(f"#SBATCH --job-name={job_name}")
+        lines.append(f"#SBATCH --nodes={estimate.nodes}")
+        lines.append(f"#SBATCH --ntasks={estimate.ranks}")
+        lines.append(f"#SBATCH --ntasks-per-node={estimate.ranks_per_node}")
+        lines.append(f"#SBATCH --mem={memory}G")
+        lines.append(f"#SBATCH --time={walltime}")
+        if account:
+            lines.append(f"#SBATCH --account={account}")
+        if queue:
+            lines.append(f"#SBATCH --partition={queue}")
+        if array_size:
+            lines.append(f"#SBATCH --array=0-{array_size - 1}")
+
+    lines.append("")
+    lines.append(f"# Input {estimate.input_bytes / GIB:.2f} GiB, {estimate.ranks} ranks on {estimate.nodes} node(s)")
+    lines.append(f"# Estimated load {format_walltime(estimate.load_seconds)}, render {format_walltime(estimate.render_seconds)}")
+    lines.extend("# " + note for note in notes)
+    lines.append("")
+    if scheduler == 'PBS':
+        lines.append("cd \"$PBS_O_WORKDIR\"")
+    lines.append(command.strip())
+    lines.append("")
+    return "\n".join(lines)
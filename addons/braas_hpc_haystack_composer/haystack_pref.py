@@ -32,6 +32,121 @@ class HayStackPreferences(bpy.types.AddonPreferences):
         default=False
     ) # type: ignore
 
+    haystack_remote_cache_ttl: bpy.props.FloatProperty(
+        name="Listing cache TTL [s]",
+        description="How long a remote directory listing stays valid",
+        default=60.0,
+        min=0.0
+    ) # type: ignore
+
+    haystack_remote_cache_size: bpy.props.IntProperty(
+        name="Listing cache size",
+        description="Maximum number of cached remote directory listings",
+        default=256,
+        min=0
+    ) # type: ignore
+
+    haystack_stat_cache_ttl: bpy.props.FloatProperty(
+        name="File size cache TTL [s]",
+        description="How long preflight file sizes stay valid for planning, 0 keeps them until the next Preflight Files",
+        default=3600.0,
+        min=0.0
+    ) # type: ignore
+
+    haystack_remote_prefetch: bpy.props.BoolProperty(
+        name="Prefetch",
+        description="List the parent and likely child directories in the background",
+        default=True
+    ) # type: ignore
+
+    haystack_remote_backend: bpy.props.EnumProperty(
+        name="Backend",
+        description="How remote directories are listed and indexed",
+        items=[
+            ('BRAAS', "BRaaS-HPC", "Use the cluster preset of the BRaaS-HPC addon"),
+            ('SSH', "SSH", "Pool of persistent SSH sessions"),
+            ('LOCAL', "Local", "Local or mounted filesystem"),
+        ],
+        default='BRAAS'
+    ) # type: ignore
+
+    haystack_remote_ssh_destination: bpy.props.StringProperty(
+        name="SSH destination",
+        description="user@host of the SSH backend",
+        default=""
+    ) # type: ignore
+
+    haystack_remote_ssh_identity: bpy.props.StringProperty(
+        name="SSH identity",
+        description="Private key file of the SSH backend, empty uses the ssh defaults",
+        default="",
+        subtype='FILE_PATH'
+    ) # type: ignore
+
+    haystack_remote_ssh_pool_size: bpy.props.IntProperty(
+        name="SSH sessions",
+        description="Number of persistent SSH sessions",
+        default=2,
+        min=1,
+        max=16
+    ) # type: ignore
+
+    haystack_remote_ssh_timeout: bpy.props.FloatProperty(
+        name="SSH command timeout [s]",
+        description="Close the session of a remote command that runs longer, 0 waits forever",
+        default=300.0,
+        min=0.0
+    ) # type: ignore
+
+    haystack_remote_local_root: bpy.props.StringProperty(
+        name="Local root",
+        description="Directory the remote paths are resolved against, empty uses absolute paths",
+        default="",
+        subtype='DIR_PATH'
+    ) # type: ignore
+
+    haystack_node_memory: bpy.props.FloatProperty(
+        name="Memory per node [GiB]",
+        description="Memory budget of one cluster node for the memory plan, 0 disables the check",
+        default=256.0,
+        min=0.0
+    ) # type: ignore
+
+    haystack_ranks_per_node: bpy.props.IntProperty(
+        name="Ranks per node",
+        description="MPI ranks placed on one cluster node",
+        default=1,
+        min=1
+    ) # type: ignore
+
+    haystack_memory_overhead: bpy.props.FloatProperty(
+        name="Memory overhead",
+        description="In-memory size of loaded data relative to its file size (acceleration structures, copies)",
+        default=1.5,
+        min=1.0
+    ) # type: ignore
+
+    haystack_load_bandwidth: bpy.props.FloatProperty(
+        name="Load bandwidth [MiB/s]",
+        description="Read rate of one rank, used to estimate job walltimes",
+        default=500.0,
+        min=1.0
+    ) # type: ignore
+
+    haystack_sample_rate: bpy.props.FloatProperty(
+        name="Sample rate [Mpaths/s]",
+        description="Rendering rate of a job, used to estimate job walltimes",
+        default=100.0,
+        min=0.001
+    ) # type: ignore
+
+    haystack_walltime_safety: bpy.props.FloatProperty(
+        name="Walltime safety",
+        description="Factor applied to the estimated job time",
+        default=1.5,
+        min=1.0
+    ) # type: ignore
+
     def draw(self, context):
         layout = self.layout
 
@@ -39,6 +154,28 @@ class HayStackPreferences(bpy.types.AddonPreferences):
         box.label(text='Remote/Local:')
         col = box.column()
         col.prop(self, 'haystack_remote')        
+        col.prop(self, 'haystack_remote_cache_ttl')
+        col.prop(self, 'haystack_remote_cache_size')
+        col.prop(self, 'haystack_stat_cache_ttl')
+        col.prop(self, 'haystack_remote_prefetch')
+        col.prop(self, 'haystack_remote_backend')
+        if self.haystack_remote_backend == 'SSH':
+            col.prop(self, 'haystack_remote_ssh_destination')
+            col.prop(self, 'haystack_remote_ssh_identity')
+            col.prop(self, 'haystack_remote_ssh_pool_size')
+            col.prop(self, 'haystack_remote_ssh_timeout')
+        elif self.haystack_remote_backend == 'LOCAL':
+            col.prop(self, 'haystack_remote_local_root')
+
+        box = layout.box()
+        box.label(text='Cluster:')
+        col = box.column()
+        col.prop(self, 'haystack_node_memory')
+        col.prop(self, 'haystack_ranks_per_node')
+        col.prop(self, 'haystack_memory_overhead')
+        col.prop(self, 'haystack_load_bandwidth')
+        col.prop(self, 'haystack_sample_rate')
+        col.prop(self, 'haystack_walltime_safety')
        
 
 def ctx_preferences():
@@ -0,0 +1,205 @@
+#####################################################################################################################
+# Copyright(C) 2011-2025 IT4Innovations National Supercomputing Center, VSB - Technical University of Ostrava
+#
+# This program is free software : you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#####################################################################################################################
+
+# Preflight of the files referenced by a tree
+#
+# Independent of bpy. The loader commands of a tree are turned into file checks,
+# all files are inspected with one batched RemoteBackend.stat_files() call and
+# the results are cached, so missing files and size mismatches show up before
+# a job is queued instead of after it crashed on the cluster.
+
+import collections
+import threading
+import time
+
+from . import haystack_command
+from . import haystack_raw
+from . import haystack_remote
+
+# Bytes per sphere of the spheres:// formats
+SPHERES_RECORD_SIZES = {
+    "xyz": 12,
+    "xyzf": 16,
+    "xyzi": 16,
+}
+
+# NanoVDB grids and files start with "NanoVDB" followed by a version digit
+NANOVDB_MAGIC = b"NanoVDB"
+
+HEADER_SIZE = 16
+
+SEVERITY_ERROR = "ERROR"
+SEVERITY_WARNING = "WARNING"
+
+PreflightIssue = collections.namedtuple("PreflightIssue", ("node_name", "path", "severity", "message"))
+
+class FileCheck:
+    """Expectations on one referenced file"""
+    __slots__ = ('node_name', 'path', 'expected_size', 'record_size', 'magic', 'hint')
+
+    def __init__(self, node_name, path, expected_size=None, record_size=None, magic=None, hint=None):
+        self.node_name = node_name
+        self.path = path
+        self.expected_size = expected_size
+        self.record_size = record_size
+        self.magic = magic
+        # Appended to the error of a missing or unreadable file
+        self.hint = hint
+
+    def issues(self, stat):
+        """PreflightIssues of the FileStat of the file"""
+        def issue(severity, message):
+            return PreflightIssue(self.node_name, self.path, severity, message)
+
+        if stat.status != haystack_remote.FILE_OK:
+            return [issue(SEVERITY_ERROR, f"{stat.status}, {self.hint}" if self.hint else stat.status)]
+
+        issues = []
+        if stat.size == 0:
+            issues.append(issue(SEVERITY_WARNING, "empty file"))
+        if self.expected_size is not None and stat.size != self.expected_size:
+            issues.append(issue(SEVERITY_ERROR, f"size {stat.size} B, expected {self.expected_size} B"))
+        if self.record_size and stat.size % self.record_size != 0:
+            issues.append(issue(SEVERITY_WARNING, f"size {stat.size} B is not a multiple of {self.record_size} B records"))
+        if self.magic is not None and not stat.header.startswith(self.magic):
+            issues.append(issue(SEVERITY_ERROR, f"unexpected header {stat.header[:len(self.magic)]!r}"))
+        return issues
+
+class StatCache:
+    """FileStats of checked files keyed by (backend key, path)
+
+    Sizes of remote files are only known from a preflight and the planning reads them
+    long after it, so stats live for their own lifetime (ttl seconds, None until
+    invalidated) rather than the short one of directory listings. Thread safe, it is
+    filled by the preflight thread and read on the main thread.
+    """
+
+    def __init__(self, max_entries=4096, ttl=None, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+
+    def configure(self, max_entries, ttl):
+        with self._lock:
+            self.max_entries = max_entries
+            self.ttl = ttl
+            self._evict()
+
+    def get(self, key):
+        """FileStat of a (backend key, path), None if not checked or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stamp, stat = entry
+            if self.ttl is not None and self._clock() - stamp > self.ttl:
+                del self._entries[key]
+                return None
+            return stat
+
+    def put(self, key, stat):
+        with self._lock:
+            self._entries[key] = (self._clock(), stat)
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def invalidate(self, backend_key=None):
+        """Drop the stats of one backend, or everything"""
+        with self._lock:
+            if backend_key is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if key[0] == backend_key]:
+                    del self._entries[key]
+
+    def _evict(self):
+        while len(self._entries) > max(self.max_entries, 0):
+            self._entries.popitem(last=False)
+
+def loader_file_check(node_name, command):
+    """FileCheck of a LoaderCommand, None if the command does not reference a file"""
+    if not isinstance(command, haystack_command.LoaderCommand) or not command.path:
+        return None
+
+    check = FileCheck(node_name, command.path)
+
+    if command.scheme == "raw://":
+        format = command.get_option("format")
+        dims = command.get_option("dims")
+        channels = command.get_option("channels", (1,))
+        if format and dims and len(dims) == 3:
+            check.expected_size = haystack_raw.raw_file_size(format[0], dims, channels[0])
+
+    elif command.scheme == "spheres://":
+        format = command.get_option("format")
+        if format:
+            check.record_size = SPHERES_RECORD_SIZES.get(format[0])
+
+    elif command.scheme == "nvdb://":
+        check.magic = NANOVDB_MAGIC
+
+    return check
+
+def transfer_function_file_check(node_name, command, exported_path=""):
+    """FileCheck of the .xf file of a TransferFunctionCommand, None without a path
+
+    exported_path is the file written by the exporter. When the command references
+    another path (in remote mode) nothing copies the file there, a missing file is
+    reported together with the file to copy.
+    """
+    if not isinstance(command, haystack_command.TransferFunctionCommand) or not command.path:
+        return None
+
+    check = FileCheck(node_name, command.path)
+    if exported_path and exported_path != command.path:
+        check.hint = f"copy the exported {exported_path} there"
+    return check
+
+def preflight(backend, checks, cache=None, refresh=False):
+    """Run checks against the files of backend, return the list of PreflightIssues
+
+    All uncached files are inspected in one batched stat_files() call. cache is a
+    StatCache, with refresh the cached stats of the backend are dropped first.
+    """
+    if cache is not None and refresh:
+        cache.invalidate(backend.key)
+
+    stats = {}
+    missing = {}
+    for check in checks:
+        if check.path in stats or check.path in missing:
+            continue
+        stat = None if cache is None else cache.get((backend.key, check.path))
+        if stat is None:
+            missing[check.path] = None
+        else:
+            stats[check.path] = stat
+
+    if missing:
+        paths = list(missing)
+        for path, stat in zip(paths, backend.stat_files(paths, HEADER_SIZE)):
+            stats[path] = stat
+            if cache is not None:
+                cache.put((backend.key, path), stat)
+
+    issues = []
+    for check in checks:
+        issues.extend(check.issues(stats[check.path]))
+    return issues
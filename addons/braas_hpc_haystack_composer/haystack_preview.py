@@ -0,0 +1,104 @@
+#####################################################################################################################
+# Copyright(C) 2011-2025 IT4Innovations National Supercomputing Center, VSB - Technical University of Ostrava
+#
+# This program is free software : you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#####################################################################################################################
+
+# Level of detail previews of point-like loaders
+#
+# Independent of bpy. The raw spheres://, boxes:// and cylinders:// files are memory
+# mapped as numpy record arrays and only a strided or random subset of the records,
+# limited by a point budget, is read, so files of hundreds of millions of records
+# preview without being loaded.
+
+import numpy as np
+
+from . import haystack_raw
+
+# Record layouts of the raw files
+RECORD_DTYPES = {
+    "xyz": np.dtype([("position", "<f4", 3)]),
+    "xyzf": np.dtype([("position", "<f4", 3), ("value", "<f4")]),
+    "xyzi": np.dtype([("position", "<f4", 3), ("value", "<i4")]),
+    # box3f: lower and upper corner
+    "boxes": np.dtype([("lower", "<f4", 3), ("upper", "<f4", 3)]),
+    # end points of the cylinder axis
+    "cylinders": np.dtype([("a", "<f4", 3), ("b", "<f4", 3)]),
+}
+
+SAMPLING_STRIDED = 'STRIDED'
+SAMPLING_RANDOM = 'RANDOM'
+
+class PointSample:
+    """Subset of the records of a file as points with a radius and an optional scalar value"""
+    __slots__ = ('positions', 'radii', 'values', 'total')
+
+    def __init__(self, positions, radii, values, total):
+        # (N, 3) float32
+        self.positions = positions
+        # (N,) float32
+        self.radii = radii
+        # (N,) float32 or None
+        self.values = values
+        # Records in the file
+        self.total = total
+
+    def __len__(self):
+        return len(self.positions)
+
+def sample_indices(total, budget, method=SAMPLING_STRIDED, seed=0):
+    """Sorted record indices of a level of detail of at most budget records, a slice for strided sampling"""
+    if total <= budget:
+        return slice(None)
+    if method == SAMPLING_RANDOM:
+        # Drawing with replacement and dropping duplicates never builds a permutation of all records
+        indices = np.random.default_rng(seed).integers(0, total, budget, dtype=np.int64)
+        return np.unique(indices)
+    return slice(0, total, -(-total // budget))
+
+def sample_records(path, kind, budget, method=SAMPLING_STRIDED, radius=1.0, seed=0):
+    """PointSample of a raw spheres (kind "xyz", "xyzf", "xyzi"), "boxes" or "cylinders" file
+
+    Spheres get radius, boxes half their largest extent and cylinders half their length.
+    Trailing bytes that do not form a whole record are ignored.
+    """
+    dtype = RECORD_DTYPES[kind]
+    mapped = haystack_raw.map_file(path)
+    if mapped is None:
+        return PointSample(np.empty((0, 3), np.float32), np.empty(0, np.float32), None, 0)
+
+    try:
+        total = len(mapped) // dtype.itemsize
+        records = np.frombuffer(mapped, dtype=dtype, count=total)
+        # Indexing copies the sampled records, only their pages are read
+        sample = records[sample_indices(total, budget, method, seed)].copy()
+        del records
+    finally:
+        mapped.close()
+
+    values = None
+    if kind in ("xyz", "xyzf", "xyzi"):
+        positions = sample["position"]
+        radii = np.full(len(sample), radius, dtype=np.float32)
+        if kind != "xyz":
+            values = sample["value"].astype(np.float32)
+    elif kind == "boxes":
+        positions = (sample["lower"] + sample["upper"]) * 0.5
+        radii = (sample["upper"] - sample["lower"]).max(axis=1) * 0.5
+    else:
+        positions = (sample["a"] + sample["b"]) * 0.5
+        radii = np.linalg.norm(sample["b"] - sample["a"], axis=1) * 0.5
+
+    return PointSample(np.ascontiguousarray(positions, dtype=np.float32), radii.astype(np.float32), values, total)
@@ -0,0 +1,356 @@
+#####################################################################################################################
+# Copyright(C) 2011-2025 IT4Innovations National Supercomputing Center, VSB - Technical University of Ostrava
+#
+# This program is free software : you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#####################################################################################################################
+
+# RAW volume inspection
+#
+# Independent of bpy. Files are memory-mapped, never read as a whole: checking the
+# layout of a multi-hundred-GB volume only costs a stat and a mapping.
+
+import mmap
+import os
+import re
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+
+# Bytes per voxel of the raw:// formats (format option values)
+RAW_VOXEL_SIZES = {
+    "uint8": 1,
+    "byte": 1,
+    "float": 4,
+    "f": 4,
+    "uint16": 2,
+}
+
+# Formats offered as suggestions, one per voxel size
+SUGGESTED_FORMATS = ("float", "uint16", "uint8")
+
+# Format names found in file names, e.g. volume_512x512x256_uint16.raw
+_NAME_FORMATS = {
+    "uint8": "uint8",
+    "u8": "uint8",
+    "byte": "uint8",
+    "uint16": "uint16",
+    "u16": "uint16",
+    "float": "float",
+    "float32": "float",
+    "f32": "float",
+}
+
+_NAME_DIMS = re.compile(r"(\d+)[x_X](\d+)[x_X](\d+)")
+_NAME_NUMBERS = re.compile(r"\d+")
+_NAME_WORDS = re.compile(r"[a-z0-9]+")
+
+def raw_file_size(format, dims, channels):
+    """Size of a raw volume in bytes, None for unknown formats"""
+    voxel_size = RAW_VOXEL_SIZES.get(format)
+    if voxel_size is None:
+        return None
+    return dims[0] * dims[1] * dims[2] * channels * voxel_size
+
+def map_file(path):
+    """Read-only memory map of a whole file, None for empty files
+
+    Mapping does not read the file, pages are loaded only when touched.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+def _cube_root(n):
+    """Integer cube root of n if n is a perfect cube, else None"""
+    root = round(n ** (1.0 / 3.0))
+    for candidate in (root - 1, root, root + 1):
+        if candidate > 0 and candidate * candidate * candidate == n:
+            return candidate
+    return None
+
+def _name_hints(name):
+    """(format, dims) hints parsed from a file name, either may be None"""
+    name = name.lower()
+
+    format = None
+    for word in _NAME_WORDS.findall(name):
+        if word in _NAME_FORMATS:
+            format = _NAME_FORMATS[word]
+            break
+
+    match = _NAME_DIMS.search(name)
+    if match:
+        dims = tuple(int(v) for v in match.groups())
+    else:
+        # A single size in the name, e.g. magnetic-512-volume.raw, usually means a cube
+        numbers = [int(v) for v in _NAME_NUMBERS.findall(name) if int(v) > 1]
+        dims = (numbers[0],) * 3 if len(numbers) == 1 else None
+
+    return format, dims
+
+def suggest_layouts(file_size, format, dims, channels, name="", limit=6):
+    """(format, dims, channels) combinations matching file_size exactly, most plausible first
+
+    Hints from the file name come first, then layouts keeping the current format
+    (solving the last dimension, a cube), then cubes of the other formats.
+    """
+    suggestions = []
+
+    def add(candidate_format, candidate_dims, candidate_channels):
+        candidate = (candidate_format, tuple(candidate_dims), candidate_channels)
+        if candidate in suggestions or min(candidate_dims) <= 0:
+            return
+        if raw_file_size(candidate_format, candidate_dims, candidate_channels) == file_size:
+            suggestions.append(candidate)
+
+    def voxels(candidate_format, candidate_channels):
+        size = RAW_VOXEL_SIZES[candidate_format] * candidate_channels
+        return file_size // size if file_size % size == 0 else None
+
+    name_format, name_dims = _name_hints(name)
+    formats = [f for f in (name_format, format) if f in RAW_VOXEL_SIZES]
+    formats += [f for f in SUGGESTED_FORMATS if f not in formats]
+    channel_options = [channels] if channels == 1 else [channels, 1]
+
+    if name_dims is not None:
+        for candidate_format in formats:
+            for candidate_channels in channel_options:
+                add(candidate_format, name_dims, candidate_channels)
+
+    for candidate_format in formats:
+        for candidate_channels in channel_options:
+            count = voxels(candidate_format, candidate_channels)
+            if count is None:
+                continue
+            # Keep x and y, solve z
+            if dims[0] > 0 and dims[1] > 0 and dims[0] * dims[1] > 1 and count % (dims[0] * dims[1]) == 0:
+                add(candidate_format, (dims[0], dims[1], count // (dims[0] * dims[1])), candidate_channels)
+            side = _cube_root(count)
+            if side is not None:
+                add(candidate_format, (side, side, side), candidate_channels)
+
+    return suggestions[:limit]
+
+class RawInspection:
+    """Result of inspect_raw()"""
+    __slots__ = ('file_size', 'expected_size', 'errors', 'suggestions')
+
+    def __init__(self, file_size, expected_size):
+        self.file_size = file_size
+        self.expected_size = expected_size
+        self.errors = []
+        # list of (format, dims, channels)
+        self.suggestions = []
+
+    @property
+    def ok(self):
+        return not self.errors
+
+def inspect_raw(path, format, dims, channels, extract=None):
+    """Check a local raw volume against its declared layout
+
+    format is a raw:// format option value, extract the extract option or None.
+    Raises OSError if the file cannot be opened.
+    """
+    dims = tuple(dims)
+    mapped = map_file(path)
+    try:
+        file_size = len(mapped) if mapped is not None else 0
+    finally:
+        if mapped is not None:
+            mapped.close()
+
+    expected_size = raw_file_size(format, dims, channels) if min(dims) > 0 and channels > 0 else None
+    inspection = RawInspection(file_size, expected_size)
+
+    if format not in RAW_VOXEL_SIZES:
+        inspection.errors.append(f"unknown format '{format}'")
+    elif min(dims) <= 0 or channels <= 0:
+        inspection.errors.append("dims and channels must be positive")
+    elif expected_size != file_size:
+        inspection.errors.append(f"file has {file_size} B, layout needs {expected_size} B")
+
+    if extract is not None:
+        for axis, value, size in zip("xyz", extract, dims):
+            # extract is the lower corner of the region, at least one voxel has to remain
+            if value < 0 or value >= size:
+                inspection.errors.append(f"extract {axis}={value} outside of 0..{size - 1}")
+
+    if expected_size != file_size and file_size > 0:
+        inspection.suggestions = suggest_layouts(file_size, format, dims, channels, os.path.basename(path))
+
+    return inspection
+
+##################################################Scan###################################################################
+# numpy dtypes of the raw:// formats, raw volumes are little-endian
+NUMPY_DTYPES = {
+    "uint8": "u1",
+    "byte": "u1",
+    "float": "<f4",
+    "f": "<f4",
+    "uint16": "<u2",
+}
+
+# Bytes of the file mapped into one numpy view, bounds the memory of every scan worker
+CHUNK_BYTES = 16 * 1024 * 1024
+
+class VolumeHistogram:
+    """Value range and histogram of one channel, counts has one entry per bin over [min, max]"""
+    __slots__ = ('min', 'max', 'counts')
+
+    def __init__(self, min, max, counts):
+        self.min = min
+        self.max = max
+        self.counts = counts
+
+def scan_raw(path, format, dims, channels, channel=0, bins=256, chunk_bytes=CHUNK_BYTES, workers=1):
+    """Stream a raw volume in chunks and return its VolumeHistogram
+
+    The file is memory-mapped and every chunk is a zero-copy numpy view, memory stays
+    bounded by workers x chunk_bytes regardless of the volume size. Integer formats
+    take one pass (exact counts per value), float takes two (range, then histogram);
+    NaN and infinite values are ignored. With workers > 1 chunks are processed on a
+    thread pool.
+    """
+    dtype = np.dtype(NUMPY_DTYPES[format])
+    record = dtype.itemsize * channels
+    total = dims[0] * dims[1] * dims[2]
+    if total <= 0 or not 0 <= channel < channels:
+        raise ValueError("Invalid dims or channel")
+
+    mapped = map_file(path)
+    if mapped is None or len(mapped) < total * record:
+        if mapped is not None:
+            mapped.close()
+        raise ValueError(f"File is smaller than {total * record} B")
+
+    # bincount works on an int64 copy of integer chunks
+    chunk_voxels = max(1, chunk_bytes // (8 * channels if dtype.kind == 'u' else record))
+    chunks = [(start, min(chunk_voxels, total - start)) for start in range(0, total, chunk_voxels)]
+
+    def view(chunk):
+        start, count = chunk
+        data = np.frombuffer(mapped, dtype=dtype, count=count * channels, offset=start * record)
+        return data[channel::channels] if channels > 1 else data
+
+    def finite(data):
+        return data if dtype.kind != 'f' else data[np.isfinite(data)]
+
+    def reduce_chunks(function, combine, result):
+        """Fold function(chunk) of every chunk into result as it arrives, at most workers chunks are in flight"""
+        if workers <= 1 or len(chunks) <= 1:
+            for chunk in chunks:
+                result = combine(result, function(chunk))
+            return result
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = set()
+            for chunk in chunks:
+                if len(pending) >= workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        result = combine(result, future.result())
+                pending.add(pool.submit(function, chunk))
+            for future in wait(pending).done:
+                result = combine(result, future.result())
+        return result
+
+    def add(total, counts):
+        total += counts
+        return total
+
+    try:
+        if dtype.kind == 'u':
+            # Exact counts of every representable value, rebinned to bins over the used range
+            values = 1 << (8 * dtype.itemsize)
+            counts = reduce_chunks(lambda chunk: np.bincount(view(chunk), minlength=values), add,
+                                   np.zeros(values, dtype=np.int64))
+
+            used = np.flatnonzero(counts)
+            low, high = int(used[0]), int(used[-1])
+            if high == low:
+                histogram = np.zeros(bins, dtype=np.int64)
+                histogram[0] = counts[low]
+            else:
+                index = ((np.arange(low, high + 1) - low) * bins // (high - low + 1))
+                histogram = np.bincount(index, weights=counts[low:high + 1], minlength=bins).astype(np.int64)
+            return VolumeHistogram(float(low), float(high), histogram.tolist())
+
+        def chunk_range(chunk):
+            data = finite(view(chunk))
+            if data.size == 0:
+                return None
+            return float(data.min()), float(data.max())
+
+        def merge_range(total, chunk):
+            if total is None or chunk is None:
+                return total if chunk is None else chunk
+            return min(total[0], chunk[0]), max(total[1], chunk[1])
+
+        value_range = reduce_chunks(chunk_range, merge_range, None)
+        if value_range is None:
+            raise ValueError("Volume has no finite values")
+        low, high = value_range
+
+        histogram = reduce_chunks(lambda chunk: np.histogram(finite(view(chunk)), bins=bins, range=(low, high))[0], add,
+                                  np.zeros(bins, dtype=np.int64))
+        return VolumeHistogram(low, high, histogram.tolist())
+    finally:
+        mapped.close()
+
+##################################################Slice###################################################################
+SLICE_AXES = "xyz"
+
+def volume_view(mapped, format, dims, channels, channel=0):
+    """Zero-copy (z, y, x) numpy view of one channel of a mapped raw volume, x varies fastest"""
+    dtype = np.dtype(NUMPY_DTYPES[format])
+    record = dtype.itemsize * channels
+    nx, ny, nz = dims
+    if len(mapped) < nx * ny * nz * record:
+        raise ValueError(f"File is smaller than {nx * ny * nz * record} B")
+    return np.ndarray(shape=(nz, ny, nx), dtype=dtype, buffer=mapped, offset=channel * dtype.itemsize,
+                      strides=(ny * nx * record, nx * record, record))
+
+def slice_raw(path, format, dims, channels, axis, index, channel=0, extract=None):
+    """2D array of the axis-aligned slice index of a raw volume ('x', 'y' or 'z')
+
+    Only the bytes of the slice are read: a z slice is one contiguous block, y and x
+    slices are strided views. With extract (lower corner) the slice covers the region
+    from extract to the end of the volume and index counts from extract. Rows of the
+    result run along the second remaining axis: (y, x) for z, (z, x) for y, (z, y) for x.
+    """
+    lower = tuple(extract) if extract is not None else (0, 0, 0)
+    axis = SLICE_AXES.index(axis)
+    if not 0 <= index < dims[axis] - lower[axis]:
+        raise ValueError(f"Slice {index} outside of 0..{dims[axis] - lower[axis] - 1}")
+
+    mapped = map_file(path)
+    if mapped is None:
+        raise ValueError("File is empty")
+    try:
+        volume = volume_view(mapped, format, dims, channels, channel)[lower[2]:, lower[1]:, lower[0]:]
+        if axis == 2:
+            view = volume[index]
+        elif axis == 1:
+            view = volume[:, index]
+        else:
+            view = volume[:, :, index]
+        # One copy of the slice, the view must not outlive the mapping
+        data = np.array(view)
+        del volume, view
+        return data
+    finally:
+        mapped.close()
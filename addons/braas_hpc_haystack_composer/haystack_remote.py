@@ -0,0 +1,820 @@
+#####################################################################################################################
+# Copyright(C) 2011-2025 IT4Innovations National Supercomputing Center, VSB - Technical University of Ostrava
+#
+# This program is free software : you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#####################################################################################################################
+
+# Remote filesystem access
+#
+# Independent of bpy, all blocking calls run on background threads and results
+# are handed over to Blender's main thread by polling from a bpy.app.timers callback.
+
+import bisect
+import collections
+import gzip
+import heapq
+import itertools
+import os
+import queue
+import re
+import subprocess
+import threading
+import time
+import uuid
+
+def normalize_dir(path):
+    """Directory path with exactly one trailing slash"""
+    return path.rstrip("/") + "/"
+
+def parent_dir(path):
+    path = path.rstrip("/")
+    if not path:
+        return "/"
+    return normalize_dir(path.rsplit("/", 1)[0])
+
+def quote(path):
+    """Single-quote a path for the remote shell"""
+    return "'" + path.replace("'", "'\\''") + "'"
+
+# Result of RemoteBackend.stat_files(), status is one of the FILE_* constants,
+# size and header (first bytes of the file) are only set for FILE_OK
+FileStat = collections.namedtuple("FileStat", ("status", "size", "header"))
+
+FILE_OK = "ok"
+FILE_MISSING = "missing"
+FILE_NOT_REGULAR = "not a regular file"
+FILE_UNREADABLE = "unreadable"
+
+##################################################Backend###################################################################
+class RemoteBackend:
+    """Remote filesystem used by all remote operations
+
+    key identifies the filesystem in caches and indexes. All paths are remote paths.
+    Methods block and are meant to be called from background threads.
+    """
+    key = None
+
+    def run(self, command):
+        """Execute a shell command and return its output"""
+        raise NotImplementedError
+
+    def list_dir(self, path):
+        """(name, is_directory) of the entries of path, directories first and with a trailing slash"""
+        raise NotImplementedError
+
+    def find_files(self, root):
+        """(path, size, mtime) of all files below root"""
+        raise NotImplementedError
+
+    def find_changed(self, root, since):
+        """(is_directory, path, size, mtime) of files and directories below root modified after since"""
+        raise NotImplementedError
+
+    def list_files(self, dirs):
+        """(path, size, mtime) of the files directly inside dirs"""
+        raise NotImplementedError
+
+    def stat_files(self, paths, header_size=16):
+        """FileStat of every path, in order"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+def _parse_find_output(output, fields):
+    for line in output.split("\n"):
+        values = line.split("\t", fields - 1)
+        if len(values) == fields:
+            yield values
+
+class ShellBackend(RemoteBackend):
+    """Filesystem operations as POSIX shell commands on top of run(), one round trip each"""
+
+    # Paths per stat_files() command, keeps the command line below the argument limits
+    STAT_BATCH = 512
+
+    _STAT_STATUS = {"M": FILE_MISSING, "N": FILE_NOT_REGULAR, "U": FILE_UNREADABLE}
+
+    def list_dir(self, path):
+        names = [name for name in self.run("ls -p " + quote(path)).split("\n") if len(name) > 0]
+        return ([(name, True) for name in names if name.endswith("/")] +
+                [(name, False) for name in names if not name.endswith("/")])
+
+    def find_files(self, root):
+        output = self.run("find " + quote(root) + " -type f -printf '%s\\t%T@\\t%p\\n'")
+        return [(path, int(size), int(float(mtime))) for size, mtime, path in _parse_find_output(output, 3)]
+
+    def find_changed(self, root, since):
+        output = self.run("find " + quote(root) + " -newermt @" + str(int(since)) +
+                          " \\( -type f -o -type d \\) -printf '%y\\t%s\\t%T@\\t%p\\n'")
+        return [(kind == "d", path, int(size), int(float(mtime)))
+                for kind, size, mtime, path in _parse_find_output(output, 4)]
+
+    def list_files(self, dirs):
+        if not dirs:
+            return []
+        output = self.run("find " + " ".join(quote(d) for d in dirs) + " -maxdepth 1 -type f -printf '%s\\t%T@\\t%p\\n'")
+        return [(path, int(size), int(float(mtime))) for size, mtime, path in _parse_find_output(output, 3)]
+
+    def stat_files(self, paths, header_size=16):
+        stats = []
+        for start in range(0, len(paths), self.STAT_BATCH):
+            batch = paths[start:start + self.STAT_BATCH]
+            # One line per path: index, status and for readable files the size and hex header
+            output = self.run(
+                "i=0; for p in " + " ".join(quote(path) for path in batch) + "; do "
+                "if [ ! -e \"$p\" ]; then echo \"$i M\"; "
+                "elif [ ! -f \"$p\" ]; then echo \"$i N\"; "
+                "elif [ ! -r \"$p\" ]; then echo \"$i U\"; "
+                "else printf '%s R %s ' \"$i\" $(wc -c < \"$p\"); "
+                "head -c " + str(int(header_size)) + " \"$p\" | od -An -v -tx1 | tr -d ' \\n'; echo; fi; "
+                "i=$((i+1)); done"
+            )
+
+            results = [FileStat(FILE_MISSING, None, None)] * len(batch)
+            for line in output.split("\n"):
+                values = line.split()
+                if len(values) < 2 or not values[0].isdigit() or int(values[0]) >= len(batch):
+                    continue
+                if values[1] == "R" and len(values) >= 3:
+                    header = bytes.fromhex(values[3]) if len(values) > 3 else b""
+                    results[int(values[0])] = FileStat(FILE_OK, int(values[2]), header)
+                elif values[1] in self._STAT_STATUS:
+                    results[int(values[0])] = FileStat(self._STAT_STATUS[values[1]], None, None)
+            stats.extend(results)
+        return stats
+
+class BraasHpcBackend(ShellBackend):
+    """Commands through the BRaaS-HPC addon, every command is a separate SSH exchange"""
+
+    def __init__(self, key, run):
+        self.key = key
+        self._run = run
+
+    def run(self, command):
+        return self._run(command)
+
+class SSHSession:
+    """One persistent `ssh destination sh` process, commands are framed by an end marker
+
+    stdout is read on a thread of the session, so run() can give up on a stalled command
+    (e.g. a find on a hung NFS mount) after its timeout instead of blocking forever.
+    """
+
+    def __init__(self, ssh_command):
+        self._process = subprocess.Popen(
+            ssh_command + ["sh"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+        )
+        # Output lines, None once stdout is closed
+        self._lines = queue.Queue()
+        self._reader = threading.Thread(target=self._read, name="haystack-ssh-reader", daemon=True)
+        self._reader.start()
+
+    def _read(self):
+        for line in self._process.stdout:
+            self._lines.put(line)
+        self._lines.put(None)
+
+    def is_alive(self):
+        return self._process.poll() is None
+
+    def run(self, command, timeout=None):
+        """Output of command, TimeoutError (the session is closed) if it takes longer than timeout seconds"""
+        marker = "__haystack_end_" + uuid.uuid4().hex + "__"
+        # echo guarantees the marker starts a line even if the output has no trailing newline
+        self._process.stdin.write("{ " + command + "\n} 2>/dev/null; echo; echo " + marker + "\n")
+        self._process.stdin.flush()
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        lines = []
+        while True:
+            try:
+                line = self._lines.get(timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                self.close()
+                raise TimeoutError(f"Remote command timed out after {timeout:g} s")
+            if line is None:
+                raise ConnectionError("SSH session closed")
+            if line.startswith(marker):
+                return "".join(lines)[:-1]
+            lines.append(line)
+
+    def close(self):
+        try:
+            self._process.stdin.close()
+        except Exception:
+            pass
+        self._process.terminate()
+
+class SSHPoolBackend(ShellBackend):
+    """Pool of persistent SSH sessions
+
+    Connection setup happens once per session, afterwards commands are multiplexed over the
+    open connections; at most size commands run concurrently. A command running longer
+    than timeout seconds (None to wait forever) closes its session and raises TimeoutError.
+    """
+
+    def __init__(self, destination, options=(), size=2, ssh="ssh", timeout=300.0):
+        self.key = ("ssh", destination, tuple(options))
+        self.timeout = timeout
+        self._ssh_command = [ssh, "-T", "-o", "BatchMode=yes"] + list(options) + [destination]
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._idle = []
+        self._sessions = []
+
+    def _acquire(self):
+        with self._lock:
+            while self._idle:
+                session = self._idle.pop()
+                if session.is_alive():
+                    return session
+                self._sessions.remove(session)
+
+            session = SSHSession(self._ssh_command)
+            self._sessions.append(session)
+            return session
+
+    def _release(self, session):
+        with self._lock:
+            self._idle.append(session)
+
+    def run(self, command):
+        with self._slots:
+            session = self._acquire()
+            try:
+                output = session.run(command, self.timeout)
+            except Exception:
+                with self._lock:
+                    if session in self._sessions:
+                        self._sessions.remove(session)
+                session.close()
+                raise
+            self._release(session)
+            return output
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions:
+                session.close()
+            self._sessions = []
+            self._idle = []
+
+class LocalBackend(RemoteBackend):
+    """Local directory posing as the remote filesystem, for offline use, testing and benchmarks
+
+    Remote paths are resolved below root (the filesystem root by default).
+    """
+
+    def __init__(self, root=""):
+        self.root = root.rstrip("/\\")
+        self.key = ("local", self.root)
+
+    def _local(self, path):
+        return self.root + path if self.root else path
+
+    def _remote(self, local_path):
+        path = local_path[len(self.root):] if self.root else local_path
+        return path.replace(os.sep, "/")
+
+    def run(self, command):
+        return subprocess.run(command, shell=True, capture_output=True, text=True, cwd=self.root or None).stdout
+
+    def list_dir(self, path):
+        with os.scandir(self._local(path)) as it:
+            # hidden entries are skipped, same as ls -p
+            entries = sorted((entry for entry in it if not entry.name.startswith(".")), key=lambda entry: entry.name)
+        return ([(entry.name + "/", True) for entry in entries if entry.is_dir()] +
+                [(entry.name, False) for entry in entries if not entry.is_dir()])
+
+    def _walk(self, root):
+        for directory, _, names in os.walk(self._local(root)):
+            yield directory, names
+
+    def find_files(self, root):
+        files = []
+        for directory, names in self._walk(root):
+            for name in names:
+                local_path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(local_path)
+                except OSError:
+                    continue
+                files.append((self._remote(local_path), stat.st_size, int(stat.st_mtime)))
+        return files
+
+    def find_changed(self, root, since):
+        changed = []
+        for directory, names in self._walk(root):
+            try:
+                stat = os.stat(directory)
+                if stat.st_mtime > since:
+                    changed.append((True, self._remote(directory), stat.st_size, int(stat.st_mtime)))
+            except OSError:
+                pass
+            for name in names:
+                local_path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(local_path)
+                except OSError:
+                    continue
+                if stat.st_mtime > since:
+                    changed.append((False, self._remote(local_path), stat.st_size, int(stat.st_mtime)))
+        return changed
+
+    def list_files(self, dirs):
+        files = []
+        for d in dirs:
+            try:
+                entries = list(os.scandir(self._local(d)))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.is_file():
+                    stat = entry.stat()
+                    files.append((self._remote(entry.path), stat.st_size, int(stat.st_mtime)))
+        return files
+
+    def stat_files(self, paths, header_size=16):
+        stats = []
+        for path in paths:
+            local_path = self._local(path)
+            if not os.path.exists(local_path):
+                stats.append(FileStat(FILE_MISSING, None, None))
+            elif not os.path.isfile(local_path):
+                stats.append(FileStat(FILE_NOT_REGULAR, None, None))
+            else:
+                try:
+                    with open(local_path, "rb") as f:
+                        header = f.read(header_size)
+                    stats.append(FileStat(FILE_OK, os.path.getsize(local_path), header))
+                except OSError:
+                    stats.append(FileStat(FILE_UNREADABLE, None, None))
+        return stats
+
+##################################################Cache###################################################################
+class ListingCache:
+    """Bounded cache of directory listings with TTL expiry and LRU eviction
+
+    Keys are (connection key, normalized directory), values lists of (name, is_directory).
+    Thread safe, it is filled by the listing worker and read on the main thread.
+    """
+
+    def __init__(self, max_entries=256, ttl=60.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+
+    def configure(self, max_entries, ttl):
+        with self._lock:
+            self.max_entries = max_entries
+            self.ttl = ttl
+            self._evict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stamp, listing = entry
+            if self._clock() - stamp > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return listing
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def put(self, key, listing):
+        with self._lock:
+            self._entries[key] = (self._clock(), list(listing))
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def invalidate(self, key=None):
+        """Drop one listing, or everything"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def _evict(self):
+        while len(self._entries) > max(self.max_entries, 0):
+            self._entries.popitem(last=False)
+
+##################################################Listing###################################################################
+# _list() result of a failed listing, it is not cached
+LIST_FAILED = object()
+
+class ListingWorker:
+    """Lists remote directories on a background thread
+
+    Only the most recent request is served: a request that is superseded before it
+    starts is skipped and the results of a superseded running request are dropped.
+    Results are consumed on the main thread with poll().
+
+    Listings are kept in a ListingCache. When idle, the worker prefetches the parent
+    directory and the most visited child directories of the last request.
+    """
+
+    def __init__(self, cache=None):
+        self.cache = cache if cache is not None else ListingCache()
+        self.prefetch = True
+        self.prefetch_children = 3
+        self._visits = collections.Counter()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pending = None
+        self._request_id = 0
+        self._entries = collections.deque()
+        self._done = True
+        self._error = None
+        self._thread = None
+
+    def request(self, backend, path, refresh=False):
+        """Start listing path with a RemoteBackend, refresh bypasses the cached listing"""
+        key = backend.key
+        path = normalize_dir(path)
+        cached = None if refresh else self.cache.get((key, path))
+
+        with self._lock:
+            self._request_id += 1
+            self._visits[(key, path)] += 1
+            self._entries.clear()
+            self._error = None
+
+            if cached is not None:
+                # Served from cache, the worker only prefetches around it
+                self._entries.extend(cached)
+                self._done = True
+            else:
+                self._done = False
+
+            self._pending = (self._request_id, backend, path, cached is None)
+
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="haystack-remote-listing", daemon=True)
+                self._thread.start()
+
+        self._wakeup.set()
+        return self._request_id
+
+    def cancel(self):
+        """Drop the current request and its results"""
+        with self._lock:
+            self._request_id += 1
+            self._pending = None
+            self._entries.clear()
+            self._error = None
+            self._done = True
+
+    def is_busy(self):
+        with self._lock:
+            return not self._done or len(self._entries) > 0
+
+    def poll(self, max_entries=256):
+        """Return (entries, done, error) for the current request
+
+        entries is a list of (name, is_directory) of at most max_entries items,
+        so large directories are filled progressively over several timer ticks.
+        error is the message of a failed listing, None otherwise.
+        """
+        with self._lock:
+            entries = []
+            while self._entries and len(entries) < max_entries:
+                entries.append(self._entries.popleft())
+            done = self._done and not self._entries
+            return entries, done, self._error
+
+    def _is_current(self, request_id):
+        with self._lock:
+            return request_id == self._request_id and self._pending is None
+
+    def _list(self, backend, path, request_id=None):
+        """List path, handing entries of the current request over to poll()
+
+        Returns None when the request was superseded and LIST_FAILED when the backend
+        failed, the error of the current request is handed over to poll().
+        """
+        try:
+            listing = backend.list_dir(path)
+        except Exception as e:
+            if request_id is not None:
+                with self._lock:
+                    if request_id == self._request_id:
+                        self._error = str(e) or type(e).__name__
+            return LIST_FAILED
+
+        if request_id is not None:
+            with self._lock:
+                if request_id != self._request_id:
+                    return None
+                self._entries.extend(listing)
+
+        return listing
+
+    def _prefetch_paths(self, key, path, listing):
+        paths = [parent_dir(path)]
+        children = [normalize_dir(path + name) for name, is_directory in listing if is_directory and name != ".."]
+        with self._lock:
+            children.sort(key=lambda child: -self._visits[(key, child)])
+        paths.extend(children[:self.prefetch_children])
+        return [p for p in paths if p != path and (key, p) not in self.cache]
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+
+            with self._lock:
+                pending = self._pending
+                self._pending = None
+
+            if pending is None:
+                continue
+
+            request_id, backend, path, needs_listing = pending
+            key = backend.key
+
+            if needs_listing:
+                listing = self._list(backend, path, request_id)
+                if listing is None:
+                    continue
+                if listing is not LIST_FAILED:
+                    self.cache.put((key, path), listing)
+
+                with self._lock:
+                    if request_id == self._request_id:
+                        self._done = True
+
+                if listing is LIST_FAILED:
+                    continue
+            else:
+                listing = self.cache.get((key, path)) or []
+
+            if not self.prefetch:
+                continue
+
+            for prefetch_path in self._prefetch_paths(key, path, listing):
+                # Stop as soon as the user navigates elsewhere
+                if not self._is_current(request_id):
+                    break
+                prefetched = self._list(backend, prefetch_path)
+                if prefetched is not LIST_FAILED:
+                    self.cache.put((key, prefetch_path), prefetched)
+
+##################################################Task###################################################################
+class BackgroundTask:
+    """Runs one blocking call on a background thread, poll done() from a main thread timer"""
+
+    def __init__(self, function, *args):
+        self.result = None
+        self.error = None
+        self._thread = threading.Thread(target=self._run, args=(function,) + args, name="haystack-remote-task", daemon=True)
+        self._thread.start()
+
+    def done(self):
+        return not self._thread.is_alive()
+
+    def _run(self, function, *args):
+        try:
+            self.result = function(*args)
+        except Exception as e:
+            self.error = str(e)
+
+##################################################Index###################################################################
+INDEX_VERSION = 1
+
+class DatasetIndex:
+    """Local, searchable index of the files below a remote root
+
+    The index is built with a single bulk listing (`find` on shell backends), stored as gzip compressed
+    tab separated (relative path, size, mtime) lines and refreshed incrementally by mtime.
+    Searches run locally on a newline joined copy of the paths, so a regular expression
+    scans the whole index in C instead of a python loop over the files.
+    """
+
+    def __init__(self, root):
+        self.root = normalize_dir(root)
+        # relative path -> (size, mtime)
+        self.files = {}
+        self.crawl_time = 0.0
+        self._search_data = None
+        self._last_fuzzy = (None, None)
+
+    def __len__(self):
+        return len(self.files)
+
+    def _relative(self, path):
+        if path.startswith(self.root):
+            return path[len(self.root):]
+        return None
+
+    def _relative_dir(self, path):
+        """Relative prefix of a directory ("a/b/"), "" for the root, None outside of it"""
+        path = normalize_dir(path)
+        if path == self.root:
+            return ""
+        return self._relative(path)
+
+    #################### crawl ####################
+    def crawl(self, backend):
+        """Full crawl with one bulk listing of a RemoteBackend"""
+        started = time.time()
+        self.files = {}
+        for path, size, mtime in backend.find_files(self.root):
+            relative = self._relative(path)
+            if relative:
+                self.files[relative] = (size, mtime)
+        self.crawl_time = started
+        self._search_data = None
+
+    def refresh(self, backend):
+        """Incremental refresh of files and directories modified since the last crawl"""
+        if not self.crawl_time:
+            self.crawl(backend)
+            return
+
+        started = time.time()
+        changed_dirs = []
+        for is_directory, path, size, mtime in backend.find_changed(self.root, self.crawl_time):
+            if is_directory:
+                changed_dirs.append(path)
+            else:
+                relative = self._relative(path)
+                if relative:
+                    self.files[relative] = (size, mtime)
+
+        if changed_dirs:
+            # A changed directory may have lost files or subdirectories, re-list its files
+            listed = {}
+            for path, size, mtime in backend.list_files(changed_dirs):
+                relative = self._relative(path)
+                if relative:
+                    listed[relative] = (size, mtime)
+
+            # changed directory prefix -> prefixes of its current subdirectories
+            subdirs = {}
+            for d in changed_dirs:
+                prefix = self._relative_dir(d)
+                if prefix is not None:
+                    subdirs[prefix] = {prefix + name.rstrip("/") + "/"
+                                       for name, is_directory in backend.list_dir(normalize_dir(d))
+                                       if is_directory and name.rstrip("/") not in ("", ".", "..")}
+
+            # Subdirectories new to the index, e.g. moved in with their old mtimes, are crawled
+            indexed_dirs = set()
+            for relative in self.files:
+                end = relative.rfind("/")
+                while end >= 0 and relative[:end + 1] not in indexed_dirs:
+                    indexed_dirs.add(relative[:end + 1])
+                    end = relative.rfind("/", 0, end)
+            crawled = {}
+            for prefix in sorted(set().union(*subdirs.values()) - indexed_dirs):
+                for path, size, mtime in backend.find_files(self.root + prefix):
+                    relative = self._relative(path)
+                    if relative:
+                        crawled[relative] = (size, mtime)
+
+            # Drop files of a changed directory that were not re-listed and everything below
+            # its subdirectories that are gone (deleted or moved away)
+            for relative in list(self.files):
+                names = relative.split("/")
+                prefix = ""
+                for depth, name in enumerate(names):
+                    current = subdirs.get(prefix)
+                    if current is not None:
+                        if depth == len(names) - 1:
+                            stale = relative not in listed
+                        else:
+                            stale = prefix + name + "/" not in current
+                        if stale:
+                            del self.files[relative]
+                            break
+                    prefix += name + "/"
+            self.files.update(crawled)
+            self.files.update(listed)
+
+        self.crawl_time = started
+        self._search_data = None
+
+    #################### storage ####################
+    def save(self, file_path):
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        tmp_path = file_path + ".tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            f.write(f"{INDEX_VERSION}\t{self.crawl_time}\t{self.root}\n")
+            for relative in sorted(self.files):
+                size, mtime = self.files[relative]
+                f.write(f"{relative}\t{size}\t{mtime}\n")
+        os.replace(tmp_path, file_path)
+
+    @classmethod
+    def load(cls, file_path):
+        with gzip.open(file_path, "rt", encoding="utf-8") as f:
+            version, crawl_time, root = f.readline().rstrip("\n").split("\t", 2)
+            if int(version) != INDEX_VERSION:
+                raise ValueError(f"Unsupported index version {version}")
+            index = cls(root)
+            index.crawl_time = float(crawl_time)
+            for line in f:
+                relative, size, mtime = line.rstrip("\n").rsplit("\t", 2)
+                index.files[relative] = (int(size), int(mtime))
+        return index
+
+    #################### search ####################
+    def _get_search_data(self):
+        if self._search_data is None:
+            paths = sorted(self.files)
+            lowered = "\n".join(paths).lower() + "\n"
+            starts = [0] * len(paths)
+            offset = 0
+            for i, path in enumerate(paths):
+                starts[i] = offset
+                offset += len(path) + 1
+            names = sorted((path.rsplit("/", 1)[-1].lower(), i) for i, path in enumerate(paths))
+            self._search_data = (paths, lowered, starts, names)
+            self._last_fuzzy = (None, None)
+        return self._search_data
+
+    @staticmethod
+    def _fuzzy_pattern(query):
+        """Query characters in order within one line, greedy negated classes never backtrack
+
+        Group 1 spans from the first to the last matched character.
+        """
+        parts = []
+        for i, c in enumerate(query):
+            parts.append("[^\\n" + ("\\" + c if c in "\\]^-" else c) + "]*" + ("(" if i == 0 else "") + re.escape(c))
+        return "^" + "".join(parts) + ")"
+
+    def _fuzzy_candidates(self, query):
+        """Indices of all paths fuzzy-matching query, with the span from the first to the last matched character"""
+        paths, lowered, starts, _ = self._get_search_data()
+        pattern = re.compile(self._fuzzy_pattern(query), re.MULTILINE)
+
+        last_query, last_hits = self._last_fuzzy
+        if last_query is not None and query.startswith(last_query):
+            # Typing refines the previous query, only its hits can still match
+            hits = []
+            for _, i in last_hits:
+                match = pattern.match(lowered, starts[i])
+                if match is not None:
+                    hits.append((match.end() - match.start(1), i))
+        else:
+            hits = [(match.end() - match.start(1), bisect.bisect_right(starts, match.start()) - 1)
+                    for match in pattern.finditer(lowered)]
+
+        self._last_fuzzy = (query, hits)
+        return hits
+
+    def search(self, query, extensions=None, fuzzy=True, limit=200):
+        """Return up to limit (relative path, size, mtime) matching query
+
+        Prefix mode matches the start of the file name (binary search over the sorted names),
+        fuzzy mode matches the query characters in order anywhere in the relative path,
+        closest matches first. extensions is an optional collection of lower case suffixes such as ".raw".
+        """
+        paths, _, _, names = self._get_search_data()
+        query = query.strip().lower()
+        extensions = tuple(extensions) if extensions else None
+
+        def accepted(i):
+            return not extensions or paths[i].lower().endswith(extensions)
+
+        if not query:
+            hits = (i for i in range(len(paths)) if accepted(i))
+        elif fuzzy:
+            candidates = ((span, len(paths[i]), i) for span, i in self._fuzzy_candidates(query) if accepted(i))
+            hits = (i for _, _, i in heapq.nsmallest(limit, candidates))
+        else:
+            first = bisect.bisect_left(names, (query, -1))
+            hits = (i for name, i in itertools.takewhile(lambda entry: entry[0].startswith(query), names[first:])
+                    if accepted(i))
+
+        result = []
+        for i in itertools.islice(hits, limit):
+            size, mtime = self.files[paths[i]]
+            result.append((paths[i], size, mtime))
+        return result
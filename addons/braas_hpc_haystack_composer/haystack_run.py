@@ -0,0 +1,163 @@
+#####################################################################################################################
+# Copyright(C) 2011-2025 IT4Innovations National Supercomputing Center, VSB - Technical University of Ostrava
+#
+# This program is free software : you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#####################################################################################################################
+
+# Local execution of generated commands
+#
+# Independent of bpy. The command runs as a subprocess, a reader thread streams its
+# merged stdout/stderr into a bounded ring buffer that Blender's main thread polls
+# from a timer, so the UI never waits on the process.
+
+import collections
+import os
+import re
+import shlex
+import signal
+import subprocess
+import threading
+import time
+
+# Lines kept of the output
+DEFAULT_MAX_LINES = 500
+
+# Seconds between terminate and kill on cancel
+KILL_TIMEOUT = 5.0
+
+# "frame 12/1024", "frame 12 of 1024" or "12/1024 frames" in the output, a bare a/b
+# also matches paths and dates
+_PROGRESS_FRACTION = re.compile(r"\bframes?\s*#?\s*(\d+)\s*(?:/|of)\s*(\d+)|\b(\d+)\s*/\s*(\d+)\s*frames?\b", re.IGNORECASE)
+# "frame 12", counted against total_frames
+_PROGRESS_FRAME = re.compile(r"\bframe\s*#?\s*(\d+)", re.IGNORECASE)
+
+STATE_RUNNING = "running"
+STATE_FINISHED = "finished"
+STATE_FAILED = "failed"
+STATE_CANCELLED = "cancelled"
+
+def split_command(command):
+    """Arguments of a generated command string"""
+    return shlex.split(command, posix=os.name != 'nt')
+
+class CommandRunner:
+    """One running command with its output ring buffer and progress
+
+    total_frames, if known, turns "frame N" lines into a progress fraction. on_line is
+    called from the reader thread with every output line, including those that already
+    dropped out of the ring buffer.
+    """
+
+    def __init__(self, command, cwd=None, max_lines=DEFAULT_MAX_LINES, total_frames=None, on_line=None):
+        self.command = command
+        self.total_frames = total_frames
+        self.on_line = on_line
+        self.lines = collections.deque(maxlen=max_lines)
+        self.line_count = 0
+        self.progress = None
+        self.returncode = None
+        self.started = time.monotonic()
+        self.finished = None
+        self._cancelled = False
+        self._lock = threading.Lock()
+
+        kwargs = {}
+        if os.name == 'nt':
+            kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            # Own process group, cancel reaches the ranks started by mpirun as well
+            kwargs["start_new_session"] = True
+
+        self._process = subprocess.Popen(
+            split_command(command),
+            cwd=cwd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            errors="replace",
+            bufsize=1,
+            **kwargs,
+        )
+        self._reader = threading.Thread(target=self._read, name="haystack-run", daemon=True)
+        self._reader.start()
+
+    def _read(self):
+        for line in self._process.stdout:
+            line = line.rstrip("\r\n")
+            with self._lock:
+                self.lines.append(line)
+                self.line_count += 1
+                self._update_progress(line)
+            if self.on_line is not None:
+                self.on_line(line)
+        self._process.stdout.close()
+        self.returncode = self._process.wait()
+        self.finished = time.monotonic()
+
+    def _update_progress(self, line):
+        match = _PROGRESS_FRACTION.search(line)
+        if match:
+            done, total = (match.group(1), match.group(2)) if match.group(1) is not None else (match.group(3), match.group(4))
+            if int(total) > 0:
+                self.progress = min(1.0, int(done) / int(total))
+                return
+        if self.total_frames:
+            match = _PROGRESS_FRAME.search(line)
+            if match:
+                self.progress = min(1.0, int(match.group(1)) / self.total_frames)
+
+    @property
+    def state(self):
+        if self.finished is None:
+            return STATE_RUNNING
+        if self._cancelled:
+            return STATE_CANCELLED
+        return STATE_FINISHED if self.returncode == 0 else STATE_FAILED
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    def tail(self, count):
+        """The last count output lines"""
+        with self._lock:
+            return list(self.lines)[-count:]
+
+    def cancel(self):
+        """Terminate the process group, kill it if it is still alive after KILL_TIMEOUT"""
+        if self.finished is not None:
+            return
+        self._cancelled = True
+        self._signal(signal.SIGTERM if os.name != 'nt' else signal.CTRL_BREAK_EVENT)
+
+        def kill():
+            try:
+                self._process.wait(KILL_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                self._signal(signal.SIGKILL if os.name != 'nt' else None)
+
+        threading.Thread(target=kill, name="haystack-run-kill", daemon=True).start()
+
+    def _signal(self, sig):
+        try:
+            if sig is None:
+                self._process.kill()
+            elif os.name == 'nt':
+                self._process.send_signal(sig)
+            else:
+                os.killpg(self._process.pid, sig)
+        except (ProcessLookupError, OSError):
+            pass
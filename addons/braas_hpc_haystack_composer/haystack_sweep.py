@@ -0,0 +1,230 @@
+#####################################################################################################################
+# Copyright(C) 2011-2025 IT4Innovations National Supercomputing Center, VSB - Technical University of Ostrava
+#
+# This program is free software : you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#####################################################################################################################
+
+# Parameter sweeps
+#
+# Independent of bpy. Value ranges of the Properties and OutputImage settings are
+# expanded into variants, every variant is a copy of the base commands with the
+# swept values set and --measure enabled. The measured frame times of the variants
+# are collected into a CSV table.
+
+import copy
+import csv
+import itertools
+import shlex
+import statistics
+
+from . import haystack_measure
+from . import haystack_run
+
+# Swept settings: PropertiesCommand attributes and the OutputImageCommand resolution
+SWEEP_AXES = ('paths_per_pixel', 'num_frames', 'ndg', 'dpr', 'resolution')
+
+# Upper bound of the variants of one sweep
+MAX_VARIANTS = 4096
+
+CSV_COLUMNS = SWEEP_AXES + ('status', 'frames', 'median_ms', 'mean_ms', 'min_ms')
+
+STATUS_PENDING = "pending"
+
+def parse_values(text):
+    """Integers of a range text, e.g. "1,2,4", "1:8" (inclusive), "1:8:2" or "1:64:*2" (doubling)"""
+    values = []
+    for item in text.replace(" ", "").split(","):
+        if not item:
+            continue
+        fields = item.split(":")
+        try:
+            if len(fields) == 1:
+                values.append(int(fields[0]))
+                continue
+            if len(fields) > 3:
+                raise ValueError
+            start, stop = int(fields[0]), int(fields[1])
+            step = fields[2] if len(fields) == 3 else "1"
+            if step.startswith("*"):
+                factor = int(step[1:])
+                if factor < 2 or start < 1:
+                    raise ValueError
+                value = start
+                while value <= stop:
+                    values.append(value)
+                    value *= factor
+            else:
+                if int(step) < 1:
+                    raise ValueError
+                values.extend(range(start, stop + 1, int(step)))
+        except ValueError:
+            raise ValueError(f"Invalid range '{item}', use e.g. 1,2,4 or 1:8 or 1:8:2 or 1:64:*2") from None
+    return values
+
+def parse_resolutions(text):
+    """Resolutions of a text like "1920x1080,1024" (square)"""
+    resolutions = []
+    for item in text.replace(" ", "").lower().split(","):
+        if not item:
+            continue
+        try:
+            width, _, height = item.partition("x")
+            resolutions.append((int(width), int(height or width)))
+        except ValueError:
+            raise ValueError(f"Invalid resolution '{item}', use e.g. 1920x1080") from None
+    return resolutions
+
+def expand(axes):
+    """Variants of the product of axes (name -> values), axes without values are not swept"""
+    swept = [(name, values) for name, values in axes.items() if values]
+    count = 1
+    for _, values in swept:
+        count *= len(values)
+    if count > MAX_VARIANTS:
+        raise ValueError(f"The sweep has {count} variants, more than {MAX_VARIANTS}")
+
+    names = [name for name, _ in swept]
+    return [dict(zip(names, values)) for values in itertools.product(*(values for _, values in swept))]
+
+def apply_variant(properties, output, variant):
+    """Copies of the base PropertiesCommand and OutputImageCommand (or None) with the variant applied and --measure on"""
+    properties = copy.copy(properties)
+    properties.measure = True
+    for name, value in variant.items():
+        if name != 'resolution':
+            setattr(properties, name, value)
+
+    if output is not None:
+        output = copy.copy(output)
+        if 'resolution' in variant:
+            output.resolution = tuple(variant['resolution'])
+    elif 'resolution' in variant:
+        raise ValueError("Sweeping the resolution needs an OutputImage node")
+    return properties, output
+
+def variant_values(properties, output):
+    """Effective values of all axes of a variant"""
+    values = {name: getattr(properties, name) for name in SWEEP_AXES if name != 'resolution'}
+    values['resolution'] = tuple(output.resolution) if output is not None else None
+    return values
+
+class SweepResult:
+    """One variant of a sweep with its measured frame times in seconds"""
+    __slots__ = ('values', 'command', 'status', 'frame_times')
+
+    def __init__(self, values, command):
+        self.values = values
+        self.command = command
+        self.status = STATUS_PENDING
+        self.frame_times = []
+
+    def row(self):
+        """CSV row of the variant, times in milliseconds"""
+        row = dict(self.values)
+        resolution = row['resolution']
+        row['resolution'] = f"{resolution[0]}x{resolution[1]}" if resolution else ""
+        row['status'] = self.status
+        row['frames'] = len(self.frame_times)
+        if self.frame_times:
+            row['median_ms'] = round(statistics.median(self.frame_times) * 1000.0, 3)
+            row['mean_ms'] = round(statistics.mean(self.frame_times) * 1000.0, 3)
+            row['min_ms'] = round(min(self.frame_times) * 1000.0, 3)
+        else:
+            row['median_ms'] = row['mean_ms'] = row['min_ms'] = ""
+        return row
+
+def write_csv(file_path, results):
+    with open(file_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+        for result in results:
+            writer.writerow(result.row())
+
+def collect_logs(results, log_path):
+    """Frame times of the variants from the logs of a job array, log_path(index) is the log of a task"""
+    for index, result in enumerate(results):
+        try:
+            with open(log_path(index), "r", encoding="utf-8", errors="replace") as f:
+                parser = haystack_measure.MeasureParser().feed_text(f.read())
+        except OSError:
+            result.status = "no log"
+            continue
+        result.frame_times = parser.frame_times
+        result.status = haystack_run.STATE_FINISHED if parser.frame_times else "no timings"
+    return results
+
+def array_body(results, log_prefix):
+    """Body of a job array script running the command of variant $TASK into {log_prefix}_$TASK.log"""
+    lines = ["COMMANDS=("]
+    for index, result in enumerate(results):
+        lines.append(f"  # {index}: " + " ".join(f"{name}={value}" for name, value in result.row().items() if name in SWEEP_AXES))
+        lines.append("  " + shlex.quote(result.command.strip()))
+    lines.append(")")
+    lines.append("TASK=\"${SLURM_ARRAY_TASK_ID:-${PBS_ARRAY_INDEX:-0}}\"")
+    lines.append(f"eval \"${{COMMANDS[$TASK]}}\" > \"{log_prefix}_${{TASK}}.log\" 2>&1")
+    return "\n".join(lines)
+
+class SweepRunner:
+    """Runs the variants of a sweep locally one after another, advanced by poll()"""
+
+    def __init__(self, results, cwd=None):
+        self.results = results
+        self.cwd = cwd
+        self.index = -1
+        self._run = None
+        self._parser = None
+        self.cancelled = False
+
+    @property
+    def done(self):
+        return self.cancelled or self.index >= len(self.results)
+
+    @property
+    def current(self):
+        return self._run
+
+    def poll(self):
+        """Finish the current variant and start the next one, returns True when a variant finished"""
+        if self.done:
+            return False
+
+        finished = False
+        if self._run is not None:
+            if self._run.state == haystack_run.STATE_RUNNING:
+                return False
+            result = self.results[self.index]
+            result.status = self._run.state
+            result.frame_times = list(self._parser.frame_times)
+            self._run = None
+            finished = True
+
+        self.index += 1
+        while self.index < len(self.results):
+            result = self.results[self.index]
+            self._parser = haystack_measure.MeasureParser()
+            try:
+                self._run = haystack_run.CommandRunner(result.command, cwd=self.cwd, on_line=self._parser.feed)
+                result.status = haystack_run.STATE_RUNNING
+                break
+            except (ValueError, OSError) as e:
+                result.status = f"not started: {e}"
+                self.index += 1
+        return finished
+
+    def cancel(self):
+        self.cancelled = True
+        if self._run is not None:
+            self._run.cancel()
+            self.results[self.index].status = haystack_run.STATE_CANCELLED
@@ -0,0 +1,126 @@
+#####################################################################################################################
+# Copyright(C) 2011-2025 IT4Innovations National Supercomputing Center, VSB - Technical University of Ostrava
+#
+# This program is free software : you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#####################################################################################################################
+
+# Transfer function (.xf) files
+#
+# Independent of bpy. The control points of the TF material are read in bulk and
+# sampled into tables with numpy, then written in the binary .xf layout HayStack
+# reads:
+#
+#   size_t  magic (0x1235abc000)
+#   float   opacity scale
+#   range1f absolute domain (lower, upper)
+#   range1f relative domain in percent (lower, upper)
+#   int     number of colormap entries N
+#   vec4f   colormap[N] (r, g, b, opacity)
+
+import struct
+
+import numpy as np
+
+XF_MAGIC = 0x1235abc000
+
+# Entries of the exported colormap
+XF_SAMPLES = 128
+
+DEFAULT_REL_DOMAIN = (0.0, 100.0)
+
+_HEADER = struct.Struct("<Qf2f2fi")
+
+def sample_ramp(positions, colors, interpolation, samples=XF_SAMPLES):
+    """Colors (samples x 4) of a color ramp at samples evenly spaced positions in [0, 1]
+
+    positions (n) and colors (n x 4) are the ramp elements. Supports the 'LINEAR',
+    'EASE' and 'CONSTANT' interpolations of Blender's color ramp, returns None for
+    others so the caller can fall back to evaluating the ramp itself.
+    """
+    positions = np.asarray(positions, dtype=np.float32)
+    colors = np.asarray(colors, dtype=np.float32).reshape(-1, 4)
+    order = np.argsort(positions, kind="stable")
+    positions = positions[order]
+    colors = colors[order]
+
+    x = np.linspace(0.0, 1.0, samples, dtype=np.float32)
+    if len(positions) == 1:
+        return np.repeat(colors, samples, axis=0)
+
+    if interpolation == 'CONSTANT':
+        # Color of the element left of every sample, the first one before the ramp starts
+        index = np.maximum(np.searchsorted(positions, x, side="right") - 1, 0)
+        return colors[index]
+
+    if interpolation not in ('LINEAR', 'EASE'):
+        return None
+
+    # Elements around every sample, clamped to the ramp ends
+    right = np.clip(np.searchsorted(positions, x, side="right"), 1, len(positions) - 1)
+    left = right - 1
+
+    span = positions[right] - positions[left]
+    t = np.where(span > 0.0, (x - positions[left]) / np.where(span > 0.0, span, 1.0), 0.0)
+    t = np.clip(t, 0.0, 1.0)
+    if interpolation == 'EASE':
+        t = t * t * (3.0 - 2.0 * t)
+    return colors[left] + (colors[right] - colors[left]) * t[:, None]
+
+def sample_curve_linear(points, samples=XF_SAMPLES):
+    """Piecewise linear curve through points (n x 2) at samples evenly spaced x in [0, 1]"""
+    points = np.asarray(points, dtype=np.float32).reshape(-1, 2)
+    points = points[np.argsort(points[:, 0], kind="stable")]
+    x = np.linspace(0.0, 1.0, samples, dtype=np.float32)
+    return np.interp(x, points[:, 0], points[:, 1]).astype(np.float32)
+
+def make_colormap(colors, opacity):
+    """RGBA table from ramp colors (samples x 4) and the opacity curve (samples)"""
+    colormap = np.empty((len(opacity), 4), dtype=np.float32)
+    colormap[:, :3] = np.asarray(colors, dtype=np.float32)[:, :3]
+    colormap[:, 3] = np.clip(opacity, 0.0, 1.0)
+    return colormap
+
+def map_values(values, colormap, domain):
+    """RGBA (values.shape x 4) of values through a colormap spanning domain (lower, upper)
+
+    Values outside the domain clamp to the end colors, NaN maps to transparent.
+    """
+    colormap = np.asarray(colormap, dtype=np.float32).reshape(-1, 4)
+    lower, upper = domain
+    scale = (len(colormap) - 1) / (upper - lower) if upper != lower else 0.0
+    values = np.asarray(values, dtype=np.float32)
+    index = np.rint(np.clip((values - lower) * scale, 0, len(colormap) - 1))
+    finite = np.isfinite(index)
+    rgba = colormap[np.where(finite, index, 0).astype(np.intp)]
+    rgba[~finite] = 0.0
+    return rgba
+
+def encode_xf(colormap, opacity_scale, abs_domain, rel_domain=DEFAULT_REL_DOMAIN):
+    """Bytes of an .xf file"""
+    colormap = np.ascontiguousarray(colormap, dtype="<f4").reshape(-1, 4)
+    header = _HEADER.pack(XF_MAGIC, opacity_scale, abs_domain[0], abs_domain[1], rel_domain[0], rel_domain[1], len(colormap))
+    return header + colormap.tobytes()
+
+def decode_xf(data):
+    """(colormap, opacity scale, absolute domain, relative domain) of .xf file bytes"""
+    magic, opacity_scale, abs_lower, abs_upper, rel_lower, rel_upper, count = _HEADER.unpack_from(data)
+    if magic != XF_MAGIC:
+        raise ValueError("Not an .xf file")
+    colormap = np.frombuffer(data, dtype="<f4", count=count * 4, offset=_HEADER.size).reshape(count, 4)
+    return colormap, opacity_scale, (abs_lower, abs_upper), (rel_lower, rel_upper)
+
+def write_xf(path, colormap, opacity_scale, abs_domain, rel_domain=DEFAULT_REL_DOMAIN):
+    with open(path, "wb") as f:
+        f.write(encode_xf(colormap, opacity_scale, abs_domain, rel_domain))
@@ -0,0 +1,170 @@
+#####################################################################################################################
+# Copyright(C) 2011-2025 IT4Innovations National Supercomputing Center, VSB - Technical University of Ostrava
+#
+# This program is free software : you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#####################################################################################################################
+
+# Headless benchmark of HayStack command generation (no Blender needed)
+#
+#   python benchmarks/bench_generation.py
+#   python benchmarks/bench_generation.py --sizes 10 1000 --save baseline.json
+#   python benchmarks/bench_generation.py --baseline baseline.json --tolerance 1.25
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "addons"))
+
+from braas_hpc_haystack_composer import haystack_command
+
+DEFAULT_SIZES = [10, 1000, 100000]
+
+def make_loader(i):
+    """Synthetic loader, cycles through the loader kinds of the composer"""
+    kind = i % 4
+    if kind == 0:
+        return haystack_command.LoaderCommand(f"/data/umesh/part_{i}.umesh")
+    if kind == 1:
+        command = haystack_command.LoaderCommand(f"/data/spheres/part_{i}.p4", scheme="spheres://", num_parts=4)
+        command.add_option("format", "xyzi")
+        command.add_option("radius", 0.5)
+        return command
+    if kind == 2:
+        command = haystack_command.LoaderCommand(f"/data/raw/part_{i}.raw", scheme="raw://", num_parts=8)
+        command.add_option("format", "float")
+        command.add_option("dims", 512, 512, 512)
+        command.add_option("channels", 1)
+        command.add_option("extract", 0, 0, 0)
+        return command
+    command = haystack_command.LoaderCommand(f"/data/nvdb/part_{i}.nvdb", scheme="nvdb://")
+    command.add_option("spacing", 1.0, 1.0, 1.0)
+    return command
+
+def build_tree(num_loaders):
+    """Build a composer-like graph: loaders, camera, tf, output image and properties feeding one render node"""
+    graph = haystack_command.CommandGraph()
+    inputs = [graph.add(make_loader(i)) for i in range(num_loaders)]
+    inputs.append(graph.add(haystack_command.CameraCommand((0.0, 0.0, 5.0), (0.0, 0.0, 0.0), (0.0, 1.0, 0.0), 60.0)))
+    inputs.append(graph.add(haystack_command.TransferFunctionCommand("/data/tf.xf")))
+    inputs.append(graph.add(haystack_command.OutputImageCommand("/out", "output.png", (1920, 1080))))
+    inputs.append(graph.add(haystack_command.PropertiesCommand(paths_per_pixel=16)))
+    render_id = graph.add(haystack_command.RenderCommand("/opt/haystack/hsOffline"), inputs)
+    return graph, render_id
+
+def build_chain(length):
+    """Build a deep graph where every loader consumes the previous one, guards against recursion limits"""
+    graph = haystack_command.CommandGraph()
+    previous = None
+    for i in range(length):
+        previous = graph.add(make_loader(i), [] if previous is None else [previous])
+    render_id = graph.add(haystack_command.RenderCommand("/opt/haystack/hsOffline"), [previous])
+    return graph, render_id
+
+def check_serializer():
+    """The IR must produce the same strings the composer always produced"""
+    graph = haystack_command.CommandGraph()
+    spheres = haystack_command.LoaderCommand("/d/s.p4", scheme="spheres://", num_parts=1)
+    spheres.add_option("format", "xyz")
+    spheres.add_option("radius", 1.0)
+    inputs = [
+        graph.add(spheres),
+        graph.add(haystack_command.CameraCommand((1.0, 2.0, 3.0), (0.0, 0.0, 0.0), (0.0, 1.0, 0.0), 60.0)),
+        graph.add(haystack_command.PropertiesCommand()),
+    ]
+    render_id = graph.add(haystack_command.RenderCommand("/bin/hsViewer", hostname="localhost", port=7000), inputs)
+
+    expected = (" /bin/hsViewer spheres:// 1 @ /d/s.p4 :format= xyz :radius= 1.0"
+                " --camera 1.0 2.0 3.0 0.0 0.0 0.0 0.0 1.0 0.0 -fovy 60.0"
+                " --num-frames 1024 --paths-per-pixel 1 --default-radius 0.1 -ndg 1 -dpr 0 --no-mum"
+                " -server localhost -port 7000 ")
+    result = graph.generate_command(render_id)
+    if result != expected:
+        raise AssertionError(f"Serializer output changed:\n  expected: {expected!r}\n  got:      {result!r}")
+
+    graph.commands[render_id].launcher = haystack_command.LauncherCommand('SRUN', 4, 2, 'CORE')
+    result = graph.generate_command(render_id)
+    if not result.startswith(" srun -n 4 --ntasks-per-node=2 --cpu-bind=cores /bin/hsViewer spheres:// "):
+        raise AssertionError(f"Launcher is not wrapping the command: {result!r}")
+
+def bench(num_loaders, repeat, build=build_tree):
+    """Return (best build+generate time, peak traced memory, command length)"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        graph, render_id = build(num_loaders)
+        command = graph.generate_command(render_id)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        del graph
+
+    tracemalloc.start()
+    graph, render_id = build(num_loaders)
+    command = graph.generate_command(render_id)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return best, peak, len(command)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark HayStack command generation")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Numbers of loader nodes")
+    parser.add_argument("--chain", type=int, nargs="*", default=[DEFAULT_SIZES[-1]], help="Lengths of deep loader chains")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions, the best one is reported")
+    parser.add_argument("--save", help="Write results as JSON")
+    parser.add_argument("--baseline", help="Compare against results saved with --save")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="Allowed slowdown/growth factor against the baseline")
+    args = parser.parse_args(argv)
+
+    check_serializer()
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = {}
+    regressions = []
+
+    runs = [(str(size), size, build_tree) for size in args.sizes]
+    runs += [(f"chain-{size}", size, build_chain) for size in args.chain]
+
+    print(f"{'loaders':>14} {'time [ms]':>12} {'peak [KiB]':>12} {'chars':>12}")
+    for name, size, build in runs:
+        seconds, peak, length = bench(size, args.repeat, build)
+        results[name] = {"seconds": seconds, "peak_bytes": peak, "chars": length}
+        print(f"{name:>14} {seconds * 1000.0:>12.3f} {peak / 1024.0:>12.1f} {length:>12}")
+
+        reference = baseline.get(name)
+        if reference:
+            if seconds > reference["seconds"] * args.tolerance:
+                regressions.append(f"{name} loaders: time {seconds:.4f}s > {reference['seconds']:.4f}s")
+            if peak > reference["peak_bytes"] * args.tolerance:
+                regressions.append(f"{name} loaders: peak {peak}B > {reference['peak_bytes']}B")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
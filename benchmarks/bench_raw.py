@@ -0,0 +1,82 @@
+#####################################################################################################################
+# Copyright(C) 2011-2025 IT4Innovations National Supercomputing Center, VSB - Technical University of Ostrava
+#
+# This program is free software : you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#####################################################################################################################
+
+# Benchmark of the RAW volume scan (no Blender needed, requires numpy)
+#
+#   python benchmarks/bench_raw.py
+#   python benchmarks/bench_raw.py --dims 512 512 512 --format uint16 --workers 1 4
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "addons"))
+
+import numpy as np
+
+from braas_hpc_haystack_composer import haystack_raw
+
+def write_volume(path, format, dims):
+    """Random volume written slice by slice, never held in memory as a whole"""
+    dtype = np.dtype(haystack_raw.NUMPY_DTYPES[format])
+    rng = np.random.default_rng(0)
+    with open(path, "wb") as f:
+        for _ in range(dims[2]):
+            if dtype.kind == 'f':
+                data = rng.standard_normal(dims[0] * dims[1]).astype(dtype)
+            else:
+                data = rng.integers(0, np.iinfo(dtype).max, dims[0] * dims[1], endpoint=True).astype(dtype)
+            data.tofile(f)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the streaming RAW volume scan")
+    parser.add_argument("--dims", type=int, nargs=3, default=[256, 256, 256], help="Volume dimensions")
+    parser.add_argument("--format", default="float", choices=sorted(haystack_raw.NUMPY_DTYPES), help="Voxel format")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4], help="Thread pool sizes")
+    parser.add_argument("--file", help="Scan this file instead of a generated one")
+    args = parser.parse_args(argv)
+
+    path = args.file
+    if path is None:
+        path = os.path.join(tempfile.gettempdir(), "haystack_bench_raw.raw")
+        write_volume(path, args.format, args.dims)
+
+    try:
+        size = os.path.getsize(path)
+        print(f"{size / (1024 * 1024):.1f} MiB {args.format}")
+        print(f"{'workers':>8} {'time [ms]':>12} {'GiB/s':>8} {'peak [MiB]':>12}")
+        for workers in args.workers:
+            tracemalloc.start()
+            start = time.perf_counter()
+            histogram = haystack_raw.scan_raw(path, args.format, args.dims, 1, workers=workers)
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{workers:>8} {elapsed * 1000.0:>12.1f} {size / elapsed / 1024 ** 3:>8.2f} {peak / (1024 * 1024):>12.1f}")
+        print(f"range {histogram.min:g} .. {histogram.max:g}")
+    finally:
+        if args.file is None:
+            os.remove(path)
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+#####################################################################################################################
+# Copyright(C) 2011-2025 IT4Innovations National Supercomputing Center, VSB - Technical University of Ostrava
+#
+# This program is free software : you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#####################################################################################################################
+
+# Benchmark of the remote filesystem backends (no Blender needed)
+#
+#   python benchmarks/bench_remote.py --root /data
+#   python benchmarks/bench_remote.py --ssh user@cluster --root /scratch/project
+#
+# Compares a fresh connection per command against the pooled persistent sessions
+# (with --ssh) and the native local backend.
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "addons"))
+
+from braas_hpc_haystack_composer import haystack_remote
+
+class PerCommandBackend(haystack_remote.ShellBackend):
+    """One process per command, the way every command was run before the session pool"""
+
+    def __init__(self, prefix):
+        self.key = ("per-command",) + tuple(prefix)
+        self._prefix = list(prefix)
+
+    def run(self, command):
+        return subprocess.run(self._prefix + [command], capture_output=True, text=True).stdout
+
+def timed(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark remote filesystem backends")
+    parser.add_argument("--root", default=os.getcwd(), help="Directory to list")
+    parser.add_argument("--ssh", help="SSH destination, local shell processes are used without it")
+    parser.add_argument("--repeat", type=int, default=20, help="Listings per backend")
+    args = parser.parse_args(argv)
+
+    backends = [("local", haystack_remote.LocalBackend())]
+    if args.ssh:
+        backends.insert(0, ("pooled", haystack_remote.SSHPoolBackend(args.ssh)))
+        backends.insert(0, ("per-command", PerCommandBackend(["ssh", "-T", "-o", "BatchMode=yes", args.ssh])))
+    else:
+        backends.insert(0, ("per-command", PerCommandBackend(["sh", "-c"])))
+
+    print(f"{'backend':>12} {'list_dir [ms]':>14} {'entries':>8}")
+    for name, backend in backends:
+        entries = backend.list_dir(args.root)
+        seconds = timed(lambda: backend.list_dir(args.root), args.repeat)
+        print(f"{name:>12} {seconds * 1000.0:>14.3f} {len(entries):>8}")
+        backend.close()
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())